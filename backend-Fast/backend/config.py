@@ -12,3 +12,126 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
+# LanguageTool executor
+LANGUAGETOOL_LANGUAGE = os.getenv("LANGUAGETOOL_LANGUAGE", "en-GB")
+LT_POOL_SIZE = int(os.getenv("LT_POOL_SIZE", "1"))
+LT_MAX_PENDING = int(os.getenv("LT_MAX_PENDING", "64"))
+LT_CHECK_TIMEOUT = float(os.getenv("LT_CHECK_TIMEOUT", "10"))
+
+# Shared LanguageTool server (컨테이너당 하나의 LT 서버를 모든 워커가 공유)
+# LANGUAGETOOL_URL 이 설정되면 외부 서버를 사용하고, LT_SHARED_SERVER=true 이면 자식 프로세스로 직접 띄웁니다.
+LANGUAGETOOL_URL = os.getenv("LANGUAGETOOL_URL")
+LT_SHARED_SERVER = os.getenv("LT_SHARED_SERVER", "false").lower() in ("1", "true", "yes")
+LT_SERVER_PORT = int(os.getenv("LT_SERVER_PORT", "8081"))
+LT_SERVER_LOCK_FILE = os.getenv("LT_SERVER_LOCK_FILE", "/tmp/languagetool-server.lock")
+LT_HEALTH_INTERVAL = float(os.getenv("LT_HEALTH_INTERVAL", "15"))
+
+# Sentence-level correction cache
+CORRECTION_CACHE_SIZE = int(os.getenv("CORRECTION_CACHE_SIZE", "10000"))
+CORRECTION_CACHE_TTL = float(os.getenv("CORRECTION_CACHE_TTL", "86400"))
+CORRECTION_CACHE_PERSIST = os.getenv("CORRECTION_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+
+# Batch correction
+MAX_BATCH_SENTENCES = int(os.getenv("MAX_BATCH_SENTENCES", "200"))
+
+# Gemini LLM client
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+GEMINI_CONNECT_TIMEOUT = float(os.getenv("GEMINI_CONNECT_TIMEOUT", "3"))
+GEMINI_READ_TIMEOUT = float(os.getenv("GEMINI_READ_TIMEOUT", "15"))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "16"))
+GEMINI_BREAKER_THRESHOLD = int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5"))
+GEMINI_BREAKER_COOLDOWN = float(os.getenv("GEMINI_BREAKER_COOLDOWN", "30"))
+
+# LLM refinement cache (deterministic mode only, opt-in: 켜면 temperature 가 0.7 에서 LLM_DETERMINISTIC_TEMPERATURE 로 바뀝니다)
+LLM_DETERMINISTIC = os.getenv("LLM_DETERMINISTIC", "false").lower() in ("1", "true", "yes")
+LLM_DETERMINISTIC_TEMPERATURE = float(os.getenv("LLM_DETERMINISTIC_TEMPERATURE", "0.0"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "10000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "604800"))
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+
+# LLM refinement micro-batching
+LLM_BATCH_ENABLED = os.getenv("LLM_BATCH_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_BATCH_WINDOW_MS = float(os.getenv("LLM_BATCH_WINDOW_MS", "20"))
+LLM_BATCH_MAX_SIZE = int(os.getenv("LLM_BATCH_MAX_SIZE", "16"))
+
+# Error-pattern write-behind queue
+PATTERN_QUEUE_MAX = int(os.getenv("PATTERN_QUEUE_MAX", "10000"))
+PATTERN_BATCH_SIZE = int(os.getenv("PATTERN_BATCH_SIZE", "200"))
+PATTERN_FLUSH_INTERVAL = float(os.getenv("PATTERN_FLUSH_INTERVAL", "1.0"))
+
+# Shared async DB connection pool (asyncpg)
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Cloud SQL 프록시/로드밸런서가 오래된 유휴 연결을 끊기 전에 재연결하도록 연결 수명을 제한합니다 (초)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))
+
+# Per-user NotionIntegration cache
+NOTION_INTEGRATION_CACHE_SIZE = int(os.getenv("NOTION_INTEGRATION_CACHE_SIZE", "10000"))
+NOTION_INTEGRATION_CACHE_TTL = float(os.getenv("NOTION_INTEGRATION_CACHE_TTL", "300"))
+# 여러 인스턴스로 배포할 때 Postgres LISTEN/NOTIFY 로 다른 인스턴스의 캐시도 무효화합니다
+NOTION_INTEGRATION_CACHE_SHARED = os.getenv("NOTION_INTEGRATION_CACHE_SHARED", "false").lower() in ("1", "true", "yes")
+
+# Notion token validity cache (connect_notion)
+NOTION_TOKEN_VALID_TTL = float(os.getenv("NOTION_TOKEN_VALID_TTL", "600"))
+NOTION_TOKEN_INVALID_TTL = float(os.getenv("NOTION_TOKEN_INVALID_TTL", "30"))
+
+# Shared outbound HTTP client (Notion, Gemini, dictionary API)
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+HTTP_MAX_KEEPALIVE_PER_HOST = int(os.getenv("HTTP_MAX_KEEPALIVE_PER_HOST", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+
+# Notion request scheduler (per-integration rate limiting)
+NOTION_RATE_PER_SECOND = float(os.getenv("NOTION_RATE_PER_SECOND", "3"))
+NOTION_BURST = int(os.getenv("NOTION_BURST", "3"))
+NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "3"))
+NOTION_MAX_RETRY_WAIT = float(os.getenv("NOTION_MAX_RETRY_WAIT", "30"))
+
+# Bulk Notion save
+NOTION_SAVE_BATCH_MAX = int(os.getenv("NOTION_SAVE_BATCH_MAX", "500"))
+
+# Background Notion save jobs
+NOTION_JOB_WORKERS = int(os.getenv("NOTION_JOB_WORKERS", "4"))
+NOTION_JOB_MAX_ATTEMPTS = int(os.getenv("NOTION_JOB_MAX_ATTEMPTS", "3"))
+
+# Notion database discovery (/v1/search) cache
+NOTION_DATABASES_CACHE_SIZE = int(os.getenv("NOTION_DATABASES_CACHE_SIZE", "1000"))
+NOTION_DATABASES_CACHE_TTL = float(os.getenv("NOTION_DATABASES_CACHE_TTL", "120"))
+NOTION_DATABASES_MAX_PAGES = int(os.getenv("NOTION_DATABASES_MAX_PAGES", "50"))
+
+# Local mirror of each user's Notion vocabulary database
+NOTION_MIRROR_SYNC_INTERVAL = float(os.getenv("NOTION_MIRROR_SYNC_INTERVAL", "300"))
+NOTION_MIRROR_FULL_SYNC_INTERVAL = float(os.getenv("NOTION_MIRROR_FULL_SYNC_INTERVAL", "86400"))
+
+# Per-user duplicate-word index (backed by the vocabulary mirror)
+NOTION_WORD_INDEX_USERS = int(os.getenv("NOTION_WORD_INDEX_USERS", "1000"))
+NOTION_WORD_INDEX_TTL = float(os.getenv("NOTION_WORD_INDEX_TTL", "300"))
+
+# Offline dictionary (memory-mapped store behind /api/define, remote API only for misses)
+OFFLINE_DICT_ENABLED = os.getenv("OFFLINE_DICT_ENABLED", "true").lower() in ("1", "true", "yes")
+OFFLINE_DICT_PATH = os.getenv("OFFLINE_DICT_PATH", "data/dictionary.bin")
+OFFLINE_DICT_WRITE_BACK = os.getenv("OFFLINE_DICT_WRITE_BACK", "true").lower() in ("1", "true", "yes")
+OFFLINE_DICT_COMPACT_THRESHOLD = int(os.getenv("OFFLINE_DICT_COMPACT_THRESHOLD", "500"))
+
+# /api/define response cache (in-process LRU + optional Postgres tier, 404s cached for DEFINITION_NEGATIVE_TTL)
+DEFINITION_CACHE_SIZE = int(os.getenv("DEFINITION_CACHE_SIZE", "20000"))
+DEFINITION_CACHE_TTL = float(os.getenv("DEFINITION_CACHE_TTL", "604800"))
+DEFINITION_NEGATIVE_TTL = float(os.getenv("DEFINITION_NEGATIVE_TTL", "3600"))
+DEFINITION_CACHE_PERSIST = os.getenv("DEFINITION_CACHE_PERSIST", "false").lower() in ("1", "true", "yes")
+
+# /api/defineBatch
+DEFINE_BATCH_MAX = int(os.getenv("DEFINE_BATCH_MAX", "200"))
+DEFINE_BATCH_CONCURRENCY = int(os.getenv("DEFINE_BATCH_CONCURRENCY", "8"))
+
+# /api/suggest prefix autocomplete
+SUGGEST_ENABLED = os.getenv("SUGGEST_ENABLED", "false").lower() in ("1", "true", "yes")
+SUGGEST_WORDLIST_PATH = os.getenv("SUGGEST_WORDLIST_PATH", "data/words.txt")
+SUGGEST_MEMORY_BUDGET_MB = float(os.getenv("SUGGEST_MEMORY_BUDGET_MB", "16"))
+SUGGEST_MAX_RESULTS = int(os.getenv("SUGGEST_MAX_RESULTS", "10"))
+SUGGEST_PRECOMPUTE_DEPTH = int(os.getenv("SUGGEST_PRECOMPUTE_DEPTH", "3"))
@@ -0,0 +1,135 @@
+# correction_cache.py
+import asyncio
+import datetime
+import hashlib
+from typing import Callable, Optional
+
+import models
+from ttl_cache import TTLCache
+
+
+def normalize_sentence(sentence: str) -> str:
+    """앞뒤 공백을 제거하고 연속된 공백을 하나로 합칩니다."""
+    return " ".join(sentence.split())
+
+
+def serialize_match(match) -> dict:
+    """LanguageTool Match 객체를 캐시/응답에 저장할 수 있는 dict 로 변환합니다."""
+    return {
+        "ruleId": match.ruleId,
+        "message": match.message,
+        "replacements": list(match.replacements),
+        "offset": match.offset,
+        "errorLength": match.errorLength,
+        "category": match.category,
+        "ruleIssueType": match.ruleIssueType,
+    }
+
+
+class CorrectionCache:
+    """
+    문장 단위 LanguageTool 교정 결과 캐시.
+
+    - 1단계: 프로세스 내 LRU/TTL 캐시 (TTLCache)
+    - 2단계(선택): Postgres 테이블 lt_correction_cache. 재시작 후에도 유지되며 인스턴스 간에 공유됩니다.
+    값은 {"matches": [...], "corrected_text": str, "sentence": 검사한 원래 문장} 형태입니다.
+    키는 공백 정규화된 문장이지만, matches 의 offset 과 공백 관련 규칙은 원래 문장의 공백에 따라 달라지므로
+    저장된 문장과 글자 그대로 같은 문장에만 hit 으로 돌려줍니다 (공백만 다른 문장은 같은 자리를 덮어씁니다).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: Optional[float] = 86400,
+        persist: bool = False,
+        session_factory: Optional[Callable] = None,
+    ):
+        self.ttl = ttl
+        self.persist = persist and session_factory is not None
+        self._session_factory = session_factory
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._pending_writes: set = set()
+        self.persistent_hits = 0
+        self.persist_errors = 0
+
+    @staticmethod
+    def make_key(sentence: str, language: str) -> str:
+        return hashlib.sha256(f"{language}\0{normalize_sentence(sentence)}".encode("utf-8")).hexdigest()
+
+    async def _load(self, key: str) -> Optional[dict]:
+        async with self._session_factory() as db:
+            entry = await db.get(models.CorrectionCacheEntry, key)
+            if entry is None:
+                return None
+            if self.ttl is not None:
+                age = datetime.datetime.now(datetime.timezone.utc) - entry.created_at
+                if age.total_seconds() > self.ttl:
+                    await db.delete(entry)
+                    await db.commit()
+                    return None
+            return {"matches": entry.matches, "corrected_text": entry.corrected_text, "sentence": entry.sentence}
+
+    async def _store(self, key: str, sentence: str, language: str, value: dict):
+        async with self._session_factory() as db:
+            await db.merge(models.CorrectionCacheEntry(
+                cache_key=key,
+                language=language,
+                sentence=sentence,
+                corrected_text=value["corrected_text"],
+                matches=value["matches"],
+                created_at=datetime.datetime.now(datetime.timezone.utc),
+            ))
+            await db.commit()
+
+    async def get(self, sentence: str, language: str) -> Optional[dict]:
+        key = self.make_key(sentence, language)
+        value = self._memory.get(key, count=False)
+        if value is not None and value["sentence"] == sentence:
+            self._memory.hits += 1
+            return value
+        self._memory.misses += 1
+        if not self.persist:
+            return None
+        try:
+            value = await self._load(key)
+        except Exception as e:
+            self.persist_errors += 1
+            print(f"Correction cache load error: {e}")
+            return None
+        if value is None or value["sentence"] != sentence:
+            return None
+        self.persistent_hits += 1
+        self._memory.set(key, value)
+        return value
+
+    def set(self, sentence: str, language: str, matches: list, corrected_text: str):
+        key = self.make_key(sentence, language)
+        value = {"matches": [serialize_match(m) for m in matches], "corrected_text": corrected_text, "sentence": sentence}
+        self._memory.set(key, value)
+        if self.persist:
+            # 영속 저장은 응답을 지연시키지 않도록 백그라운드에서 수행합니다.
+            task = asyncio.create_task(self._persist(key, sentence, language, value))
+            self._pending_writes.add(task)
+            task.add_done_callback(self._pending_writes.discard)
+        return value
+
+    async def _persist(self, key: str, sentence: str, language: str, value: dict):
+        try:
+            await self._store(key, sentence, language, value)
+        except Exception as e:
+            self.persist_errors += 1
+            print(f"Correction cache store error: {e}")
+
+    async def close(self):
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            **self._memory.stats,
+            "persist": self.persist,
+            "persistent_hits": self.persistent_hits,
+            "persist_errors": self.persist_errors,
+            "pending_writes": len(self._pending_writes),
+        }
@@ -1,39 +1,83 @@
 # database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import asyncio
+from sqlalchemy import event, text
 from sqlalchemy.orm import declarative_base 
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from fastapi import HTTPException
 from config import DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD  
-# SQLAlchemy 데이터베이스 URL 생성
-# f-string을 사용하여 변수를 URL에 삽입합니다.
-SQLALCHEMY_DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-
-# SQLAlchemy 엔진 생성
-# pool_pre_ping=True는 데이터베이스 연결이 유효한지 주기적으로 확인하여
-# 유휴 연결이 끊어지는 문제를 방지하는 데 도움이 됩니다.
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
-
-# 세션 로컬 클래스 생성
-# autocommit=False: 트랜잭션이 자동으로 커밋되지 않음 (수동 커밋 필요)
-# autoflush=False: 변경사항이 자동으로 플러시되지 않음 (수동 플러시 또는 커밋 시 플러시)
-# bind=engine: 생성된 엔진과 연결
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from config import DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_STATEMENT_CACHE_SIZE
 
 # SQLAlchemy ORM의 기본 선언적 베이스 클래스 생성
 # 이 클래스를 상속받아 데이터베이스 테이블과 매핑되는 모델을 정의합니다.
 Base = declarative_base()
 
-# 데이터베이스 세션을 제공하는 의존성 함수
+# --- 공유 비동기 커넥션 풀 (asyncpg) ---
+# 원시 SQL(마이그레이션, 오류 패턴 기록), ORM 캐시, Notion/사용자 라우터가 모두 이 풀을 사용합니다.
+# 요청마다 새 연결을 맺지 않으므로 Cloud SQL 의 TCP+TLS+인증 핸드셰이크 비용이 사라집니다.
+# prepared_statement_cache_size: 연결별로 준비된 문장(prepared statement)을 캐시합니다.
+ASYNC_SQLALCHEMY_DATABASE_URL = (
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    f"?prepared_statement_cache_size={DB_STATEMENT_CACHE_SIZE}"
+)
+
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    pool_size=DB_POOL_MAX_SIZE, # 최대 연결 수 (overflow 없이 풀 크기로 제한)
+    max_overflow=0,
+    pool_timeout=DB_POOL_TIMEOUT, # 연결을 기다리는 최대 시간(초)
+    pool_recycle=DB_POOL_RECYCLE, # Cloud SQL 쪽에서 끊긴 오래된 연결을 재사용하지 않도록 주기적으로 교체
+    pool_pre_ping=True, # 체크아웃 시 끊어진 연결을 감지해 재연결
+)
+
+# expire_on_commit=False: 커밋 후에도 로드한 객체 속성을 추가 쿼리 없이 사용할 수 있게 합니다.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# 비동기 DB 세션을 제공하는 의존성 함수
 # FastAPI의 Depends와 함께 사용하여 요청마다 새로운 DB 세션을 제공합니다.
-from fastapi import HTTPException
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    except Exception as e:
-        db.rollback()
-        # 오류가 발생했음을 명확히 알리고, FastAPI가 응답을 생성할 수 있도록
-        # HTTPException을 다시 발생시킵니다.
-        print(f"Database session error: {e}") # 디버깅을 위한 로그
-        raise HTTPException(status_code=500, detail="Database operation failed")
-    finally:
-        db.close()
\ No newline at end of file
+# DB 왕복 동안 이벤트 루프를 막지 않으므로 다른 요청의 처리와 겹쳐서 진행됩니다.
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except HTTPException:
+            await db.rollback()
+            raise
+        except Exception as e:
+            await db.rollback()
+            print(f"Database session error: {e}") # 디버깅을 위한 로그
+            raise HTTPException(status_code=500, detail="Database operation failed")
+
+_pool_counters = {"connects": 0, "checkouts": 0}
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def _count_connect(dbapi_connection, connection_record):
+    _pool_counters["connects"] += 1
+
+@event.listens_for(async_engine.sync_engine, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+    _pool_counters["checkouts"] += 1
+
+async def warm_pool(min_size: int = DB_POOL_MIN_SIZE):
+    """기동 시 min_size 개의 연결을 미리 열어 첫 요청부터 핸드셰이크 없이 처리합니다."""
+    async def _open():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*[_open() for _ in range(min(min_size, DB_POOL_MAX_SIZE))])
+
+def pool_stats() -> dict:
+    """공유 커넥션 풀 지표를 반환합니다."""
+    pool = async_engine.pool
+    return {
+        "min_size": DB_POOL_MIN_SIZE,
+        "max_size": DB_POOL_MAX_SIZE,
+        "open": pool.checkedin() + pool.checkedout(),
+        "idle": pool.checkedin(),
+        "in_use": pool.checkedout(),
+        "connects": _pool_counters["connects"],
+        "checkouts": _pool_counters["checkouts"],
+    }
+
+async def close_pool():
+    """풀의 모든 연결을 닫습니다 (lifespan 종료 시 호출)."""
+    await async_engine.dispose()
@@ -0,0 +1,174 @@
+# definition_cache.py
+import asyncio
+import datetime
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import delete, or_
+
+import models
+from offline_dictionary import normalize_key
+from ttl_cache import TTLCache
+
+# 메모리 캐시에 '없는 단어(404)' 를 기록할 때 쓰는 값
+_NOT_FOUND = object()
+
+
+class DefinitionCache:
+    """
+    /api/define 의 최종 응답(DefinitionResponse) 캐시.
+
+    - 1단계: 프로세스 내 LRU/TTL 캐시 (TTLCache)
+    - 2단계(선택): Postgres 테이블 definition_cache (인스턴스 간 공유, 재시작 후에도 유지)
+    - 사전에 없는 단어(404) 도 negative_ttl 동안 캐시해 같은 오타를 반복 조회하지 않습니다.
+    - 같은 단어의 동시 조회는 하나의 조회(single-flight) 로 합칩니다.
+    오류(네트워크 실패, 5xx 등) 는 캐시하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 20000,
+        ttl: Optional[float] = 7 * 86400,
+        negative_ttl: Optional[float] = 3600,
+        persist: bool = False,
+        session_factory: Optional[Callable] = None,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.persist = persist and session_factory is not None
+        self._session_factory = session_factory
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._pending_writes: set = set()
+        self.negative_hits = 0
+        self.persistent_hits = 0
+        self.coalesced = 0
+        self.fetches = 0
+        self.persist_errors = 0
+
+    def _remaining(self, created_at: datetime.datetime, ttl: Optional[float]) -> Optional[float]:
+        """영속 항목의 남은 TTL (초). 만료됐으면 0 이하, TTL 이 없으면 None."""
+        if ttl is None:
+            return None
+        age = datetime.datetime.now(datetime.timezone.utc) - created_at
+        return ttl - age.total_seconds()
+
+    async def _load(self, key: str):
+        async with self._session_factory() as db:
+            entry = await db.get(models.DefinitionCacheEntry, key)
+            if entry is None:
+                return None
+            found = entry.response is not None
+            remaining = self._remaining(entry.created_at, self.ttl if found else self.negative_ttl)
+            if remaining is not None and remaining <= 0:
+                return None
+            value = entry.response if found else _NOT_FOUND
+            self._memory.set(key, value, ttl=remaining)
+            return value
+
+    async def _store(self, key: str, response: Optional[dict]):
+        async with self._session_factory() as db:
+            await db.merge(models.DefinitionCacheEntry(
+                word=key,
+                response=response,
+                created_at=datetime.datetime.now(datetime.timezone.utc),
+            ))
+            await db.commit()
+
+    async def _persist(self, key: str, response: Optional[dict]):
+        try:
+            await self._store(key, response)
+        except Exception as e:
+            self.persist_errors += 1
+            print(f"Definition cache store error: {e}")
+
+    async def _purge(self) -> int:
+        entries = models.DefinitionCacheEntry
+        now = datetime.datetime.now(datetime.timezone.utc)
+        conditions = []
+        if self.ttl is not None:
+            conditions.append(entries.response.isnot(None) & (entries.created_at < now - datetime.timedelta(seconds=self.ttl)))
+        if self.negative_ttl is not None:
+            conditions.append(entries.response.is_(None) & (entries.created_at < now - datetime.timedelta(seconds=self.negative_ttl)))
+        if not conditions:
+            return 0
+        async with self._session_factory() as db:
+            result = await db.execute(delete(entries).where(or_(*conditions)))
+            await db.commit()
+            return result.rowcount
+
+    async def purge_stale(self):
+        """TTL 이 지난 영속 항목을 삭제합니다."""
+        if not self.persist:
+            return
+        try:
+            deleted = await self._purge()
+            print(f"Definition cache purged {deleted} stale entries")
+        except Exception as e:
+            self.persist_errors += 1
+            print(f"Definition cache purge error: {e}")
+
+    def _remember(self, key: str, response: Optional[dict]):
+        if response is None:
+            self._memory.set(key, _NOT_FOUND, ttl=self.negative_ttl)
+        else:
+            self._memory.set(key, response)
+        if self.persist:
+            task = asyncio.create_task(self._persist(key, response))
+            self._pending_writes.add(task)
+            task.add_done_callback(self._pending_writes.discard)
+
+    async def _resolve(self, key: str, fetch: Callable[[str], Awaitable[Optional[dict]]]):
+        if self.persist:
+            try:
+                value = await self._load(key)
+            except Exception as e:
+                self.persist_errors += 1
+                print(f"Definition cache load error: {e}")
+                value = None
+            if value is not None:
+                self.persistent_hits += 1
+                return value
+        self.fetches += 1
+        response = await fetch(key)
+        self._remember(key, response)
+        return _NOT_FOUND if response is None else response
+
+    async def lookup(self, word: str, fetch: Callable[[str], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        """
+        캐시된 응답을 반환하고, 없으면 fetch(정규화된 단어) 로 가져와 캐시합니다.
+        fetch 는 사전에 없는 단어면 None 을 반환하고, 그 외 실패는 예외로 알립니다. 없는 단어면 None 을 반환합니다.
+        """
+        key = normalize_key(word)
+        value = self._memory.get(key)
+        if value is _NOT_FOUND:
+            self.negative_hits += 1
+            return None
+        if value is None:
+            task = self._in_flight.get(key)
+            if task is None:
+                task = asyncio.create_task(self._resolve(key, fetch))
+                self._in_flight[key] = task
+                task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            else:
+                self.coalesced += 1
+            # 먼저 요청한 클라이언트가 끊겨도 같은 단어를 기다리는 다른 요청은 결과를 받도록 shield 합니다.
+            value = await asyncio.shield(task)
+        return None if value is _NOT_FOUND else value
+
+    async def close(self):
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            **self._memory.stats,
+            "persist": self.persist,
+            "negative_hits": self.negative_hits,
+            "persistent_hits": self.persistent_hits,
+            "coalesced": self.coalesced,
+            "fetches": self.fetches,
+            "in_flight": len(self._in_flight),
+            "persist_errors": self.persist_errors,
+            "pending_writes": len(self._pending_writes),
+        }
@@ -0,0 +1,162 @@
+# http_client.py
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import (
+    HTTP2_ENABLED, HTTP_MAX_CONNECTIONS_PER_HOST, HTTP_MAX_KEEPALIVE_PER_HOST, HTTP_KEEPALIVE_EXPIRY,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+)
+
+try:
+    import h2 # noqa: F401  httpx 의 HTTP/2 지원은 선택 의존성(h2)이 필요합니다.
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+
+class HostMetrics:
+    """호스트별 호출 수/오류 수와 최근 latency 표본(ms)."""
+
+    def __init__(self, window: int = 512):
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent: deque = deque(maxlen=window)
+
+    def record(self, elapsed_ms: float, error: bool):
+        self.requests += 1
+        self.errors += int(error)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self._recent.append(elapsed_ms)
+
+    def _percentile(self, q: float) -> float:
+        samples = sorted(self._recent)
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))], 1) if samples else 0.0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.requests, 1) if self.requests else 0.0,
+            "p50_ms": self._percentile(0.5),
+            "p95_ms": self._percentile(0.95),
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class OutboundHTTP:
+    """
+    프로세스 전체가 공유하는 외부 HTTP 호출 계층 (Notion, Gemini, 사전 API).
+
+    - lifespan 에서 start()/close() 합니다.
+    - 호스트마다 별도의 httpx.AsyncClient 커넥션 풀을 두어 호스트별 연결 수를 제한하고,
+      한 호스트가 느려져도 다른 호스트의 연결을 잠식하지 않습니다.
+    - keep-alive 와 (h2 가 설치되어 있으면) HTTP/2 로 DNS/TCP/TLS 설정 비용을 호출마다 치르지 않습니다.
+    - 호스트별 latency(평균/p50/p95/최대) 와 오류 수를 stats 로 노출합니다.
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        max_connections_per_host: int = 20,
+        max_keepalive_per_host: int = 10,
+        keepalive_expiry: float = 60.0,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.http2 = http2 and _HTTP2_AVAILABLE
+        if http2 and not _HTTP2_AVAILABLE:
+            print("h2 is not installed; outbound HTTP falls back to HTTP/1.1 keep-alive")
+        self.limits = httpx.Limits(
+            max_connections=max(1, max_connections_per_host),
+            max_keepalive_connections=max(0, max_keepalive_per_host),
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._transport = transport # 테스트 등에서 실제 네트워크 대신 사용할 transport
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._metrics: dict[str, HostMetrics] = {}
+        self._started = False
+
+    async def start(self):
+        self._started = True
+
+    async def close(self):
+        self._started = False
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def _client_for(self, host: str) -> httpx.AsyncClient:
+        if not self._started:
+            raise RuntimeError("OutboundHTTP is not started")
+        client = self._clients.get(host)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=self.http2, limits=self.limits, timeout=self.timeout, transport=self._transport
+            )
+            self._clients[host] = client
+            self._metrics.setdefault(host, HostMetrics())
+        return client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """요청을 보내고 응답 본문까지 읽은 httpx.Response 를 반환합니다."""
+        host = urlsplit(url).netloc
+        client = self._client_for(host)
+        started = time.perf_counter()
+        error = True
+        try:
+            response = await client.request(method, url, **kwargs)
+            error = response.status_code >= 500
+            return response
+        finally:
+            self._metrics[host].record((time.perf_counter() - started) * 1000, error)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """스트리밍 요청. latency 는 응답 헤더를 받을 때까지의 시간으로 기록합니다."""
+        host = urlsplit(url).netloc
+        client = self._client_for(host)
+        started = time.perf_counter()
+        recorded = False
+        try:
+            async with client.stream(method, url, **kwargs) as response:
+                self._metrics[host].record((time.perf_counter() - started) * 1000, response.status_code >= 500)
+                recorded = True
+                yield response
+        finally:
+            if not recorded:
+                self._metrics[host].record((time.perf_counter() - started) * 1000, True)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "http2": self.http2,
+            "max_connections_per_host": self.limits.max_connections,
+            "hosts": {host: metrics.stats for host, metrics in self._metrics.items()},
+        }
+
+
+outbound_http = OutboundHTTP(
+    http2=HTTP2_ENABLED,
+    max_connections_per_host=HTTP_MAX_CONNECTIONS_PER_HOST,
+    max_keepalive_per_host=HTTP_MAX_KEEPALIVE_PER_HOST,
+    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    connect_timeout=HTTP_CONNECT_TIMEOUT,
+    read_timeout=HTTP_READ_TIMEOUT,
+)
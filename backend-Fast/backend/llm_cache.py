@@ -0,0 +1,143 @@
+# llm_cache.py
+import asyncio
+import datetime
+import hashlib
+import json
+from typing import Callable, Optional
+
+from sqlalchemy import delete
+
+import models
+from ttl_cache import TTLCache
+
+
+class LLMRefinementCache:
+    """
+    결정적 모드 Gemini 정교화 결과 캐시.
+
+    - 1단계: 프로세스 내 LRU/TTL 캐시 (TTLCache)
+    - 2단계(선택): Postgres 테이블 llm_refinement_cache
+    키는 (모델, 프롬프트 버전, 전체 요청 payload) 의 sha256 이므로 프롬프트나 generationConfig 가
+    바뀌면 자동으로 다른 키가 되고, 이전 버전 항목은 purge_stale() 및 TTL 로 정리됩니다.
+    variant 는 결과를 만든 프롬프트 종류("single" 문장별 / "batch" 여러 문장 JSON 배열) 로, 키에 포함되어 서로 섞이지 않습니다.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        prompt_version: str,
+        maxsize: int = 10000,
+        ttl: Optional[float] = 7 * 86400,
+        persist: bool = False,
+        session_factory: Optional[Callable] = None,
+    ):
+        self.model = model
+        self.prompt_version = prompt_version
+        self.ttl = ttl
+        self.persist = persist and session_factory is not None
+        self._session_factory = session_factory
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._pending_writes: set = set()
+        self.persistent_hits = 0
+        self.persist_errors = 0
+
+    def make_key(self, payload: dict, variant: str = "single") -> str:
+        material = json.dumps(
+            {"model": self.model, "prompt_version": self.prompt_version, "variant": variant, "payload": payload},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def _load(self, key: str) -> Optional[str]:
+        async with self._session_factory() as db:
+            entry = await db.get(models.LLMRefinementCacheEntry, key)
+            if entry is None or entry.prompt_version != self.prompt_version:
+                return None
+            if self.ttl is not None:
+                age = datetime.datetime.now(datetime.timezone.utc) - entry.created_at
+                if age.total_seconds() > self.ttl:
+                    return None
+            return entry.refined_text
+
+    async def _store(self, key: str, source_text: str, refined_text: str):
+        async with self._session_factory() as db:
+            await db.merge(models.LLMRefinementCacheEntry(
+                cache_key=key,
+                model=self.model,
+                prompt_version=self.prompt_version,
+                source_text=source_text,
+                refined_text=refined_text,
+                created_at=datetime.datetime.now(datetime.timezone.utc),
+            ))
+            await db.commit()
+
+    async def _purge(self) -> int:
+        entries = models.LLMRefinementCacheEntry
+        async with self._session_factory() as db:
+            result = await db.execute(delete(entries).where(entries.prompt_version != self.prompt_version))
+            deleted = result.rowcount
+            if self.ttl is not None:
+                cutoff = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=self.ttl)
+                result = await db.execute(delete(entries).where(entries.created_at < cutoff))
+                deleted += result.rowcount
+            await db.commit()
+            return deleted
+
+    async def purge_stale(self):
+        """다른 prompt_version 으로 만들어졌거나 TTL 이 지난 영속 항목을 삭제합니다."""
+        if not self.persist:
+            return
+        try:
+            deleted = await self._purge()
+            print(f"LLM refinement cache purged {deleted} stale entries (prompt_version={self.prompt_version})")
+        except Exception as e:
+            self.persist_errors += 1
+            print(f"LLM refinement cache purge error: {e}")
+
+    async def get(self, payload: dict, variant: str = "single") -> Optional[str]:
+        key = self.make_key(payload, variant)
+        value = self._memory.get(key)
+        if value is not None or not self.persist:
+            return value
+        try:
+            value = await self._load(key)
+        except Exception as e:
+            self.persist_errors += 1
+            print(f"LLM refinement cache load error: {e}")
+            return None
+        if value is not None:
+            self.persistent_hits += 1
+            self._memory.set(key, value)
+        return value
+
+    def set(self, payload: dict, source_text: str, refined_text: str, variant: str = "single"):
+        key = self.make_key(payload, variant)
+        self._memory.set(key, refined_text)
+        if self.persist:
+            task = asyncio.create_task(self._persist(key, source_text, refined_text))
+            self._pending_writes.add(task)
+            task.add_done_callback(self._pending_writes.discard)
+
+    async def _persist(self, key: str, source_text: str, refined_text: str):
+        try:
+            await self._store(key, source_text, refined_text)
+        except Exception as e:
+            self.persist_errors += 1
+            print(f"LLM refinement cache store error: {e}")
+
+    async def close(self):
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            **self._memory.stats,
+            "model": self.model,
+            "prompt_version": self.prompt_version,
+            "persist": self.persist,
+            "persistent_hits": self.persistent_hits,
+            "persist_errors": self.persist_errors,
+            "pending_writes": len(self._pending_writes),
+        }
@@ -0,0 +1,209 @@
+# llm_client.py
+import asyncio
+import json
+import random
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from http_client import OutboundHTTP
+
+
+class LLMUnavailableError(Exception):
+    """Gemini 호출이 실패했거나 circuit breaker 가 열려 있어 호출하지 않았을 때 발생합니다."""
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold 에 도달하면 cooldown 초 동안 호출을 차단(open)합니다.
+    cooldown 이 지나면 한 번의 시험 호출(half-open)을 허용하고, 성공하면 다시 닫습니다(closed).
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def abort_trial(self):
+        """시험 호출이 성공/실패 기록 없이 끝났으면(취소, 클라이언트 연결 끊김 등) 실패로 기록해 다시 open 합니다."""
+        if self._trial_in_flight:
+            self.record_failure()
+
+
+class GeminiClient:
+    """
+    Gemini generateContent / streamGenerateContent 용 비동기 클라이언트.
+
+    - 프로세스 공유 OutboundHTTP 의 keep-alive/HTTP2 커넥션 풀을 사용 (lifespan 에서 start/close)
+    - Gemini 전용 connect/read 타임아웃
+    - 429/5xx/네트워크 오류에 대한 제한된 재시도 (exponential backoff + jitter)
+    - 전역 동시 호출 수 제한 (semaphore)
+    - circuit breaker: Gemini 가 불안정한 동안에는 호출 없이 즉시 LLMUnavailableError
+    """
+
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_key: str,
+        http: OutboundHTTP,
+        model: str = "gemini-2.0-flash",
+        connect_timeout: float = 3.0,
+        read_timeout: float = 15.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.25,
+        max_concurrency: int = 16,
+        breaker_threshold: int = 5,
+        breaker_cooldown: float = 30.0,
+    ):
+        self.api_key = api_key
+        self.http = http
+        self.base_url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}"
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.max_concurrency = max(1, max_concurrency)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.in_flight = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "breaker_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "short_circuited": self.short_circuited,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+        }
+
+    def _check_breaker(self) -> bool:
+        """호출을 허용하고, 이 호출이 half-open 시험 호출이면 True 를 반환합니다."""
+        trial = self.breaker.state == "half_open"
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise LLMUnavailableError("Gemini circuit breaker is open")
+        return trial
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: 0 ~ base * 2^attempt
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    def _rejected(self, response: httpx.Response) -> LLMUnavailableError:
+        """
+        4xx (429 제외) 응답을 처리합니다. 재시도해도 같은 결과이므로 바로 실패 처리하되,
+        Gemini 자체는 응답 중이므로 breaker 는 닫아둡니다 (generate / stream 공통).
+        """
+        self.failures += 1
+        self.breaker.record_success()
+        return LLMUnavailableError(f"Gemini request rejected: {response.status_code} - {response.text}")
+
+    async def generate(self, payload: dict) -> dict:
+        """generateContent 를 호출하고 응답 JSON 을 반환합니다."""
+        trial = self._check_breaker()
+        try:
+            async with self._semaphore:
+                self.in_flight += 1
+                try:
+                    return await self._generate_with_retries(f"{self.base_url}:generateContent", payload)
+                finally:
+                    self.in_flight -= 1
+        except BaseException:
+            if trial:
+                self.breaker.abort_trial()
+            raise
+
+    async def _generate_with_retries(self, url: str, payload: dict) -> dict:
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+            self.calls += 1
+            try:
+                response = await self.http.post(url, params={"key": self.api_key}, json=payload, timeout=self.timeout)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                last_error = e
+                continue
+
+            if response.status_code in self.RETRYABLE_STATUS:
+                last_error = LLMUnavailableError(f"Gemini returned {response.status_code}")
+                continue
+            if response.is_error:
+                raise self._rejected(response)
+            self.breaker.record_success()
+            return response.json()
+
+        self.failures += 1
+        self.breaker.record_failure()
+        raise LLMUnavailableError(f"Gemini call failed after {self.max_retries + 1} attempt(s): {last_error}")
+
+    async def stream(self, payload: dict) -> AsyncIterator[dict]:
+        """streamGenerateContent(SSE) 를 호출하고 각 chunk JSON 을 yield 합니다. 스트림은 재시도하지 않습니다."""
+        trial = self._check_breaker()
+        url = f"{self.base_url}:streamGenerateContent"
+        try:
+            async with self._semaphore:
+                self.calls += 1
+                self.in_flight += 1
+                try:
+                    async with self.http.stream(
+                        "POST", url, params={"key": self.api_key, "alt": "sse"}, json=payload, timeout=self.timeout
+                    ) as response:
+                        if response.is_error and response.status_code not in self.RETRYABLE_STATUS:
+                            await response.aread()
+                            raise self._rejected(response)
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if line.startswith("data:"):
+                                yield json.loads(line[len("data:"):].strip())
+                except (httpx.HTTPError, json.JSONDecodeError) as e:
+                    self.failures += 1
+                    self.breaker.record_failure()
+                    raise LLMUnavailableError(f"Gemini stream failed: {e}") from e
+                finally:
+                    self.in_flight -= 1
+        except BaseException:
+            # 스트림 도중 클라이언트가 끊기면 aclose() 가 GeneratorExit 를 보냅니다.
+            if trial:
+                self.breaker.abort_trial()
+            raise
+        self.breaker.record_success()
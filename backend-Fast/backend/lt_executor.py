@@ -0,0 +1,153 @@
+# lt_executor.py
+import asyncio
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+import language_tool_python
+
+
+# 배치 검사 시 문장 사이에 넣는 구분자. 빈 줄은 LT 에서 문단 경계로 처리됩니다.
+BATCH_SEPARATOR = "\n\n"
+
+
+class LanguageToolBusyError(Exception):
+    """대기열이 가득 차서 새 검사를 받을 수 없을 때 발생합니다."""
+
+
+class LanguageToolTimeoutError(Exception):
+    """검사가 check_timeout 안에 끝나지 않았을 때 발생합니다."""
+
+
+class LanguageToolExecutor:
+    """
+    LanguageTool 인스턴스 풀을 이벤트 루프 밖(스레드)에서 실행하는 실행기.
+
+    - pool_size 개의 LanguageTool 인스턴스를 만들고, 각 인스턴스는 자체 로컬 LT 서버 프로세스를 가집니다.
+    - 동시에 대기할 수 있는 검사는 max_pending 개로 제한되며, 초과 시 LanguageToolBusyError 를 발생시킵니다.
+    - 각 검사는 check_timeout 초 안에 끝나지 않으면 LanguageToolTimeoutError 를 발생시킵니다.
+    """
+
+    def __init__(
+        self,
+        language: str = "en-GB",
+        pool_size: int = 1,
+        max_pending: int = 64,
+        check_timeout: float = 10.0,
+        tool_factory: Optional[Callable[[], object]] = None,
+    ):
+        self.language = language
+        self.pool_size = max(1, pool_size)
+        self.max_pending = max(0, max_pending)
+        self.check_timeout = check_timeout
+        self._tool_factory = tool_factory or (lambda: language_tool_python.LanguageTool(self.language))
+        self._tools: list = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+    async def start(self):
+        """풀의 LanguageTool 인스턴스를 병렬로 기동합니다 (JVM 기동은 느리므로 스레드에서 실행)."""
+        if self._idle is not None:
+            return
+        self._threads = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="languagetool")
+        loop = asyncio.get_running_loop()
+        self._tools = await asyncio.gather(
+            *[loop.run_in_executor(self._threads, self._tool_factory) for _ in range(self.pool_size)]
+        )
+        self._idle = asyncio.Queue()
+        for tool in self._tools:
+            self._idle.put_nowait(tool)
+        print(f"LanguageTool executor started with {self.pool_size} instance(s) for {self.language}")
+
+    async def close(self):
+        """모든 인스턴스(및 로컬 LT 서버 프로세스)를 종료합니다."""
+        if self._threads is None:
+            return
+        for tool in self._tools:
+            try:
+                tool.close()
+            except Exception as e:
+                print(f"Error closing LanguageTool instance: {e}")
+        self._threads.shutdown(wait=False)
+        self._tools = []
+        self._idle = None
+        self._threads = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "idle": self._idle.qsize() if self._idle else 0,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+        }
+
+    async def _run(self, fn: Callable, payload):
+        if self._idle is None:
+            raise RuntimeError("LanguageToolExecutor is not started")
+        # 실행 중인 검사 + 대기 중인 검사가 한도를 넘으면 즉시 거절 (backpressure)
+        if self._pending >= self.pool_size + self.max_pending:
+            raise LanguageToolBusyError("LanguageTool queue is full")
+
+        self._pending += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.check_timeout
+        try:
+            try:
+                tool = await asyncio.wait_for(self._idle.get(), self.check_timeout)
+            except asyncio.TimeoutError:
+                raise LanguageToolTimeoutError("Timed out waiting for a free LanguageTool instance")
+
+            future = loop.run_in_executor(self._threads, fn, tool, payload)
+            # 타임아웃이 나더라도 스레드 작업이 끝난 뒤에만 인스턴스를 풀에 돌려줍니다.
+            idle = self._idle
+            future.add_done_callback(lambda _: idle.put_nowait(tool))
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), max(0.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                raise LanguageToolTimeoutError(f"LanguageTool check exceeded {self.check_timeout}s")
+        finally:
+            self._pending -= 1
+
+    async def check(self, text: str) -> list:
+        """text 를 검사하고 LanguageTool Match 목록을 반환합니다."""
+        return await self._run(lambda tool, t: tool.check(t), text)
+
+    async def correct(self, text: str) -> tuple[list, str]:
+        """text 를 검사하고 (matches, 교정된 문장) 을 반환합니다."""
+        def _check_and_correct(tool, t):
+            matches = tool.check(t)
+            return matches, language_tool_python.utils.correct(t, matches)
+
+        return await self._run(_check_and_correct, text)
+
+    async def correct_batch(self, texts: list[str]) -> list[tuple[list, str]]:
+        """
+        여러 문장을 한 번의 LanguageTool 호출로 검사합니다.
+        문장들을 BATCH_SEPARATOR 로 이어 검사한 뒤, match 를 offset 기준으로 각 문장에 되돌려 나눕니다.
+        반환값은 texts 와 같은 순서의 (matches, 교정된 문장) 목록입니다.
+        """
+        def _check_batch(tool, items):
+            starts, position = [], 0
+            for item in items:
+                starts.append(position)
+                position += len(item) + len(BATCH_SEPARATOR)
+
+            buckets = [[] for _ in items]
+            for match in tool.check(BATCH_SEPARATOR.join(items)):
+                index = bisect.bisect_right(starts, match.offset) - 1
+                local_offset = match.offset - starts[index]
+                # 구분자에 걸치거나 여러 문장에 걸친 match 는 버립니다.
+                if index < 0 or local_offset + match.errorLength > len(items[index]):
+                    continue
+                match.offset = local_offset
+                buckets[index].append(match)
+            return [
+                (bucket, language_tool_python.utils.correct(item, bucket))
+                for item, bucket in zip(items, buckets)
+            ]
+
+        if not texts:
+            return []
+        return await self._run(_check_batch, texts)
@@ -0,0 +1,207 @@
+# lt_server.py
+import asyncio
+import fcntl
+import subprocess
+import urllib.parse
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+import language_tool_python
+from language_tool_python.download_lt import download_lt
+
+
+class RemoteLanguageTool:
+    """
+    공유 LanguageTool HTTP 서버에 keep-alive 커넥션 풀로 접속하는 경량 클라이언트.
+    language_tool_python.LanguageTool 과 같은 check()/close() 인터페이스를 제공하므로
+    LanguageToolExecutor 의 tool_factory 로 그대로 사용할 수 있습니다.
+    """
+
+    def __init__(self, url: str, language: str = "en-GB", pool_maxsize: int = 4, timeout: float = 10.0):
+        self.url = urllib.parse.urljoin(url.rstrip("/") + "/", "v2/")
+        self.language = language
+        self.timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_maxsize))
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def check(self, text: str) -> list:
+        response = self._session.post(
+            urllib.parse.urljoin(self.url, "check"),
+            data={"language": self.language, "text": text},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return [language_tool_python.Match(match, text) for match in response.json().get("matches", [])]
+
+    def is_healthy(self, timeout: float = 2.0) -> bool:
+        try:
+            response = self._session.get(urllib.parse.urljoin(self.url, "languages"), timeout=timeout)
+            return response.status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def close(self):
+        self._session.close()
+
+
+class LanguageToolServerSupervisor:
+    """
+    컨테이너당 하나의 LanguageTool HTTP 서버를 관리합니다.
+
+    - external_url 이 주어지면 (LANGUAGETOOL_URL) 해당 서버를 사용하고 헬스 체크만 수행합니다.
+    - 그렇지 않으면 lock 파일을 먼저 잡은 워커 하나만 LT 서버를 자식 프로세스로 띄우고,
+      나머지 워커는 같은 포트로 접속합니다. 서버가 죽으면 소유 워커가 재시작하고,
+      소유 워커 자체가 종료되면 다음 헬스 체크에서 다른 워커가 lock 을 넘겨받아 재시작합니다.
+    """
+
+    def __init__(
+        self,
+        external_url: Optional[str] = None,
+        port: int = 8081,
+        lock_path: str = "/tmp/languagetool-server.lock",
+        health_interval: float = 15.0,
+        startup_timeout: float = 120.0,
+        max_failures: int = 3,
+    ):
+        self.external_url = external_url
+        self.port = port
+        self.url = external_url or f"http://127.0.0.1:{port}"
+        self.lock_path = lock_path
+        self.health_interval = health_interval
+        self.startup_timeout = startup_timeout
+        self.max_failures = max_failures
+        self._probe = RemoteLanguageTool(self.url, pool_maxsize=1)
+        self._process: Optional[subprocess.Popen] = None
+        self._lock_file = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._failures = 0
+        self.restarts = 0
+        self.healthy = False
+
+    @property
+    def is_owner(self) -> bool:
+        return self._lock_file is not None
+
+    @property
+    def status(self) -> dict:
+        return {
+            "url": self.url,
+            "mode": "external" if self.external_url else "managed",
+            "owner": self.is_owner,
+            "pid": self._process.pid if self._process else None,
+            "healthy": self.healthy,
+            "consecutive_failures": self._failures,
+            "restarts": self.restarts,
+        }
+
+    def _try_acquire_lock(self) -> bool:
+        lock_file = open(self.lock_path, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _release_lock(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _spawn(self):
+        # LanguageTool 배포본이 없으면 먼저 다운로드합니다 (language_tool_python 캐시 경로 사용).
+        try:
+            language_tool_python.utils.get_language_tool_directory()
+        except (FileNotFoundError, NotADirectoryError):
+            download_lt()
+        cmd = language_tool_python.utils.get_server_cmd(self.port)
+        print(f"Starting shared LanguageTool server: {' '.join(cmd)}")
+        self._process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    def _terminate(self):
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
+
+    async def _wait_until_healthy(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.startup_timeout
+        while loop.time() < deadline:
+            if self._process is not None and self._process.poll() is not None:
+                raise RuntimeError(f"LanguageTool server exited with code {self._process.returncode}")
+            if await asyncio.to_thread(self._probe.is_healthy):
+                self.healthy = True
+                self._failures = 0
+                return
+            await asyncio.sleep(0.5)
+        raise RuntimeError(f"LanguageTool server at {self.url} did not become healthy in {self.startup_timeout}s")
+
+    async def _start_owned_server(self):
+        await asyncio.to_thread(self._spawn)
+        await self._wait_until_healthy()
+
+    async def start(self):
+        if not self.external_url and self._try_acquire_lock():
+            await self._start_owned_server()
+        else:
+            await self._wait_until_healthy()
+        print(f"LanguageTool server ready at {self.url} (owner={self.is_owner})")
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _restart(self):
+        print(f"Restarting LanguageTool server at {self.url}")
+        await asyncio.to_thread(self._terminate)
+        await self._start_owned_server()
+        self.restarts += 1
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                process_dead = self._process is not None and self._process.poll() is not None
+                self.healthy = not process_dead and await asyncio.to_thread(self._probe.is_healthy)
+                if self.healthy:
+                    self._failures = 0
+                    continue
+
+                self._failures += 1
+                print(f"LanguageTool health check failed ({self._failures}/{self.max_failures}) at {self.url}")
+                if self.external_url:
+                    continue
+                if self.is_owner and (process_dead or self._failures >= self.max_failures):
+                    await self._restart()
+                elif not self.is_owner and self._try_acquire_lock():
+                    # 기존 소유 워커가 종료되어 lock 이 풀렸으므로 이 워커가 서버를 넘겨받습니다.
+                    await self._restart()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"LanguageTool supervisor error: {e}")
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        await asyncio.to_thread(self._terminate)
+        self._release_lock()
+        self._probe.close()
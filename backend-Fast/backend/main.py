@@ -1,31 +1,203 @@
 # main.py
 from typing import Optional 
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
 import src.models as models
 from fastapi.middleware.cors import CORSMiddleware
-from .database import Base, engine, get_db
-import language_tool_python
-import requests
-import os
-import psycopg2 
+from fastapi.responses import StreamingResponse
+from .database import Base
+import httpx
 import json     
 import difflib  
-import datetime 
 import models
-from database import Base, engine, get_db
-from notion_oauth import router as notion_router   
+from database import Base, async_engine, AsyncSessionLocal, warm_pool, close_pool, pool_stats
+from notion_oauth import router as notion_router, save_jobs
 from user_routes import router as user_router # user_routes.py 임포트 (새로 생성 예정)
-
-models.Base.metadata.create_all(bind=engine)
+from config import (
+    LANGUAGETOOL_LANGUAGE, LT_POOL_SIZE, LT_MAX_PENDING, LT_CHECK_TIMEOUT,
+    LANGUAGETOOL_URL, LT_SHARED_SERVER, LT_SERVER_PORT, LT_SERVER_LOCK_FILE, LT_HEALTH_INTERVAL,
+    CORRECTION_CACHE_SIZE, CORRECTION_CACHE_TTL, CORRECTION_CACHE_PERSIST,
+    MAX_BATCH_SENTENCES,
+    GEMINI_API_KEY, GEMINI_MODEL, GEMINI_CONNECT_TIMEOUT, GEMINI_READ_TIMEOUT, GEMINI_MAX_RETRIES,
+    GEMINI_MAX_CONCURRENCY, GEMINI_BREAKER_THRESHOLD, GEMINI_BREAKER_COOLDOWN,
+    LLM_DETERMINISTIC, LLM_DETERMINISTIC_TEMPERATURE, LLM_CACHE_SIZE, LLM_CACHE_TTL, LLM_CACHE_PERSIST,
+    LLM_BATCH_ENABLED, LLM_BATCH_WINDOW_MS, LLM_BATCH_MAX_SIZE,
+    PATTERN_QUEUE_MAX, PATTERN_BATCH_SIZE, PATTERN_FLUSH_INTERVAL,
+    OFFLINE_DICT_ENABLED, OFFLINE_DICT_PATH, OFFLINE_DICT_WRITE_BACK, OFFLINE_DICT_COMPACT_THRESHOLD,
+    DEFINITION_CACHE_SIZE, DEFINITION_CACHE_TTL, DEFINITION_NEGATIVE_TTL, DEFINITION_CACHE_PERSIST,
+    DEFINE_BATCH_MAX, DEFINE_BATCH_CONCURRENCY,
+    SUGGEST_ENABLED, SUGGEST_WORDLIST_PATH, SUGGEST_MEMORY_BUDGET_MB, SUGGEST_MAX_RESULTS, SUGGEST_PRECOMPUTE_DEPTH,
+)
+from lt_executor import LanguageToolExecutor, LanguageToolBusyError, LanguageToolTimeoutError
+from lt_server import LanguageToolServerSupervisor, RemoteLanguageTool
+from correction_cache import CorrectionCache
+from segmentation import Segment, normalize_with_offsets, split_sentences
+from llm_client import GeminiClient, LLMUnavailableError
+from llm_cache import LLMRefinementCache
+from micro_batcher import MicroBatcher
+from migrations import run_migrations
+from pattern_writer import ErrorPatternWriter
+from http_client import outbound_http
+from notion_cache import integration_cache, token_validity_cache
+from notion_scheduler import notion_scheduler
+from notion_discovery import database_discovery
+from vocabulary_mirror import vocabulary_mirror
+from word_index import word_index
+from offline_dictionary import OfflineDictionary, normalize_key
+from definition_cache import DefinitionCache
+from suggest_index import SuggestIndex, build_suggest_index
 
 # from dotenv import load_dotenv
 # load_dotenv()
 
+# 공유 LT 서버 모드: 워커마다 JVM 을 띄우지 않고 컨테이너당 하나의 서버에 keep-alive 로 접속합니다.
+lt_server = None
+lt_tool_factory = None
+if LANGUAGETOOL_URL or LT_SHARED_SERVER:
+    lt_server = LanguageToolServerSupervisor(
+        external_url=LANGUAGETOOL_URL,
+        port=LT_SERVER_PORT,
+        lock_path=LT_SERVER_LOCK_FILE,
+        health_interval=LT_HEALTH_INTERVAL,
+    )
+    lt_client = RemoteLanguageTool(
+        lt_server.url, LANGUAGETOOL_LANGUAGE, pool_maxsize=LT_POOL_SIZE, timeout=LT_CHECK_TIMEOUT
+    )
+    lt_tool_factory = lambda: lt_client
+
+# LanguageTool executor: 검사를 이벤트 루프 밖의 인스턴스 풀에서 실행합니다.
+lt_executor = LanguageToolExecutor(
+    language=LANGUAGETOOL_LANGUAGE,
+    pool_size=LT_POOL_SIZE,
+    max_pending=LT_MAX_PENDING,
+    check_timeout=LT_CHECK_TIMEOUT,
+    tool_factory=lt_tool_factory,
+)
+
+# 반복 제출되는 문장의 LanguageTool 결과 캐시 (선택적으로 Postgres 에 영속화)
+correction_cache = CorrectionCache(
+    maxsize=CORRECTION_CACHE_SIZE,
+    ttl=CORRECTION_CACHE_TTL,
+    persist=CORRECTION_CACHE_PERSIST,
+    session_factory=AsyncSessionLocal,
+)
+
+# Gemini 클라이언트: 공유 HTTP 커넥션 풀 위에서 타임아웃, 재시도, 동시성 제한, circuit breaker
+gemini_client = GeminiClient(
+    api_key=GEMINI_API_KEY,
+    http=outbound_http,
+    model=GEMINI_MODEL,
+    connect_timeout=GEMINI_CONNECT_TIMEOUT,
+    read_timeout=GEMINI_READ_TIMEOUT,
+    max_retries=GEMINI_MAX_RETRIES,
+    max_concurrency=GEMINI_MAX_CONCURRENCY,
+    breaker_threshold=GEMINI_BREAKER_THRESHOLD,
+    breaker_cooldown=GEMINI_BREAKER_COOLDOWN,
+)
+
+# 정교화 프롬프트 템플릿 버전. build_refine_payload / build_batch_refine_payload 의 프롬프트를 바꾸면 반드시 올려서 캐시를 무효화합니다.
+REFINE_PROMPT_VERSION = "refine-v1"
+
+# 결정적 모드의 LLM 정교화 결과 캐시 (선택적으로 Postgres 에 영속화)
+llm_cache = LLMRefinementCache(
+    model=GEMINI_MODEL,
+    prompt_version=REFINE_PROMPT_VERSION,
+    maxsize=LLM_CACHE_SIZE,
+    ttl=LLM_CACHE_TTL,
+    persist=LLM_CACHE_PERSIST,
+    session_factory=AsyncSessionLocal,
+)
+
+# auto_error_patterns 기록용 write-behind 파이프라인 (generate_analysis_data 는 아래에 정의)
+pattern_writer = ErrorPatternWriter(
+    engine=async_engine,
+    build_analysis=lambda *sentences: generate_analysis_data(*sentences),
+    max_pending=PATTERN_QUEUE_MAX,
+    batch_size=PATTERN_BATCH_SIZE,
+    flush_interval=PATTERN_FLUSH_INTERVAL,
+)
+
+# /api/define 용 로컬 사전 (mmap). 없는 단어만 원격 사전 API 로 조회하고 결과를 다시 저장합니다.
+offline_dictionary = OfflineDictionary(
+    path=OFFLINE_DICT_PATH,
+    write_back=OFFLINE_DICT_WRITE_BACK,
+    compact_threshold=OFFLINE_DICT_COMPACT_THRESHOLD,
+) if OFFLINE_DICT_ENABLED else None
+
+# /api/define 최종 응답 캐시 (자주 찾는 단어는 사전 조회 없이 응답, 없는 단어도 잠시 기억)
+definition_cache = DefinitionCache(
+    maxsize=DEFINITION_CACHE_SIZE,
+    ttl=DEFINITION_CACHE_TTL,
+    negative_ttl=DEFINITION_NEGATIVE_TTL,
+    persist=DEFINITION_CACHE_PERSIST,
+    session_factory=AsyncSessionLocal,
+)
+
+# /api/suggest 용 접두어 색인 (lifespan 에서 단어 목록으로 생성)
+suggest_index = SuggestIndex(
+    memory_budget=int(SUGGEST_MEMORY_BUDGET_MB * 1024 * 1024),
+    max_results=SUGGEST_MAX_RESULTS,
+    precompute_depth=SUGGEST_PRECOMPUTE_DEPTH,
+) if SUGGEST_ENABLED else None
+# /api/suggest 의 limit 상한. 색인이 미리 계산해 두는 결과 수(SuggestIndex.max_results, 1~255) 와 같게 맞춥니다.
+SUGGEST_LIMIT_MAX = min(max(1, SUGGEST_MAX_RESULTS), 255)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await warm_pool() # 첫 요청이 연결 핸드셰이크를 기다리지 않도록 미리 연결을 엽니다.
+        async with async_engine.begin() as conn:
+            await conn.run_sync(models.Base.metadata.create_all) # ORM 테이블 생성 (공유 async 풀 사용)
+        await run_migrations(async_engine)
+    except Exception as e:
+        print(f"Database startup (pool warm-up / create_all / migration) failed: {e}")
+    if lt_server:
+        await lt_server.start()
+    await lt_executor.start()
+    await outbound_http.start() # Notion / Gemini / 사전 API 호출이 공유하는 커넥션 풀
+    await pattern_writer.start()
+    if offline_dictionary is not None:
+        offline_dictionary.open()
+    if suggest_index is not None:
+        # 자동완성을 켰는데 빈도 단어 목록이 없으면 시작하지 않습니다. 정렬/사전 계산은 이벤트 루프 밖에서 합니다.
+        await asyncio.to_thread(build_suggest_index, suggest_index, SUGGEST_WORDLIST_PATH)
+    try:
+        await integration_cache.start(async_engine)
+    except Exception as e:
+        print(f"Notion integration cache listener failed to start (TTL only): {e}")
+    try:
+        await save_jobs.start()
+    except Exception as e:
+        print(f"Notion save job workers failed to start: {e}")
+    purge_task = asyncio.gather(llm_cache.purge_stale(), definition_cache.purge_stale())
+    try:
+        yield
+    finally:
+        await purge_task
+        if refine_batcher is not None:
+            await refine_batcher.close()
+        await llm_cache.close()
+        await definition_cache.close()
+        await pattern_writer.close() # 남은 오류 패턴을 모두 기록한 뒤 종료
+        await save_jobs.close() # 진행 중인 Notion 쓰기를 마친 뒤 종료
+        await vocabulary_mirror.close()
+        await integration_cache.close()
+        await outbound_http.close()
+        if offline_dictionary is not None:
+            await offline_dictionary.close() # 원격에서 가져온 단어를 사전 파일에 합친 뒤 종료
+        await correction_cache.close()
+        await lt_executor.close()
+        if lt_server:
+            await lt_server.close()
+        await close_pool()
+
 app = FastAPI(
     title="Notion Vocabulary App Backend",
     description="FastAPI backend for Notion vocabulary integration with PostgreSQL.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 app.include_router(notion_router)
 app.include_router(user_router)
@@ -55,6 +227,18 @@ class DefinitionResponse(BaseModel):
     examples: list[str]
     phonetics: list[Phonetic]
 
+class DefinitionError(BaseModel):
+    status_code: int
+    detail: str
+
+class DefineBatchResponse(BaseModel):
+    results: dict[str, DefinitionResponse]
+    errors: dict[str, DefinitionError]
+
+class SuggestResponse(BaseModel):
+    prefix: str
+    suggestions: list[str]
+
 class SentenceRequest(BaseModel):
     sentence: str
     forceLLM: Optional[bool] = False
@@ -62,32 +246,23 @@ class SentenceRequest(BaseModel):
 class CorrectionResponse(BaseModel):
     correctedText: str
 
-# LanguageTool intialize
-tool = language_tool_python.LanguageTool('en-GB') 
-
-NOTION_API_TOKEN = models.NotionIntegration.notion_access_token
-NOTION_PARENT_PAGE_ID = models.NotionIntegration.selected_vocabulary_db_id
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
-
-DB_HOST = os.getenv("DB_HOST", "127.0.0.1") 
-DB_PORT = os.getenv("DB_PORT", "5432")                     
-DB_NAME = os.getenv("DB_NAME", "postgres")                 
-DB_USER = os.getenv("DB_USER", "postgres")                 
-DB_PASSWORD = os.getenv("DB_PASSWORD", "") 
+class BatchSentenceRequest(BaseModel):
+    sentences: Optional[list[str]] = None # 문장 목록 (각 항목을 그대로 한 문장으로 처리)
+    text: Optional[str] = None # 문단 (문장 단위로 분리하여 처리)
+    forceLLM: Optional[bool] = False
 
+class SentenceCorrection(CorrectionResponse):
+    inputIndex: int # sentences 의 인덱스 (text 입력이면 0)
+    start: int # 입력 문자열 기준 문장 시작 위치
+    end: int # 입력 문자열 기준 문장 끝 위치 (exclusive)
+    sentence: str # 공백 정규화된 원본 문장
+    matches: list[dict] # LanguageTool match (offset/errorLength 는 입력 문자열 기준)
 
-#define a function to get a database connection
-def get_db_connection():
-    """PostgreSQL 데이터베이스 연결을 반환합니다."""
-    return psycopg2.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        database=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD
-    )
+class BatchCorrectionResponse(BaseModel):
+    results: list[SentenceCorrection]
 
+NOTION_API_TOKEN = models.NotionIntegration.notion_access_token
+NOTION_PARENT_PAGE_ID = models.NotionIntegration.selected_vocabulary_db_id
 
 class CorrectionResponse(BaseModel):
     correctedText: str
@@ -136,7 +311,7 @@ class CorrectionResponse(BaseModel):
 #     response = requests.post(url, headers=headers, json=payload)
 #     return response.json()
 
-def create_notion_database2222ss(title: str, properties: dict) -> dict:
+async def create_notion_database2222ss(title: str, properties: dict) -> dict:
     try:
         url = "https://api.notion.com/v1/databases"
         headers = {
@@ -150,18 +325,16 @@ def create_notion_database2222ss(title: str, properties: dict) -> dict:
             "properties": properties
         }
         print("notion_parent_page_id:", NOTION_PARENT_PAGE_ID, "notion_api_token:", NOTION_API_TOKEN)
-        response = requests.post(url, headers=headers, json=payload)
+        response = await outbound_http.post(url, headers=headers, json=payload)
         if response.status_code != 200:
             raise HTTPException(status_code=response.status_code, detail=f"Notion API 오류: {response.text}")
         return response.json()
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Notion API 호출 실패: {e}")
 
 # --- Using LLm refine ---
-async def refine_with_llm(text: str) -> str:
-    """
-    Gemini API를 호출하여 주어진 문장의 문법을 개선하고 자연스럽게 다듬습니다.
-    """
+def build_refine_payload(text: str) -> dict:
+    """refine_with_llm / stream_refine_with_llm 이 공통으로 사용하는 Gemini 요청 payload 를 만듭니다."""
     prompt = (
         "You are an expert English grammar and style corrector."
         "Your task is to correct and refine the given sentence while strictly maintaining its original meaning and nuance."
@@ -170,9 +343,7 @@ async def refine_with_llm(text: str) -> str:
         f"Original: \"{text}\"\n\n"
     )
 
-    api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={GEMINI_API_KEY}"
-    
-    payload = {
+    return {
         "contents": [
             {
                 "role": "user",
@@ -180,32 +351,137 @@ async def refine_with_llm(text: str) -> str:
             }
         ],
         "generationConfig": {
-            "temperature": 0.7, # creativity setting (0.0 ~ 1.0)
+            # creativity setting (0.0 ~ 1.0). 결정적 모드에서는 낮은 temperature 로 같은 입력에 같은 결과를 얻어 캐시합니다.
+            "temperature": LLM_DETERMINISTIC_TEMPERATURE if LLM_DETERMINISTIC else 0.7,
             "maxOutputTokens": 200 # maximum output tokens
         }
     }
 
+def build_batch_refine_payload(texts: list[str]) -> dict:
+    """여러 문장을 한 번에 정교화하는 structured-output(JSON 배열) Gemini 요청 payload 를 만듭니다."""
+    numbered = "\n".join(f"{i + 1}. \"{text}\"" for i, text in enumerate(texts))
+    prompt = (
+        "You are an expert English grammar and style corrector."
+        "Your task is to correct and refine each of the given sentences independently while strictly maintaining its original meaning and nuance."
+        "Ensure each output is grammatically perfect, natural, and concise."
+        "If a sentence is already perfect, return it as is."
+        f"Return a JSON array of exactly {len(texts)} strings, in the same order as the input. \n\n"
+        f"Sentences:\n{numbered}\n\n"
+    )
+
+    return {
+        "contents": [
+            {
+                "role": "user",
+                "parts": [{"text": prompt}]
+            }
+        ],
+        "generationConfig": {
+            "temperature": LLM_DETERMINISTIC_TEMPERATURE if LLM_DETERMINISTIC else 0.7,
+            "maxOutputTokens": 200 * len(texts),
+            "responseMimeType": "application/json",
+            "responseSchema": {"type": "ARRAY", "items": {"type": "STRING"}},
+        }
+    }
+
+async def _refine_single(text: str) -> str:
+    """문장 하나를 Gemini 로 정교화합니다. 실패하면 원래 문장을 반환합니다."""
+    payload = build_refine_payload(text)
+
     try:
         print(f"Calling LLM API with payload: {payload}")
-        response = requests.post(api_url, json=payload)
-        response.raise_for_status() # HTTP error handling
+        result = await gemini_client.generate(payload)
 
-        result = response.json()
-        
         if result.get("candidates") and result["candidates"][0].get("content") and result["candidates"][0]["content"].get("parts"):
             refined_text = result["candidates"][0]["content"]["parts"][0]["text"]
+            if LLM_DETERMINISTIC:
+                llm_cache.set(payload, text, refined_text)
             return refined_text
         else:
             print(f"LLM response does not contained valid content: {result}")
             return text # LLM no valid content, return original text
 
-    except requests.exceptions.RequestException as e:
+    except LLMUnavailableError as e:
         print(f"LLM API call error: {e}")
         return text # error occurred, return original text
     except Exception as e:
         print(f"Unknown error during LLM response processing: {e}")
         return text # error occurred, return original text
 
+async def _refine_many(texts: list[str]) -> list[str]:
+    """
+    여러 문장을 한 번의 Gemini 호출로 정교화합니다.
+    응답이 올바른 JSON 배열이 아니면 ValueError/KeyError/TypeError 를 발생시켜 MicroBatcher 가 문장별 호출로 대체하도록 하고,
+    Gemini 장애(LLMUnavailableError)는 그대로 전달해 호출하는 쪽이 바로 LT 결과를 쓰도록 합니다.
+    """
+    payload = build_batch_refine_payload(texts)
+    print(f"Calling LLM API with batch of {len(texts)} sentences")
+    result = await gemini_client.generate(payload)
+    refined = json.loads(result["candidates"][0]["content"]["parts"][0]["text"])
+    if not isinstance(refined, list) or len(refined) != len(texts) or not all(isinstance(r, str) for r in refined):
+        raise ValueError(f"Malformed batch refinement response: {refined!r}")
+
+    if LLM_DETERMINISTIC:
+        # 문장 단위로 저장하되 batch variant 로 구분해, 단일 프롬프트 결과를 기대하는 스트리밍 요청에는 쓰이지 않게 합니다.
+        for text, refined_text in zip(texts, refined):
+            llm_cache.set(build_refine_payload(text), text, refined_text, variant="batch")
+    return refined
+
+# 동시에 들어온 정교화 요청을 짧은 window 동안 모아 한 번의 Gemini 호출로 보냅니다.
+refine_batcher = MicroBatcher(
+    process_one=_refine_single,
+    process_many=_refine_many,
+    window=LLM_BATCH_WINDOW_MS / 1000,
+    max_batch_size=LLM_BATCH_MAX_SIZE,
+) if LLM_BATCH_ENABLED else None
+
+async def refine_with_llm(text: str) -> str:
+    """
+    Gemini API를 호출하여 주어진 문장의 문법을 개선하고 자연스럽게 다듬습니다.
+    Gemini 가 불안정하면(circuit breaker open) 호출 없이 즉시 원래 문장(LT 결과)을 반환합니다.
+    """
+    if LLM_DETERMINISTIC:
+        payload = build_refine_payload(text)
+        cached = await llm_cache.get(payload)
+        if cached is None and refine_batcher is not None:
+            # 배치가 켜져 있으면 이 경로의 결과는 원래 어느 프롬프트로든 만들어질 수 있으므로 batch 결과도 씁니다.
+            cached = await llm_cache.get(payload, variant="batch")
+        if cached is not None:
+            return cached
+
+    if refine_batcher is None:
+        return await _refine_single(text)
+    try:
+        return await refine_batcher.submit(text)
+    except LLMUnavailableError as e:
+        # 배치 호출이 업스트림 장애로 실패하면 문장별로 다시 시도하지 않고 바로 LT 결과를 씁니다.
+        print(f"LLM API call error: {e}")
+        return text
+    except Exception as e:
+        print(f"Unknown error during LLM response processing: {e}")
+        return text
+
+async def stream_refine_with_llm(text: str):
+    """
+    Gemini streamGenerateContent(SSE) 를 호출하여 정교화된 문장을 조각(chunk) 단위로 yield 합니다.
+    """
+    payload = build_refine_payload(text)
+    if LLM_DETERMINISTIC:
+        cached = await llm_cache.get(payload)
+        if cached is not None:
+            yield cached
+            return
+
+    chunks = []
+    async for chunk in gemini_client.stream(payload):
+        for candidate in chunk.get("candidates", [])[:1]:
+            for part in candidate.get("content", {}).get("parts", []):
+                if part.get("text"):
+                    chunks.append(part["text"])
+                    yield part["text"]
+    if LLM_DETERMINISTIC and chunks:
+        llm_cache.set(payload, text, "".join(chunks))
+
 # --- 분석 데이터 JSON 객체 생성 함수 ---
 def generate_analysis_data(original: str, lt_corrected: str, llm_refined: str) -> dict:
     """
@@ -289,32 +565,190 @@ def prioritize_definitions(meanings: list[dict]) -> list[str]:
             
     return definitions
 
+def build_definition_response(entries: list[dict]) -> dict:
+    """Builds the DefinitionResponse body from dictionaryapi.dev entries (remote or offline)."""
+    entry = entries[0]
+    meanings = entry.get('meanings', [])
+    return {
+        "definition": prioritize_definitions(meanings),
+        "synonyms": list(set(s for m in meanings for s in m.get('synonyms', []))),
+        "examples": [d.get('example') for m in meanings for d in m.get('definitions', []) if d.get('example')][:3],
+        "phonetics": [p for p in entry.get("phonetics", []) if p.get("text") or p.get("audio")]
+    }
+
+async def fetch_definition(word: str) -> Optional[dict]:
+    """Looks a word up in the offline dictionary, then the remote API. Returns None if the word does not exist."""
+    entries = offline_dictionary.get(word) if offline_dictionary is not None else None
+    if entries:
+        return build_definition_response(entries)
+
+    api_url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
+    response = await outbound_http.get(api_url)
+
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    entries = response.json()
+    result = build_definition_response(entries)
+    if offline_dictionary is not None:
+        offline_dictionary.put(word, entries) # 다음 조회부터는 로컬 사전에서 응답
+    return result
+
 @app.post("/api/define", response_model=DefinitionResponse)
 async def define_word(request: WordRequest):
     """Brings the definition, synonyms, examples, and phonetics of a word."""
     try:
-        api_url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{request.word}"
-        response = requests.get(api_url)
-
-        if response.status_code == 404:
+        result = await definition_cache.lookup(request.word, fetch_definition)
+        if result is None:
             raise HTTPException(status_code=404, detail="단어를 찾을 수 없습니다.")
-        response.raise_for_status()
-        
-        entry = response.json()[0]
-        meanings = entry.get('meanings', [])
-        print("Example",[d.get('example') for m in meanings for d in m.get('definitions', []) if d.get('example')][:3])
-        return {
-            "definition": prioritize_definitions(meanings),
-            "synonyms": list(set(s for m in meanings for s in m.get('synonyms', []))),
-            "examples": [d.get('example') for m in meanings for d in m.get('definitions', []) if d.get('example')][:3],
-            "phonetics": [p for p in entry.get("phonetics", []) if p.get("text") or p.get("audio")]
-        }
+        return result
 
-    except requests.exceptions.RequestException as e:
+    except HTTPException:
+        raise
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"외부 사전 API 호출 실패: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 내부 오류: {e}")
 
+@app.post("/api/defineBatch", response_model=DefineBatchResponse)
+async def define_words(requests: list[WordRequest]):
+    """
+    Brings definitions for several words at once, keyed by the normalized (lower-cased) word.
+    Duplicates are looked up once, cached words are answered without I/O, and the rest are fetched
+    concurrently (at most DEFINE_BATCH_CONCURRENCY at a time). A failed word is reported in errors
+    without failing the batch.
+    """
+    words = list(dict.fromkeys(normalize_key(request.word) for request in requests if request.word.strip()))
+    if not words:
+        raise HTTPException(status_code=400, detail="단어를 하나 이상 보내주세요.")
+    if len(words) > DEFINE_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {DEFINE_BATCH_MAX}개 단어까지 조회할 수 있습니다.")
+
+    semaphore = asyncio.Semaphore(max(1, DEFINE_BATCH_CONCURRENCY))
+
+    async def bounded_fetch(word: str) -> Optional[dict]:
+        # 캐시 hit 은 슬롯을 쓰지 않고, 실제 사전 조회만 동시 실행 수를 제한합니다.
+        async with semaphore:
+            return await fetch_definition(word)
+
+    async def define_one(word: str):
+        try:
+            result = await definition_cache.lookup(word, bounded_fetch)
+            if result is None:
+                return word, None, {"status_code": 404, "detail": "단어를 찾을 수 없습니다."}
+            return word, result, None
+        except httpx.HTTPError as e:
+            return word, None, {"status_code": 502, "detail": f"외부 사전 API 호출 실패: {e}"}
+        except Exception as e:
+            return word, None, {"status_code": 500, "detail": f"서버 내부 오류: {e}"}
+
+    results, errors = {}, {}
+    for word, result, error in await asyncio.gather(*[define_one(word) for word in words]):
+        if error is None:
+            results[word] = result
+        else:
+            errors[word] = error
+    return {"results": results, "errors": errors}
+
+@app.get("/api/suggest", response_model=SuggestResponse)
+async def suggest_words(prefix: str = Query(..., min_length=1, max_length=100), limit: int = Query(min(10, SUGGEST_LIMIT_MAX), ge=1, le=SUGGEST_LIMIT_MAX)):
+    """Returns words starting with the prefix, most frequent first, from the in-memory suggest index."""
+    if suggest_index is None:
+        raise HTTPException(status_code=503, detail="자동완성이 비활성화되어 있습니다.")
+    return {"prefix": prefix, "suggestions": suggest_index.suggest(prefix, limit)}
+
+@app.get("/api/health/languagetool")
+async def languagetool_health():
+    """LanguageTool executor 및 공유 서버 상태를 반환합니다."""
+    status = {"executor": lt_executor.stats, "server": lt_server.status if lt_server else None}
+    if lt_server and not lt_server.healthy:
+        raise HTTPException(status_code=503, detail=status)
+    return status
+
+@app.get("/api/health/correction-cache")
+async def correction_cache_stats():
+    """문장 교정 캐시의 hit/miss/eviction 통계를 반환합니다."""
+    return correction_cache.stats
+
+async def correct_with_language_tool(sentence: str) -> tuple[list, str]:
+    """
+    LanguageTool 교정 결과 (직렬화된 matches, 교정된 문장) 를 반환합니다.
+    캐시를 먼저 확인하고, 미스 시 executor 풀에서 비동기로 검사합니다.
+    """
+    cached = await correction_cache.get(sentence, LANGUAGETOOL_LANGUAGE)
+    if cached is not None:
+        return cached["matches"], cached["corrected_text"]
+    try:
+        lt_matches, corrected = await lt_executor.correct(sentence)
+    except LanguageToolBusyError:
+        raise HTTPException(status_code=503, detail="문법 검사기가 혼잡합니다. 잠시 후 다시 시도해주세요.")
+    except LanguageToolTimeoutError:
+        raise HTTPException(status_code=504, detail="문법 검사 시간이 초과되었습니다.")
+    return correction_cache.set(sentence, LANGUAGETOOL_LANGUAGE, lt_matches, corrected)["matches"], corrected
+
+@app.get("/api/health/llm")
+async def llm_health():
+    """Gemini 클라이언트의 circuit breaker 상태와 호출 통계를 반환합니다."""
+    return {
+        "client": gemini_client.stats,
+        "cache": llm_cache.stats,
+        "batcher": refine_batcher.stats if refine_batcher is not None else None,
+    }
+
+@app.get("/api/health/error-patterns")
+async def error_pattern_writer_stats():
+    """오류 패턴 write-behind 대기열 통계(대기/병합/버림/flush)를 반환합니다."""
+    return pattern_writer.stats
+
+@app.get("/api/health/notion-cache")
+async def notion_cache_stats():
+    """NotionIntegration, 토큰 유효성, 데이터베이스 목록 캐시, 중복 단어 색인의 hit/miss/무효화 통계를 반환합니다."""
+    return {
+        "integrations": integration_cache.stats,
+        "token_validity": token_validity_cache.stats,
+        "databases": database_discovery.stats,
+        "word_index": word_index.stats,
+    }
+
+@app.get("/api/health/notion-scheduler")
+async def notion_scheduler_stats():
+    """Notion 호출 스케줄러의 대기열 길이, 대기 시간, 429/재시도 횟수를 반환합니다."""
+    return notion_scheduler.stats
+
+@app.get("/api/health/notion-jobs")
+async def notion_job_stats():
+    """백그라운드 Notion 저장 작업 큐의 대기/실행/성공/실패/중복 제거 통계를 반환합니다."""
+    return save_jobs.stats
+
+@app.get("/api/health/vocabulary-mirror")
+async def vocabulary_mirror_stats():
+    """로컬 단어장 미러의 전체/증분 동기화 횟수, write-through, 오류 통계를 반환합니다."""
+    return vocabulary_mirror.stats
+
+@app.get("/api/health/dictionary")
+async def offline_dictionary_stats():
+    """로컬 사전(단어 수, 파일 크기, write-back 대기 수) 과 응답 캐시(hit/miss, negative hit, 합쳐진 조회 수) 통계를 반환합니다."""
+    offline = {"enabled": False} if offline_dictionary is None else {"enabled": True, **offline_dictionary.stats}
+    return {"offline": offline, "cache": definition_cache.stats}
+
+@app.get("/api/health/suggest")
+async def suggest_index_stats():
+    """자동완성 색인의 단어 수, 메모리 사용량/예산, 평균 조회 시간을 반환합니다."""
+    if suggest_index is None:
+        return {"enabled": False}
+    return {"enabled": True, **suggest_index.stats}
+
+@app.get("/api/health/http")
+async def outbound_http_stats():
+    """외부 HTTP 호출의 호스트별 호출 수/오류 수/latency(avg, p50, p95, max) 를 반환합니다."""
+    return outbound_http.stats
+
+@app.get("/api/health/db")
+async def db_pool_health():
+    """공유 DB 커넥션 풀 지표(열린/유휴/사용 중 연결, 누적 연결/체크아웃 수)를 반환합니다."""
+    return pool_stats()
+
 # --- main API endpoint ---
 @app.post("/api/correctSentence", response_model=CorrectionResponse)
 async def correct_sentence(req: SentenceRequest):
@@ -323,8 +757,7 @@ async def correct_sentence(req: SentenceRequest):
     print(f"Received sentence for correction (Original): {original_sentence}")
 
     # 1단계: LanguageTool을 이용한 기본 문법 및 철자 교정
-    matches = tool.check(original_sentence)
-    language_tool_corrected = language_tool_python.utils.correct(original_sentence, matches)
+    matches, language_tool_corrected = await correct_with_language_tool(original_sentence)
     print(f"LanguageTool matches found: {matches}")
     print(f"Sentence after LanguageTool correction: {language_tool_corrected}")
 
@@ -337,62 +770,119 @@ async def correct_sentence(req: SentenceRequest):
     else:
         return {"correctedText": language_tool_corrected}
 
+    # 오류 패턴 기록은 write-behind 대기열에 넣고 DB 를 기다리지 않습니다.
+    pattern_writer.enqueue(original_sentence, language_tool_corrected, final_corrected_sentence)
 
-    # --- Database logic start ---
-    conn = None # 연결 객체를 초기화합니다.
-    try:
-        # 1. analysis_data JSON generate
-        analysis_data = generate_analysis_data(
-            original_sentence,
-            language_tool_corrected,
-            final_corrected_sentence
-        )
-        
-        # 2. DB connection
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        # 3. save analysis_data to auto_error_patterns table
-        # original_sentence와 llm_refined_sentence are used to check if the pattern already exists
-        cur.execute("""
-            SELECT id, occurrence_count
-            FROM auto_error_patterns
-            WHERE (analysis_data->>'original_sentence') = %s
-              AND (analysis_data->>'llm_refined_sentence') = %s;
-        """, (original_sentence, final_corrected_sentence))
-        
-        existing_pattern = cur.fetchone()
-
-        if existing_pattern:
-            # if the pattern already exists, update the occurrence count
-            pattern_id, current_count = existing_pattern
-            new_count = current_count + 1
-            cur.execute("""
-                UPDATE auto_error_patterns
-                SET occurrence_count = %s, detected_at = %s
-                WHERE id = %s;
-            """, (new_count, datetime.datetime.now(datetime.timezone.utc), pattern_id))
-            print(f"Existing pattern updated (ID: {pattern_id}, New count: {new_count})")
-        else:
-            # new pattern, insert it
-            cur.execute("""
-                INSERT INTO auto_error_patterns (analysis_data, detected_at, occurrence_count)
-                VALUES (%s, %s, %s);
-            """, (json.dumps(analysis_data), datetime.datetime.now(datetime.timezone.utc), 1))
-            print("New pattern inserted")
-
-        conn.commit() # execute the transaction
-
-    except psycopg2.Error as e:
-        print(f"Database operation error: {e}")
-        if conn:
-            conn.rollback() # rollback the transaction on error
-    except Exception as e:
-        print(f"An unexpected error occurred during database operation: {e}")
-    finally:
-        if conn:
-            conn.close() # close the connection to the database
+    return {"correctedText": final_corrected_sentence}
 
+@app.post("/api/correctSentences", response_model=BatchCorrectionResponse)
+async def correct_sentences(req: BatchSentenceRequest):
+    """
+    여러 문장(sentences) 또는 문단(text)을 한 번에 교정합니다.
+    캐시에 없는 문장은 한 번의 LanguageTool 호출로 함께 검사하고,
+    forceLLM 이면 LLM 정교화를 문장별로 동시에 수행합니다.
+    """
+    if req.sentences is None and req.text is None:
+        raise HTTPException(status_code=400, detail="sentences 또는 text 중 하나가 필요합니다.")
+
+    # 1. 문장 분리 (각 문장의 입력 기준 위치를 함께 보관)
+    if req.sentences is not None:
+        segments = []
+        for input_index, raw in enumerate(req.sentences):
+            text, index_map = normalize_with_offsets(raw)
+            if text:
+                segments.append(Segment(input_index, index_map[0], index_map[-1] + 1, text, index_map))
+    else:
+        segments = split_sentences(req.text)
+
+    if len(segments) > MAX_BATCH_SENTENCES:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {MAX_BATCH_SENTENCES}개 문장까지 교정할 수 있습니다.")
+
+    # 2. 캐시 조회 후, 남은 문장(중복 제거)만 한 번에 LanguageTool 검사
+    lt_results = {}
+    for segment in segments:
+        if segment.text not in lt_results:
+            cached = await correction_cache.get(segment.text, LANGUAGETOOL_LANGUAGE)
+            if cached is not None:
+                lt_results[segment.text] = cached
+
+    missing = list(dict.fromkeys(segment.text for segment in segments if segment.text not in lt_results))
+    if missing:
+        try:
+            batch = await lt_executor.correct_batch(missing)
+        except LanguageToolBusyError:
+            raise HTTPException(status_code=503, detail="문법 검사기가 혼잡합니다. 잠시 후 다시 시도해주세요.")
+        except LanguageToolTimeoutError:
+            raise HTTPException(status_code=504, detail="문법 검사 시간이 초과되었습니다.")
+        for text, (lt_matches, corrected) in zip(missing, batch):
+            lt_results[text] = correction_cache.set(text, LANGUAGETOOL_LANGUAGE, lt_matches, corrected)
+
+    lt_corrected = [lt_results[segment.text]["corrected_text"] or segment.text for segment in segments]
+
+    # 3. LLM 정교화 (같은 문장은 한 번만 호출하여 동시에 실행)
+    final_sentences = lt_corrected
+    if req.forceLLM:
+        unique_texts = list(dict.fromkeys(lt_corrected))
+        refined = dict(zip(unique_texts, await asyncio.gather(*[refine_with_llm(text) for text in unique_texts])))
+        final_sentences = [refined[text] for text in lt_corrected]
+        for segment, corrected, final in zip(segments, lt_corrected, final_sentences):
+            pattern_writer.enqueue(segment.text, corrected, final)
+
+    # 4. match 위치를 입력 문자열 기준으로 되돌려 응답 생성
+    results = []
+    for segment, final in zip(segments, final_sentences):
+        matches = []
+        for match in lt_results[segment.text]["matches"]:
+            start, end = segment.to_input_span(match["offset"], match["errorLength"])
+            matches.append({**match, "offset": start, "errorLength": end - start})
+        results.append({
+            "correctedText": final,
+            "inputIndex": segment.input_index,
+            "start": segment.start,
+            "end": segment.end,
+            "sentence": segment.text,
+            "matches": matches,
+        })
+    return {"results": results}
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.post("/api/correctSentence/stream")
+async def correct_sentence_stream(req: SentenceRequest):
+    """
+    /api/correctSentence 의 스트리밍(SSE) 버전.
+    - event: lt        LanguageTool 교정 결과 (준비되는 즉시 전송)
+    - event: llm_delta forceLLM 일 때 Gemini 정교화 결과 조각
+    - event: done      최종 문장과 generate_analysis_data 결과
+    """
+    original_sentence = req.sentence
+    # LT 오류(503/504)는 스트림 시작 전에 일반 HTTP 오류로 반환합니다.
+    matches, language_tool_corrected = await correct_with_language_tool(original_sentence)
 
-    return {"correctedText": final_corrected_sentence}
+    async def event_stream():
+        yield sse_event("lt", {"correctedText": language_tool_corrected, "matches": matches})
+        if not req.forceLLM:
+            yield sse_event("done", {"correctedText": language_tool_corrected, "analysis": None})
+            return
 
+        text_to_refine = language_tool_corrected if language_tool_corrected else original_sentence
+        chunks = []
+        try:
+            async for chunk in stream_refine_with_llm(text_to_refine):
+                chunks.append(chunk)
+                yield sse_event("llm_delta", {"text": chunk})
+            final_corrected_sentence = "".join(chunks) or text_to_refine
+        except Exception as e:
+            print(f"LLM streaming error: {e}")
+            final_corrected_sentence = text_to_refine # error occurred, fall back to LT result
+
+        analysis_data = generate_analysis_data(original_sentence, language_tool_corrected, final_corrected_sentence)
+        yield sse_event("done", {"correctedText": final_corrected_sentence, "analysis": analysis_data})
+        pattern_writer.enqueue(original_sentence, language_tool_corrected, final_corrected_sentence)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
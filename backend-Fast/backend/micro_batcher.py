@@ -0,0 +1,101 @@
+# micro_batcher.py
+import asyncio
+from typing import Awaitable, Callable, Hashable, Optional
+
+# process_many 응답 형식이 잘못됐을 때의 예외 (json.JSONDecodeError 는 ValueError 의 하위 클래스)
+# TypeError: "text": null 이나 dict 가 아닌 part 처럼 구조가 어긋난 응답을 인덱싱/파싱할 때 발생합니다.
+SHAPE_ERRORS = (ValueError, KeyError, IndexError, TypeError)
+
+
+class MicroBatcher:
+    """
+    짧은 시간(window) 동안 동시에 들어온 요청을 모아 한 번에 처리하고, 결과를 각 호출자에게 나눠줍니다.
+
+    - window 초가 지나거나 max_batch_size 개가 모이면 flush 합니다.
+    - 같은 항목은 배치 안에서 한 번만 처리합니다.
+    - process_many 의 응답 형식이 잘못되면(fallback_errors) 항목별 process_one 호출로 대체합니다.
+      그 외 예외(업스트림 장애 등)는 항목별로 다시 시도하지 않고 모든 호출자에게 그대로 전달합니다.
+    """
+
+    def __init__(
+        self,
+        process_one: Callable[[Hashable], Awaitable],
+        process_many: Callable[[list], Awaitable[list]],
+        window: float = 0.02,
+        max_batch_size: int = 16,
+        fallback_errors: tuple = SHAPE_ERRORS,
+    ):
+        self.process_one = process_one
+        self.process_many = process_many
+        self.window = window
+        self.max_batch_size = max(1, max_batch_size)
+        self.fallback_errors = fallback_errors
+        self._pending: list[tuple[Hashable, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self.batches = 0
+        self.batched_items = 0
+        self.single_calls = 0
+        self.fallbacks = 0
+
+    async def submit(self, item: Hashable):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list):
+        items = list(dict.fromkeys(item for item, _ in batch))
+        try:
+            if len(items) == 1:
+                self.single_calls += 1
+                results = [await self.process_one(items[0])]
+            else:
+                try:
+                    results = await self.process_many(items)
+                    if len(results) != len(items):
+                        raise ValueError(f"expected {len(items)} results, got {len(results)}")
+                    self.batches += 1
+                    self.batched_items += len(items)
+                except self.fallback_errors as e:
+                    print(f"Micro-batch failed, falling back to per-item calls: {e}")
+                    self.fallbacks += 1
+                    results = await asyncio.gather(*[self.process_one(item) for item in items])
+            by_item = dict(zip(items, results))
+            for item, future in batch:
+                if not future.done():
+                    future.set_result(by_item[item])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def close(self):
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "batched_items": self.batched_items,
+            "avg_batch_size": round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+            "single_calls": self.single_calls,
+            "fallbacks": self.fallbacks,
+        }
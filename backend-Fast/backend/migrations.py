@@ -0,0 +1,98 @@
+# migrations.py
+"""
+ORM(create_all) 으로 관리하지 않는 raw SQL 테이블의 스키마 마이그레이션과,
+create_all 이 이미 만든 ORM 테이블에 나중에 추가된 컬럼의 마이그레이션.
+각 마이그레이션은 schema_migrations 테이블에 기록되어 한 번만 적용되며,
+여러 워커가 동시에 기동해도 advisory lock 으로 직렬화됩니다.
+"""
+import hashlib
+
+from sqlalchemy import text
+
+# 여러 워커가 동시에 마이그레이션하지 않도록 잡는 advisory lock 키 (임의의 고정값)
+MIGRATION_LOCK_KEY = 7_340_211
+
+# pattern_key 를 만들 때 원본 문장과 LLM 정교화 문장 사이에 넣는 구분자 (unit separator)
+PATTERN_KEY_SEPARATOR = "\x1f"
+
+
+def error_pattern_key(original_sentence: str, llm_refined_sentence: str) -> str:
+    """auto_error_patterns.pattern_key 값. 001 마이그레이션의 SQL 계산식과 동일해야 합니다."""
+    material = f"{original_sentence}{PATTERN_KEY_SEPARATOR}{llm_refined_sentence}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+MIGRATIONS = [
+    (
+        "001_auto_error_patterns_pattern_key",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS auto_error_patterns (
+                id SERIAL PRIMARY KEY,
+                analysis_data JSONB NOT NULL,
+                detected_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                occurrence_count INTEGER NOT NULL DEFAULT 1
+            );
+            """,
+            "ALTER TABLE auto_error_patterns ADD COLUMN IF NOT EXISTS pattern_key CHAR(64);",
+            """
+            UPDATE auto_error_patterns
+            SET pattern_key = encode(sha256(convert_to(
+                coalesce(analysis_data->>'original_sentence', '') || chr(31) ||
+                coalesce(analysis_data->>'llm_refined_sentence', ''), 'UTF8')), 'hex')
+            WHERE pattern_key IS NULL;
+            """,
+            # 유니크 인덱스를 만들기 전에 기존 중복 행을 합칩니다 (가장 오래된 행에 횟수를 합산).
+            """
+            WITH totals AS (
+                SELECT pattern_key, MIN(id) AS keep_id, SUM(occurrence_count) AS total, MAX(detected_at) AS last_seen
+                FROM auto_error_patterns
+                GROUP BY pattern_key
+                HAVING COUNT(*) > 1
+            )
+            UPDATE auto_error_patterns p
+            SET occurrence_count = t.total, detected_at = t.last_seen
+            FROM totals t
+            WHERE p.id = t.keep_id;
+            """,
+            """
+            DELETE FROM auto_error_patterns p
+            USING auto_error_patterns keep
+            WHERE p.pattern_key = keep.pattern_key AND p.id > keep.id;
+            """,
+            "ALTER TABLE auto_error_patterns ALTER COLUMN pattern_key SET NOT NULL;",
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS auto_error_patterns_pattern_key_uidx
+            ON auto_error_patterns (pattern_key);
+            """,
+        ],
+    ),
+    (
+        "002_notion_vocabulary_sync_state_full_sync_started_at",
+        [
+            "ALTER TABLE notion_vocabulary_sync_state ADD COLUMN IF NOT EXISTS full_sync_started_at TIMESTAMPTZ;",
+        ],
+    ),
+]
+
+
+async def run_migrations(engine):
+    """공유 async engine 의 연결 하나에서 아직 적용되지 않은 마이그레이션을 순서대로 적용합니다."""
+    async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        await conn.exec_driver_sql("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version TEXT PRIMARY KEY,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+        """)
+        result = await conn.execute(text("SELECT version FROM schema_migrations"))
+        applied = {row[0] for row in result}
+
+        for version, statements in MIGRATIONS:
+            if version in applied:
+                continue
+            for statement in statements:
+                await conn.exec_driver_sql(statement)
+            await conn.execute(text("INSERT INTO schema_migrations (version) VALUES (:version)"), {"version": version})
+            print(f"Applied migration {version}")
@@ -1,7 +1,8 @@
 # models.py
 import uuid
-from sqlalchemy import Column, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+import datetime
+from sqlalchemy import Column, String, Text, DateTime, Integer, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy import ForeignKey
 
@@ -36,3 +37,93 @@ class NotionIntegration(Base):
 
     user = relationship("User", back_populates="notion_integration")
 
+class CorrectionCacheEntry(Base):
+    """
+    LanguageTool 교정 결과의 영속 캐시.
+    정규화된 문장과 언어의 해시(cache_key)를 기준으로 인스턴스 간에 공유됩니다.
+    """
+    __tablename__ = "lt_correction_cache"
+
+    cache_key = Column(String(64), primary_key=True) # sha256(language + 정규화된 문장)
+    language = Column(String, nullable=False)
+    sentence = Column(Text, nullable=False)
+    corrected_text = Column(Text, nullable=False)
+    matches = Column(JSONB, nullable=False) # 직렬화된 LanguageTool match 목록
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+class LLMRefinementCacheEntry(Base):
+    """
+    결정적(deterministic) 모드의 Gemini 정교화 결과 캐시.
+    cache_key 는 프롬프트, 모델, generationConfig 의 해시이며, prompt_version 이 바뀌면 이전 항목은 정리됩니다.
+    """
+    __tablename__ = "llm_refinement_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False, index=True)
+    source_text = Column(Text, nullable=False) # 정교화 대상 문장 (LT 교정 결과)
+    refined_text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+class DefinitionCacheEntry(Base):
+    """
+    /api/define 응답 캐시. word 는 정규화된(소문자) 단어이고,
+    response 가 NULL 이면 사전에 없는 단어(404) 를 기록한 negative 항목입니다.
+    """
+    __tablename__ = "definition_cache"
+
+    word = Column(String, primary_key=True)
+    response = Column(JSONB(none_as_null=True), nullable=True) # DefinitionResponse 본문
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+class NotionSaveJob(Base):
+    """
+    백그라운드로 처리되는 Notion 단어 저장 작업.
+    (user_id, idempotency_key) 가 유일하므로 클라이언트가 같은 요청을 다시 보내도 페이지가 중복 생성되지 않습니다.
+    """
+    __tablename__ = "notion_save_jobs"
+    __table_args__ = (UniqueConstraint("user_id", "idempotency_key", name="notion_save_jobs_user_key_uniq"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    idempotency_key = Column(String(255), nullable=False)
+    status = Column(String(16), nullable=False, default="queued", index=True) # queued / running / succeeded / failed
+    word = Column(Text, nullable=False)
+    definition = Column(Text, nullable=False)
+    synonyms = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    page_id = Column(String, nullable=True) # 생성된 Notion 페이지 ID
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+    updated_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+class NotionVocabularyEntry(Base):
+    """
+    사용자 Notion 단어장 데이터베이스 페이지의 로컬 사본.
+    목록/개수/중복 확인을 Notion 대신 Postgres 에서 처리하기 위해 동기화됩니다.
+    """
+    __tablename__ = "notion_vocabulary_entries"
+    __table_args__ = (Index("notion_vocabulary_entries_user_db_idx", "user_id", "database_id"),)
+
+    page_id = Column(String, primary_key=True) # Notion 페이지 ID
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    database_id = Column(String, nullable=False)
+    word = Column(Text, nullable=False)
+    definition = Column(Text, nullable=False, default="")
+    synonyms = Column(Text, nullable=False, default="")
+    last_edited_time = Column(DateTime(timezone=True), nullable=False) # Notion 의 last_edited_time
+    synced_at = Column(DateTime(timezone=True), nullable=False, default=lambda: datetime.datetime.now(datetime.timezone.utc))
+
+class NotionVocabularySyncState(Base):
+    """
+    사용자별 단어장 동기화 상태. last_edited_watermark 이후에 수정된 페이지만 증분 동기화합니다.
+    full_sync_started_at 은 끝나지 않은 전체 동기화의 시작 시각으로, 다음 동기화가 watermark 부터 이어 받습니다.
+    """
+    __tablename__ = "notion_vocabulary_sync_state"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    database_id = Column(String, nullable=False)
+    last_edited_watermark = Column(DateTime(timezone=True), nullable=True)
+    last_synced_at = Column(DateTime(timezone=True), nullable=True)
+    last_full_sync_at = Column(DateTime(timezone=True), nullable=True)
+    full_sync_started_at = Column(DateTime(timezone=True), nullable=True)
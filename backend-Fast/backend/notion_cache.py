@@ -0,0 +1,158 @@
+# notion_cache.py
+import hashlib
+import uuid
+from dataclasses import dataclass, fields
+from typing import Optional
+
+from sqlalchemy import text
+
+import models
+from config import NOTION_INTEGRATION_CACHE_SIZE, NOTION_INTEGRATION_CACHE_TTL, NOTION_INTEGRATION_CACHE_SHARED
+from config import NOTION_TOKEN_VALID_TTL, NOTION_TOKEN_INVALID_TTL
+from ttl_cache import TTLCache
+
+# 인스턴스 간 무효화 알림에 사용하는 Postgres NOTIFY 채널
+INVALIDATION_CHANNEL = "notion_integration_changed"
+
+
+@dataclass(frozen=True)
+class NotionIntegrationSnapshot:
+    """캐시에 보관하는 NotionIntegration 행의 읽기 전용 복사본 (세션과 분리되어 요청 간에 공유해도 안전)."""
+    user_id: uuid.UUID
+    notion_access_token: str
+    notion_workspace_id: Optional[str]
+    notion_user_id: Optional[str]
+    notion_user_name: Optional[str]
+    notion_user_avatar_url: Optional[str]
+    selected_vocabulary_db_id: Optional[str]
+
+    @classmethod
+    def from_model(cls, integration: models.NotionIntegration) -> "NotionIntegrationSnapshot":
+        return cls(**{f.name: getattr(integration, f.name) for f in fields(cls)})
+
+
+class NotionIntegrationCache:
+    """
+    app_user_id 별 NotionIntegration 조회 결과 캐시.
+
+    - 프로세스 내 LRU/TTL 캐시 (TTLCache). 히트 시 DB 왕복이 없습니다.
+    - exchange_notion_token / set_vocabulary_db 가 쓸 때 put() 으로 즉시 갱신(write-through)합니다.
+    - shared=True 이면 쓰기 트랜잭션에서 pg_notify 로 변경을 알리고, 각 인스턴스는 LISTEN 으로 받아
+      자기 캐시의 해당 항목을 버립니다. 알림을 놓치더라도 TTL 이 지나면 다시 조회합니다.
+    연동 정보가 없는 사용자(None) 는 캐시하지 않습니다.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: Optional[float] = 300, shared: bool = False):
+        self.shared = shared
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._instance_id = uuid.uuid4().hex # 자기 자신이 보낸 알림은 무시하기 위한 식별자
+        self._listen_conn = None
+        self.invalidations = 0
+        self.remote_invalidations = 0
+
+    async def get(self, db, app_user_id) -> Optional[NotionIntegrationSnapshot]:
+        """캐시된 연동 정보를 반환하고, 없으면 db 세션으로 조회해 채웁니다."""
+        key = str(app_user_id)
+        snapshot = self._memory.get(key)
+        if snapshot is not None:
+            return snapshot
+        integration = await db.get(models.NotionIntegration, app_user_id)
+        return self.put(integration) if integration is not None else None
+
+    def put(self, integration: models.NotionIntegration) -> NotionIntegrationSnapshot:
+        """커밋된 NotionIntegration 행으로 캐시를 갱신합니다 (write-through)."""
+        snapshot = NotionIntegrationSnapshot.from_model(integration)
+        self._memory.set(str(snapshot.user_id), snapshot)
+        return snapshot
+
+    def invalidate(self, app_user_id):
+        if self._memory.pop(str(app_user_id)) is not None:
+            self.invalidations += 1
+
+    async def notify(self, db, app_user_id):
+        """쓰기 트랜잭션 안에서 호출합니다. 커밋될 때 다른 인스턴스에 무효화 알림이 전달됩니다."""
+        if self.shared:
+            await db.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": INVALIDATION_CHANNEL, "payload": f"{self._instance_id}:{app_user_id}"},
+            )
+
+    def _on_notification(self, connection, pid, channel, payload):
+        sender, _, app_user_id = payload.partition(":")
+        if sender != self._instance_id and self._memory.pop(app_user_id) is not None:
+            self.remote_invalidations += 1
+
+    async def start(self, engine):
+        """shared 모드에서 engine 의 연결 하나를 점유해 무효화 채널을 LISTEN 합니다."""
+        if not self.shared or self._listen_conn is not None:
+            return
+        self._listen_conn = await engine.connect()
+        raw = await self._listen_conn.get_raw_connection()
+        await raw.driver_connection.add_listener(INVALIDATION_CHANNEL, self._on_notification)
+
+    async def close(self):
+        if self._listen_conn is not None:
+            raw = await self._listen_conn.get_raw_connection()
+            await raw.driver_connection.remove_listener(INVALIDATION_CHANNEL, self._on_notification)
+            await self._listen_conn.close()
+            self._listen_conn = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            **self._memory.stats,
+            "shared": self.shared,
+            "listening": self._listen_conn is not None,
+            "invalidations": self.invalidations,
+            "remote_invalidations": self.remote_invalidations,
+        }
+
+
+def token_fingerprint(access_token: str) -> str:
+    """토큰 원문을 메모리에 키로 남기지 않도록 sha256 지문을 사용합니다."""
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+
+class NotionTokenValidityCache:
+    """
+    Notion access_token 유효성 검사(/v1/users/me) 결과 캐시.
+
+    - 유효한 토큰은 valid_ttl 초 동안 기억해 재연결 시 외부 호출 없이 바로 리다이렉트합니다.
+    - 거부된 토큰(401/403) 은 invalid_ttl 초 동안만 기억합니다.
+    - 어떤 Notion 호출이든 401 을 받으면 invalidate() 로 즉시 무효 상태로 바꿉니다.
+    """
+
+    def __init__(self, maxsize: int = 10000, valid_ttl: float = 600, invalid_ttl: float = 30):
+        self.valid_ttl = valid_ttl
+        self.invalid_ttl = invalid_ttl
+        self._memory = TTLCache(maxsize=maxsize)
+        self.invalidations = 0
+
+    def get(self, access_token: str) -> Optional[bool]:
+        """캐시된 유효성(True/False) 을 반환하고, 모르면 None 을 반환합니다."""
+        return self._memory.get(token_fingerprint(access_token))
+
+    def set(self, access_token: str, valid: bool):
+        self._memory.set(token_fingerprint(access_token), valid, ttl=self.valid_ttl if valid else self.invalid_ttl)
+
+    def invalidate(self, access_token: str):
+        """Notion 이 이 토큰을 거부(401)했을 때 호출합니다."""
+        self.invalidations += 1
+        self.set(access_token, False)
+
+    @property
+    def stats(self) -> dict:
+        return {**self._memory.stats, "invalidations": self.invalidations}
+
+
+integration_cache = NotionIntegrationCache(
+    maxsize=NOTION_INTEGRATION_CACHE_SIZE,
+    ttl=NOTION_INTEGRATION_CACHE_TTL,
+    shared=NOTION_INTEGRATION_CACHE_SHARED,
+)
+
+token_validity_cache = NotionTokenValidityCache(
+    maxsize=NOTION_INTEGRATION_CACHE_SIZE,
+    valid_ttl=NOTION_TOKEN_VALID_TTL,
+    invalid_ttl=NOTION_TOKEN_INVALID_TTL,
+)
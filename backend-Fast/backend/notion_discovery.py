@@ -0,0 +1,119 @@
+# notion_discovery.py
+import asyncio
+from typing import AsyncIterator, Optional
+
+from config import NOTION_DATABASES_CACHE_SIZE, NOTION_DATABASES_CACHE_TTL, NOTION_DATABASES_MAX_PAGES
+from notion_cache import token_fingerprint
+from notion_scheduler import NotionScheduler, notion_scheduler
+from ttl_cache import TTLCache
+
+NOTION_SEARCH_URL = "https://api.notion.com/v1/search"
+
+
+def database_summary(result: dict) -> dict:
+    """/v1/search 결과의 database 객체를 {"id", "title"} 로 줄입니다."""
+    title_property = result.get("title", [])
+    database_title = ""
+    if title_property and isinstance(title_property, list):
+        database_title = "".join([text_obj.get("plain_text", "") for text_obj in title_property])
+    return {
+        "id": result.get("id"),
+        "title": database_title if database_title else "Untitled Database"
+    }
+
+
+class NotionDatabaseDiscovery:
+    """
+    사용자가 접근할 수 있는 Notion 데이터베이스 목록 조회.
+
+    - /v1/search 를 next_cursor 가 없을 때까지 따라가므로 100개가 넘는 워크스페이스도 잘리지 않습니다.
+    - 결과는 (workspace, access_token) 별로 짧은 TTL 동안 캐시합니다. 같은 워크스페이스라도
+      연동(토큰)마다 공유받은 페이지가 다르므로 토큰 지문까지 키에 포함합니다.
+    - 같은 키에 대한 동시 조회는 하나의 검색으로 합칩니다 (single-flight).
+    """
+
+    def __init__(self, scheduler: NotionScheduler, maxsize: int = 1000, ttl: float = 120, max_pages: int = 50):
+        self.scheduler = scheduler
+        self.max_pages = max(1, max_pages)
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self.searches = 0
+        self.pages_fetched = 0
+        self.truncated = 0
+
+    @staticmethod
+    def _key(access_token: str, workspace_id: Optional[str]) -> str:
+        return f"{workspace_id or '-'}:{token_fingerprint(access_token)}"
+
+    async def iter_pages(self, access_token: str) -> AsyncIterator[list[dict]]:
+        """/v1/search(database) 결과를 페이지(최대 100개) 단위로 yield 합니다."""
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+            "Notion-Version": "2022-06-28"
+        }
+        payload = {"filter": {"property": "object", "value": "database"}, "page_size": 100}
+        for _ in range(self.max_pages):
+            response = await self.scheduler.post(access_token, NOTION_SEARCH_URL, idempotent=True, headers=headers, json=payload)
+            response.raise_for_status()
+            self.pages_fetched += 1
+            data = response.json()
+            yield [database_summary(result) for result in data.get("results", []) if result.get("object") == "database"]
+            if not data.get("has_more") or not data.get("next_cursor"):
+                return
+            payload = {**payload, "start_cursor": data["next_cursor"]}
+        self.truncated += 1
+        print(f"Notion database discovery stopped after {self.max_pages} pages")
+
+    async def _search(self, key: str, access_token: str) -> list[dict]:
+        self.searches += 1
+        databases = []
+        async for page in self.iter_pages(access_token):
+            databases.extend(page)
+        self._memory.set(key, databases)
+        return databases
+
+    async def list_databases(self, access_token: str, workspace_id: Optional[str], refresh: bool = False) -> list[dict]:
+        """캐시된 데이터베이스 목록을 반환하고, 없거나 refresh=True 이면 전체 페이지를 다시 조회합니다."""
+        key = self._key(access_token, workspace_id)
+        if not refresh:
+            cached = self._memory.get(key)
+            if cached is not None:
+                return cached
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._search(key, access_token))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._search_done(key, done))
+        return await asyncio.shield(future)
+
+    def _search_done(self, key: str, future: asyncio.Future):
+        """
+        검색이 끝나면 in-flight 에서 빼고 실패를 기록합니다.
+        shield 밖의 호출자가 모두 취소된 경우에도 예외를 여기서 꺼내므로 "Task exception was never retrieved" 가 남지 않습니다.
+        """
+        self._in_flight.pop(key, None)
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Notion database discovery failed: {future.exception()!r}")
+
+    def invalidate(self, access_token: str, workspace_id: Optional[str]):
+        """데이터베이스를 새로 만든 경우 등 목록이 바뀌었을 때 캐시를 버립니다."""
+        self._memory.pop(self._key(access_token, workspace_id))
+
+    @property
+    def stats(self) -> dict:
+        return {
+            **self._memory.stats,
+            "searches": self.searches,
+            "pages_fetched": self.pages_fetched,
+            "truncated": self.truncated,
+            "in_flight": len(self._in_flight),
+        }
+
+
+database_discovery = NotionDatabaseDiscovery(
+    scheduler=notion_scheduler,
+    maxsize=NOTION_DATABASES_CACHE_SIZE,
+    ttl=NOTION_DATABASES_CACHE_TTL,
+    max_pages=NOTION_DATABASES_MAX_PAGES,
+)
@@ -0,0 +1,189 @@
+# notion_jobs.py
+import asyncio
+import datetime
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+import models
+
+
+class PermanentJobError(Exception):
+    """재시도해도 성공할 수 없는 실패 (연동 정보 없음, Notion 4xx 등). 작업을 바로 failed 로 끝냅니다."""
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class NotionSaveJobQueue:
+    """
+    Notion 단어 저장을 요청 경로에서 분리하는 백그라운드 작업 큐.
+
+    - 작업은 Postgres 테이블 notion_save_jobs 에 기록되므로 재시작이나 인스턴스 간에도 상태를 조회할 수 있습니다.
+    - (user_id, idempotency_key) 가 같은 제출은 새 작업을 만들지 않고 기존 작업을 돌려줍니다.
+    - workers 개의 asyncio 작업자가 process() 로 Notion 에 쓰고, 일시적 오류는 max_attempts 까지 재시도합니다.
+    - 작업 시작은 UPDATE ... WHERE status='queued' 로 선점하므로 같은 작업이 두 번 실행되지 않습니다.
+      stale_after 초 넘게 running 에 머문 작업(처리 중 프로세스가 죽은 경우)은 다시 선점할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        process: Callable[[uuid.UUID, str, str, str], Awaitable[Optional[str]]],
+        workers: int = 4,
+        max_attempts: int = 3,
+        retry_backoff: float = 2.0,
+        stale_after: float = 300.0,
+    ):
+        self._session_factory = session_factory
+        self._process = process
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.stale_after = stale_after
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._retry_timers: dict = {}
+        self._closing = False
+        self.submitted = 0
+        self.deduplicated = 0
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._closing = False
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        # 이전 프로세스가 남긴 미완료 작업을 다시 대기열에 넣습니다.
+        jobs = models.NotionSaveJob
+        async with self._session_factory() as db:
+            result = await db.execute(select(jobs.id).where(self._claimable()).order_by(jobs.created_at))
+            pending = result.scalars().all()
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending:
+            print(f"Resumed {len(pending)} pending Notion save job(s)")
+
+    def _claimable(self):
+        jobs = models.NotionSaveJob
+        stale_cutoff = _now() - datetime.timedelta(seconds=self.stale_after)
+        return or_(jobs.status == "queued", (jobs.status == "running") & (jobs.updated_at < stale_cutoff))
+
+    async def submit(self, db, app_user_id: uuid.UUID, idempotency_key: str, word: str, definition: str, synonyms: str):
+        """작업을 등록하고 (작업, 새로 만들었는지 여부) 를 반환합니다."""
+        jobs = models.NotionSaveJob
+        statement = (
+            insert(jobs)
+            .values(
+                id=uuid.uuid4(), user_id=app_user_id, idempotency_key=idempotency_key, status="queued",
+                word=word, definition=definition, synonyms=synonyms, attempts=0,
+                created_at=_now(), updated_at=_now(),
+            )
+            .on_conflict_do_nothing(constraint="notion_save_jobs_user_key_uniq")
+            .returning(jobs.id)
+        )
+        job_id = (await db.execute(statement)).scalar()
+        await db.commit()
+        if job_id is None:
+            self.deduplicated += 1
+            existing = await db.execute(
+                select(jobs).where(jobs.user_id == app_user_id, jobs.idempotency_key == idempotency_key)
+            )
+            return existing.scalars().one(), False
+        self.submitted += 1
+        self._queue.put_nowait(job_id)
+        return await db.get(jobs, job_id), True
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            if job_id is None or self._closing:
+                return # 종료 중: 남은 작업은 DB 에 queued 로 남아 다음 기동 시 처리됩니다.
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                print(f"Notion save job {job_id} crashed: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _update(self, job_id: uuid.UUID, **values):
+        async with self._session_factory() as db:
+            await db.execute(update(models.NotionSaveJob).where(models.NotionSaveJob.id == job_id).values(updated_at=_now(), **values))
+            await db.commit()
+
+    async def _run_job(self, job_id: uuid.UUID):
+        jobs = models.NotionSaveJob
+        async with self._session_factory() as db:
+            result = await db.execute(
+                update(jobs)
+                .where(jobs.id == job_id, self._claimable())
+                .values(status="running", attempts=jobs.attempts + 1, updated_at=_now())
+                .returning(jobs.user_id, jobs.word, jobs.definition, jobs.synonyms, jobs.attempts)
+            )
+            job = result.first()
+            await db.commit()
+        if job is None:
+            return # 이미 다른 작업자/인스턴스가 처리 중이거나 끝난 작업
+
+        self.running += 1
+        try:
+            page_id = await self._process(job.user_id, job.word, job.definition, job.synonyms)
+        except Exception as e:
+            if isinstance(e, PermanentJobError) or job.attempts >= self.max_attempts:
+                self.failed += 1
+                await self._update(job_id, status="failed", error=str(e))
+            else:
+                self.retries += 1
+                await self._update(job_id, status="queued", error=str(e))
+                self._schedule_retry(job_id, self.retry_backoff * (2 ** (job.attempts - 1)))
+            return
+        finally:
+            self.running -= 1
+        self.succeeded += 1
+        await self._update(job_id, status="succeeded", page_id=page_id, error=None)
+
+    def _schedule_retry(self, job_id: uuid.UUID, delay: float):
+        self._retry_timers[job_id] = asyncio.get_running_loop().call_later(delay, self._requeue, job_id)
+
+    def _requeue(self, job_id: uuid.UUID):
+        self._retry_timers.pop(job_id, None)
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+
+    async def close(self):
+        """
+        새 작업을 꺼내지 않고, 진행 중인 Notion 쓰기가 끝날 때까지 기다린 뒤 작업자를 멈춥니다.
+        (쓰기 도중에 취소하면 페이지가 만들어졌는데 작업이 다시 실행될 수 있기 때문입니다.)
+        대기 중인 작업은 DB 에 queued 로 남아 다음 기동 시 다시 처리됩니다.
+        """
+        if not self._tasks:
+            return
+        self._closing = True
+        for timer in self._retry_timers.values():
+            timer.cancel()
+        self._retry_timers.clear()
+        for _ in self._tasks:
+            self._queue.put_nowait(None) # 대기 중인 작업자를 깨웁니다.
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self.running,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retries": self.retries,
+        }
@@ -1,24 +1,59 @@
-from fastapi import APIRouter, Request, HTTPException, Depends, Query
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi import APIRouter, Request, HTTPException, Depends, Query, Header
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
+import asyncio
+import json
 import httpx
 from pydantic import BaseModel
 import base64
-from config import NOTION_CLIENT_ID, NOTION_CLIENT_SECRET, NOTION_REDIRECT_URI
+from config import NOTION_CLIENT_ID, NOTION_CLIENT_SECRET, NOTION_REDIRECT_URI, NOTION_SAVE_BATCH_MAX
+from config import NOTION_JOB_WORKERS, NOTION_JOB_MAX_ATTEMPTS
 import uuid
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, AsyncSessionLocal
 import models
-from typing import Optional 
+from http_client import outbound_http
+from notion_cache import integration_cache, token_validity_cache
+from notion_scheduler import notion_scheduler
+from notion_jobs import NotionSaveJobQueue, PermanentJobError
+from notion_discovery import database_discovery
+from vocabulary_mirror import vocabulary_mirror
+from word_index import WordIndexUnavailableError, word_index
+from typing import Literal, Optional 
 
 router = APIRouter(
     prefix="/api/notion",
     tags=["Notion Integration"],
 )
 
+async def check_notion_token(access_token: str, app_user_id) -> bool:
+    """
+    /v1/users/me 로 토큰 유효성을 확인하고 결과를 token_validity_cache 에 기록합니다.
+    네트워크 오류나 Notion 측 일시 오류(429/5xx) 는 캐시하지 않습니다.
+    """
+    notion_api_test_url = "https://api.notion.com/v1/users/me" # 간단한 API 호출로 토큰 유효성 검사
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Notion-Version": "2022-06-28"
+    }
+    try:
+        test_response = await notion_scheduler.get(access_token, notion_api_test_url, headers=headers)
+        test_response.raise_for_status() # 2xx 응답이 아니면 예외 발생
+        print(f"Notion token for user {app_user_id} is valid.")
+        token_validity_cache.set(access_token, True)
+        return True
+    except httpx.HTTPStatusError as e:
+        print(f"Notion token for user {app_user_id} is invalid or expired: {e.response.status_code} - {e.response.text}")
+        if e.response.status_code in (401, 403):
+            token_validity_cache.set(access_token, False)
+    except Exception as e:
+        print(f"Error checking Notion token validity for user {app_user_id}: {e}")
+    return False
+
 @router.get("/connect-notion")
 async def connect_notion(
     app_user_id: Optional[uuid.UUID] = Query(None), # app_user_id를 선택적 쿼리 파라미터로 추가
-    db_session: Session = Depends(get_db) # DB 세션 추가
+    db_session: AsyncSession = Depends(get_async_db) # DB 세션 추가
 ):
     """
     Notion OAuth 인증 흐름을 시작하거나,
@@ -28,28 +63,17 @@ async def connect_notion(
 
     if app_user_id:
         # 1. app_user_id가 제공되면 DB에서 Notion 연동 정보 조회
-        notion_integration = db_session.query(models.NotionIntegration).filter_by(user_id=app_user_id).first()
+        notion_integration = await integration_cache.get(db_session, app_user_id)
 
         if notion_integration and notion_integration.notion_access_token and notion_integration.selected_vocabulary_db_id:
-            # 2. Notion access_token이 유효한지 Notion API를 통해 확인 (옵션)
-            # 이 단계는 네트워크 요청이 발생하므로, 필요에 따라 생략하거나 더 가벼운 검증으로 대체할 수 있습니다.
-            notion_api_test_url = "https://api.notion.com/v1/users/me" # 간단한 API 호출로 토큰 유효성 검사
-            headers = {
-                "Authorization": f"Bearer {notion_integration.notion_access_token}",
-                "Notion-Version": "2022-06-28"
-            }
-            async with httpx.AsyncClient() as client:
-                try:
-                    test_response = await client.get(notion_api_test_url, headers=headers)
-                    test_response.raise_for_status() # 2xx 응답이 아니면 예외 발생
-                    print(f"Notion token for user {app_user_id} is valid.")
-                    return RedirectResponse(f"http://localhost:3000/session-restore?app_user_id={app_user_id}")
-                except httpx.HTTPStatusError as e:
-                    print(f"Notion token for user {app_user_id} is invalid or expired: {e.response.status_code} - {e.response.text}")
-                    # 토큰이 유효하지 않으면 OAuth 흐름으로 진행
-                except Exception as e:
-                    print(f"Error checking Notion token validity for user {app_user_id}: {e}")
-                    # 오류 발생 시에도 OAuth 흐름으로 진행
+            # 2. Notion access_token이 유효한지 확인. 최근 검증 결과가 캐시에 있으면 외부 호출 없이 결정합니다.
+            access_token = notion_integration.notion_access_token
+            token_valid = token_validity_cache.get(access_token)
+            if token_valid is None:
+                token_valid = await check_notion_token(access_token, app_user_id)
+            if token_valid:
+                return RedirectResponse(f"http://localhost:3000/session-restore?app_user_id={app_user_id}")
+            # 토큰이 유효하지 않거나 확인하지 못하면 OAuth 흐름으로 진행
 
     # app_user_id가 없거나, Notion 연동 정보가 없거나, 토큰이 유효하지 않은 경우
     # Notion OAuth 인증 URL로 리다이렉트
@@ -68,17 +92,16 @@ async def notion_callback(request: Request):
     code = request.query_params.get("code")
     token_url = "https://api.notion.com/v1/oauth/token"
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            token_url,
-            data={
-                "grant_type": "authorization_code",
-                "code": code,
-                "redirect_uri": NOTION_REDIRECT_URI,
-            },
-            auth=(NOTION_CLIENT_ID, NOTION_CLIENT_SECRET),
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
+    response = await outbound_http.post(
+        token_url,
+        data={
+            "grant_type": "authorization_code",
+            "code": code,
+            "redirect_uri": NOTION_REDIRECT_URI,
+        },
+        auth=(NOTION_CLIENT_ID, NOTION_CLIENT_SECRET),
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
 
     token_data = response.json()
     access_token = token_data.get("access_token")
@@ -94,7 +117,7 @@ class CodePayload(BaseModel):
     code: str
 
 @router.post("/exchange-token")
-async def exchange_notion_token(payload: CodePayload, db_session: Session = Depends(get_db)):
+async def exchange_notion_token(payload: CodePayload, db_session: AsyncSession = Depends(get_async_db)):
     """
     Notion OAuth 코드를 Notion access_token으로 교환하고,
     접근 가능한 데이터베이스 목록을 조회하며, 사용자 Notion 정보를 DB에 저장/업데이트합니다.
@@ -116,139 +139,167 @@ async def exchange_notion_token(payload: CodePayload, db_session: Session = Depe
         "redirect_uri": NOTION_REDIRECT_URI
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            # 1. Notion OAuth 토큰 교환
-            response = await client.post(token_url, headers=headers, json=data)
-            response.raise_for_status()
-            notion_data = response.json()
-
-            access_token = notion_data.get("access_token")
-            workspace_id = notion_data.get("workspace_id")
-            owner_info = notion_data.get("owner", {})
-            notion_user_id = owner_info.get("user", {}).get("id")
-            notion_user_name = owner_info.get("user", {}).get("name", "Unknown User")
-            notion_user_avatar_url = owner_info.get("user", {}).get("avatar_url", "")
-
-            print("Notion Token Exchange Response:", notion_data)
-
-            # 2. 앱 내부 사용자 생성 또는 조회 및 Notion 연동 정보 저장/업데이트
-            # Notion user ID를 기준으로 사용자 조회
-            notion_integration_exists = db_session.query(models.NotionIntegration).filter(
-                models.NotionIntegration.notion_user_id == notion_user_id
-            ).first()
-
-            user_obj = None
-            if notion_integration_exists:
-                user_obj = db_session.query(models.User).filter_by(id=notion_integration_exists.user_id).first()
-                # 기존 NotionIntegration 업데이트
-                notion_integration_exists.notion_access_token = access_token
-                notion_integration_exists.notion_workspace_id = workspace_id
-                notion_integration_exists.notion_user_name = notion_user_name
-                notion_integration_exists.notion_user_avatar_url = notion_user_avatar_url
-                db_session.add(notion_integration_exists)
-                notion_integration = notion_integration_exists
-            else:
-                # 새로운 사용자 생성
-                user_obj = models.User(name=notion_user_name, avatar_url=notion_user_avatar_url)
-                db_session.add(user_obj)
-                db_session.flush() # ID를 얻기 위해 flush
-
-                notion_integration = models.NotionIntegration(
-                    user_id=user_obj.id,
-                    notion_access_token=access_token,
-                    notion_workspace_id=workspace_id,
-                    notion_user_id=notion_user_id,
-                    notion_user_name=notion_user_name,
-                    notion_user_avatar_url=notion_user_avatar_url
-                )
-                db_session.add(notion_integration)
+    discovery_task = None
+    try:
+        # 1. Notion OAuth 토큰 교환
+        response = await outbound_http.post(token_url, headers=headers, json=data)
+        response.raise_for_status()
+        notion_data = response.json()
+
+        access_token = notion_data.get("access_token")
+        workspace_id = notion_data.get("workspace_id")
+        owner_info = notion_data.get("owner", {})
+        notion_user_id = owner_info.get("user", {}).get("id")
+        notion_user_name = owner_info.get("user", {}).get("name", "Unknown User")
+        notion_user_avatar_url = owner_info.get("user", {}).get("avatar_url", "")
+
+        print("Notion Token Exchange Response:", notion_data)
+
+        # 데이터베이스 검색(페이지네이션 포함)은 아래 사용자 저장과 동시에 진행합니다.
+        discovery_task = asyncio.create_task(database_discovery.list_databases(access_token, workspace_id, refresh=True))
+
+        # 2. 앱 내부 사용자 생성 또는 조회 및 Notion 연동 정보 저장/업데이트
+        # Notion user ID를 기준으로 사용자 조회
+        notion_integration_exists = (await db_session.execute(
+            select(models.NotionIntegration).where(models.NotionIntegration.notion_user_id == notion_user_id)
+        )).scalars().first()
+
+        user_obj = None
+        if notion_integration_exists:
+            user_obj = await db_session.get(models.User, notion_integration_exists.user_id)
+            # 기존 NotionIntegration 업데이트
+            notion_integration_exists.notion_access_token = access_token
+            notion_integration_exists.notion_workspace_id = workspace_id
+            notion_integration_exists.notion_user_name = notion_user_name
+            notion_integration_exists.notion_user_avatar_url = notion_user_avatar_url
+            db_session.add(notion_integration_exists)
+            notion_integration = notion_integration_exists
+        else:
+            # 새로운 사용자 생성
+            user_obj = models.User(name=notion_user_name, avatar_url=notion_user_avatar_url)
+            db_session.add(user_obj)
+            await db_session.flush() # ID를 얻기 위해 flush
+
+            notion_integration = models.NotionIntegration(
+                user_id=user_obj.id,
+                notion_access_token=access_token,
+                notion_workspace_id=workspace_id,
+                notion_user_id=notion_user_id,
+                notion_user_name=notion_user_name,
+                notion_user_avatar_url=notion_user_avatar_url
+            )
+            db_session.add(notion_integration)
             
-            db_session.commit()
-            db_session.refresh(user_obj)
-
-            # 3. 획득한 access_token으로 Notion 워크스페이스 내 데이터베이스 검색
-            search_url = "https://api.notion.com/v1/search"
-            search_headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json",
-                "Notion-Version": "2022-06-28"
-            }
-            search_payload = {
-                "filter": {
-                    "property": "object",
-                    "value": "database"
-                },
-                "page_size": 100
-            }
+        await db_session.flush()
+        await integration_cache.notify(db_session, notion_integration.user_id)
+        await db_session.commit()
+        await db_session.refresh(user_obj)
+        integration_cache.put(notion_integration) # write-through
+        token_validity_cache.set(access_token, True) # 방금 발급된 토큰이므로 다음 connect 에서 검증을 생략합니다.
 
-            search_response = await client.post(search_url, headers=search_headers, json=search_payload)
-            search_response.raise_for_status()
-            search_results = search_response.json()
-
-            accessible_databases = []
-            for result in search_results.get("results", []):
-                if result.get("object") == "database":
-                    title_property = result.get("title", [])
-                    database_title = ""
-                    if title_property and isinstance(title_property, list):
-                        database_title = "".join([text_obj.get("plain_text", "") for text_obj in title_property])
-                    
-                    accessible_databases.append({
-                        "id": result.get("id"),
-                        "title": database_title if database_title else "Untitled Database"
-                    })
-
-            return JSONResponse(content={
-                "message": "Notion token exchanged successfully and databases fetched",
-                "app_user_id": str(user_obj.id),
-                "user_name": user_obj.name,
-                "user_avatar": user_obj.avatar_url,
-                "accessible_databases": accessible_databases
-            })
+        # 3. 획득한 access_token으로 Notion 워크스페이스 내 데이터베이스 검색 결과를 기다립니다.
+        accessible_databases = await discovery_task
 
-        except httpx.HTTPStatusError as e:
-            db_session.rollback()
-            print(f"Error during Notion token exchange or database search: {e.response.status_code} - {e.response.text}")
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=f"Failed to exchange Notion token or search databases: {e.response.text}"
-            )
-        except Exception as e:
-            db_session.rollback()
-            print(f"An unexpected error occurred: {e}")
-            raise HTTPException(status_code=500, detail="Internal server error during Notion process")
+        return JSONResponse(content={
+            "message": "Notion token exchanged successfully and databases fetched",
+            "app_user_id": str(user_obj.id),
+            "user_name": user_obj.name,
+            "user_avatar": user_obj.avatar_url,
+            "accessible_databases": accessible_databases
+        })
+
+    except httpx.HTTPStatusError as e:
+        if discovery_task is not None:
+            discovery_task.cancel()
+        await db_session.rollback()
+        print(f"Error during Notion token exchange or database search: {e.response.status_code} - {e.response.text}")
+        raise HTTPException(
+            status_code=e.response.status_code,
+            detail=f"Failed to exchange Notion token or search databases: {e.response.text}"
+        )
+    except Exception as e:
+        if discovery_task is not None:
+            discovery_task.cancel()
+        await db_session.rollback()
+        print(f"An unexpected error occurred: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error during Notion process")
 
 class SetDatabasePayload(BaseModel):
     database_id: str
     app_user_id: uuid.UUID
 
+# 이미 저장된 단어(정규화 기준) 를 다시 저장할 때의 처리: 건너뛰기 / 기존 페이지에 합치기 / 새 페이지 만들기
+DuplicatePolicy = Literal["skip", "merge", "create"]
+
 class SavePayload(BaseModel):
     word: str
     definition: str
     synonyms: str
     app_user_id: uuid.UUID 
+    on_duplicate: DuplicatePolicy = "skip"
+
+@router.get("/databases")
+async def list_notion_databases(
+    app_user_id: uuid.UUID,
+    cursor: Optional[str] = Query(None),
+    page_size: int = Query(100, ge=1, le=500),
+    refresh: bool = Query(False),
+    db_session: AsyncSession = Depends(get_async_db),
+):
+    """
+    사용자가 접근할 수 있는 Notion 데이터베이스 목록을 페이지 단위로 반환합니다.
+    목록은 워크스페이스별로 잠시 캐시되며, refresh=true 이면 Notion 에서 다시 조회합니다.
+    """
+    notion_integration = await integration_cache.get(db_session, app_user_id)
+    if not notion_integration or not notion_integration.notion_access_token:
+        raise HTTPException(status_code=401, detail="Notion integration not found for this user. Please connect Notion.")
+    try:
+        offset = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+    try:
+        databases = await database_discovery.list_databases(
+            notion_integration.notion_access_token, notion_integration.notion_workspace_id, refresh=refresh
+        )
+    except httpx.HTTPStatusError as e:
+        print(f"Error listing Notion databases: {e.response.status_code} - {e.response.text}")
+        raise HTTPException(status_code=e.response.status_code, detail=f"Failed to search databases: {e.response.text}")
+
+    page = databases[offset:offset + page_size]
+    has_more = offset + page_size < len(databases)
+    return JSONResponse(content={
+        "databases": page,
+        "total": len(databases),
+        "has_more": has_more,
+        "next_cursor": str(offset + page_size) if has_more else None,
+    })
 
 @router.post("/set-vocabulary-db")
-async def set_vocabulary_db(payload: SetDatabasePayload, db_session: Session = Depends(get_db)):
+async def set_vocabulary_db(payload: SetDatabasePayload, db_session: AsyncSession = Depends(get_async_db)):
     """
     사용자가 선택한 Notion 데이터베이스 ID를 백엔드 DB에 저장합니다.
     """
-    notion_integration = db_session.query(models.NotionIntegration).filter_by(user_id=payload.app_user_id).first()
+    # 쓰기 경로이므로 캐시가 아닌 DB 의 행을 직접 읽어 수정합니다.
+    notion_integration = await db_session.get(models.NotionIntegration, payload.app_user_id)
 
     if not notion_integration:
         raise HTTPException(status_code=404, detail="Notion integration not found for this user.")
 
     notion_integration.selected_vocabulary_db_id = payload.database_id
-    db_session.commit()
-    db_session.refresh(notion_integration)
+    await integration_cache.notify(db_session, payload.app_user_id)
+    await db_session.commit()
+    await db_session.refresh(notion_integration)
+    integration_cache.put(notion_integration) # write-through
+    # 새로 선택한 단어장을 로컬 미러로 전체 동기화합니다 (백그라운드).
+    vocabulary_mirror.schedule_sync(payload.app_user_id, notion_integration.notion_access_token, payload.database_id, full=True)
 
     print(f"User {payload.app_user_id} selected vocabulary DB: {payload.database_id}")
     return JSONResponse(content={"message": "Vocabulary database set successfully!"})
 
 
 @router.post("/createNotionDB")
-async def create_notion_db(request: Request, db_session: Session = Depends(get_db)):
+async def create_notion_db(request: Request, db_session: AsyncSession = Depends(get_async_db)):
     """
     Creates a new Notion database for the authenticated user and returns its ID and title.
     Requires an active Notion access token for the user.
@@ -264,7 +315,7 @@ async def create_notion_db(request: Request, db_session: Session = Depends(get_d
         print(f"Creating Notion database for app_user_id: {app_user_id}")
         
         # Retrieve the Notion access token for the given app_user_id
-        notion_integration = db_session.query(models.NotionIntegration).filter_by(user_id=app_user_id).first()
+        notion_integration = await integration_cache.get(db_session, app_user_id)
 
         if not notion_integration or not notion_integration.notion_access_token:
             raise HTTPException(status_code=401, detail="Notion access token not found for this user. Please connect Notion.")
@@ -278,82 +329,82 @@ async def create_notion_db(request: Request, db_session: Session = Depends(get_d
             "Notion-Version": "2022-06-28"
         }
         
-        async with httpx.AsyncClient() as client:
-            # 1. Search for an existing page to use as a parent
-            search_pages_payload = {
-                "filter": {
-                    "property": "object",
-                    "value": "page"
-                },
-                "page_size": 1 # Just need one to act as a parent
-            }
+        # 1. Search for an existing page to use as a parent
+        search_pages_payload = {
+            "filter": {
+                "property": "object",
+                "value": "page"
+            },
+            "page_size": 1 # Just need one to act as a parent
+        }
             
-            print(f"Attempting Notion search for pages with headers: {headers} and payload: {search_pages_payload}")
-            search_pages_response = await client.post("https://api.notion.com/v1/search", headers=headers, json=search_pages_payload)
+        print(f"Attempting Notion search for pages with headers: {headers} and payload: {search_pages_payload}")
+        search_pages_response = await notion_scheduler.post(access_token, "https://api.notion.com/v1/search", idempotent=True, headers=headers, json=search_pages_payload)
             
-            print(f"Notion search for pages response status: {search_pages_response.status_code}")
-            print(f"Notion search for pages response headers: {search_pages_response.headers}")
-            print(f"Notion search for pages response text: {search_pages_response.text}")
+        print(f"Notion search for pages response status: {search_pages_response.status_code}")
+        print(f"Notion search for pages response headers: {search_pages_response.headers}")
+        print(f"Notion search for pages response text: {search_pages_response.text}")
             
-            search_pages_response.raise_for_status()
-            search_pages_results = search_pages_response.json()
+        search_pages_response.raise_for_status()
+        search_pages_results = search_pages_response.json()
 
-            print(f"Notion search results JSON: {search_pages_results}")
+        print(f"Notion search results JSON: {search_pages_results}")
             
-            parent_page_id = None
-            if search_pages_results.get("results"):
-                for result in search_pages_results["results"]:
-                    if result.get("object") == "page":
-                        parent_page_id = result["id"]
-                        break # Found a parent page
-
-            if not parent_page_id:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No accessible Notion pages found to create a new database under. Please ensure your Notion integration has access to at least one page."
-                )
-
-            # 2. Create the new Notion database as a child of the found parent page
-            new_db_data = {
-                "parent": {"page_id": parent_page_id},
-                "title": [
-                    {
-                        "type": "text",
-                        "text": {
-                            "content": "My New Vocabulary List" # Default name for the new database
-                        }
-                    }
-                ],
-                "properties": {
-                    "Word": {
-                        "title": {}
-                    },
-                    "Definition": {
-                        "rich_text": {}
-                    },
-                    "Synonyms": {
-                        "rich_text": {}
+        parent_page_id = None
+        if search_pages_results.get("results"):
+            for result in search_pages_results["results"]:
+                if result.get("object") == "page":
+                    parent_page_id = result["id"]
+                    break # Found a parent page
+
+        if not parent_page_id:
+            raise HTTPException(
+                status_code=400,
+                detail="No accessible Notion pages found to create a new database under. Please ensure your Notion integration has access to at least one page."
+            )
+
+        # 2. Create the new Notion database as a child of the found parent page
+        new_db_data = {
+            "parent": {"page_id": parent_page_id},
+            "title": [
+                {
+                    "type": "text",
+                    "text": {
+                        "content": "My New Vocabulary List" # Default name for the new database
                     }
                 }
+            ],
+            "properties": {
+                "Word": {
+                    "title": {}
+                },
+                "Definition": {
+                    "rich_text": {}
+                },
+                "Synonyms": {
+                    "rich_text": {}
+                }
             }
+        }
 
-            create_db_response = await client.post(notion_api_url, headers=headers, json=new_db_data)
-            create_db_response.raise_for_status()
-            new_notion_db = create_db_response.json()
+        create_db_response = await notion_scheduler.post(access_token, notion_api_url, headers=headers, json=new_db_data)
+        create_db_response.raise_for_status()
+        new_notion_db = create_db_response.json()
 
-            db_id = new_notion_db.get("id")
-            db_title_raw = new_notion_db.get("title", [])
-            db_title = "".join([text_obj.get("plain_text", "") for text_obj in db_title_raw]) if db_title_raw else "Untitled Database"
+        db_id = new_notion_db.get("id")
+        db_title_raw = new_notion_db.get("title", [])
+        db_title = "".join([text_obj.get("plain_text", "") for text_obj in db_title_raw]) if db_title_raw else "Untitled Database"
 
-            print(f"New Notion database created: ID={db_id}, Title={db_title}")
+        print(f"New Notion database created: ID={db_id}, Title={db_title}")
+        database_discovery.invalidate(access_token, notion_integration.notion_workspace_id)
 
-            return JSONResponse(content={
-                "message": "New Notion vocabulary database created successfully!",
-                "notion_db": {
-                    "id": db_id,
-                    "title": db_title
-                }
-            })
+        return JSONResponse(content={
+            "message": "New Notion vocabulary database created successfully!",
+            "notion_db": {
+                "id": db_id,
+                "title": db_title
+            }
+        })
 
     except httpx.HTTPStatusError as e:
         print(f"Error creating Notion database: {e.response.status_code} - {e.response.text}")
@@ -366,39 +417,31 @@ async def create_notion_db(request: Request, db_session: Session = Depends(get_d
         raise HTTPException(status_code=500, detail="Internal server error during Notion DB creation")
 
 
-@router.post("/save-to-notion")
-async def save_to_notion(payload: SavePayload, db_session: Session = Depends(get_db)):
-    """
-    클라이언트로부터 받은 단어 정보를 Notion 데이터베이스에 저장합니다.
-    앱 내부 사용자 ID를 통해 DB에서 Notion access_token과 database_id를 조회합니다.
-    """
-    notion_integration = db_session.query(models.NotionIntegration).filter_by(user_id=payload.app_user_id).first()
+NOTION_PAGES_URL = "https://api.notion.com/v1/pages"
+
+async def resolve_save_target(db_session: AsyncSession, app_user_id) -> tuple[str, str]:
+    """사용자의 (Notion access_token, 단어장 database_id) 를 반환합니다. 연동이 완료되지 않았으면 HTTPException."""
+    notion_integration = await integration_cache.get(db_session, app_user_id)
 
     if not notion_integration:
         raise HTTPException(status_code=401, detail="Notion integration not found for this user. Please connect Notion.")
 
     notion_access_token = notion_integration.notion_access_token
     notion_vocabulary_db_id = notion_integration.selected_vocabulary_db_id
-    print(f"Notion access token: {notion_access_token}, Vocabulary DB ID: {notion_vocabulary_db_id}")
     if not notion_access_token or not notion_vocabulary_db_id:
         raise HTTPException(status_code=400, detail="Notion access token or vocabulary database ID not set for this user. Please complete Notion setup.")
+    return notion_access_token, notion_vocabulary_db_id
 
-    notion_api_url = "https://api.notion.com/v1/pages"
-
-    headers = {
-        "Authorization": f"Bearer {notion_access_token}",
-        "Content-Type": "application/json",
-        "Notion-Version": "2022-06-28"
-    }
-
-    page_data = {
-        "parent": {"database_id": notion_vocabulary_db_id},
+def build_vocabulary_page(database_id: str, word: str, definition: str, synonyms: str) -> dict:
+    """단어장 데이터베이스에 만들 페이지(Word / Definition / Synonyms) payload."""
+    return {
+        "parent": {"database_id": database_id},
         "properties": {
             "Word": {
                 "title": [
                     {
                         "text": {
-                            "content": payload.word
+                            "content": word
                         }
                     }
                 ]
@@ -407,7 +450,7 @@ async def save_to_notion(payload: SavePayload, db_session: Session = Depends(get
                 "rich_text": [
                     {
                         "text": {
-                            "content": payload.definition
+                            "content": definition
                         }
                     }
                 ]
@@ -416,7 +459,7 @@ async def save_to_notion(payload: SavePayload, db_session: Session = Depends(get
                 "rich_text": [
                     {
                         "text": {
-                            "content": payload.synonyms
+                            "content": synonyms
                         }
                     }
                 ]
@@ -424,38 +467,405 @@ async def save_to_notion(payload: SavePayload, db_session: Session = Depends(get
         }
     }
 
-    async with httpx.AsyncClient() as client:
+async def create_vocabulary_page(app_user_id, notion_access_token: str, page_data: dict) -> dict:
+    """
+    스케줄러를 통해 Notion 페이지를 만들고 응답 JSON 을 반환합니다. 실패 시 httpx.HTTPStatusError.
+    만든 페이지는 로컬 단어장 미러에도 바로 반영합니다.
+    """
+    headers = {
+        "Authorization": f"Bearer {notion_access_token}",
+        "Content-Type": "application/json",
+        "Notion-Version": "2022-06-28"
+    }
+    response = await notion_scheduler.post(notion_access_token, NOTION_PAGES_URL, headers=headers, json=page_data)
+    response.raise_for_status()
+    created_page = response.json()
+    write_through = vocabulary_mirror.record_page(app_user_id, created_page)
+    if write_through is not None:
+        # 미러에 기록된 뒤 반환해야, 그 사이 단어 색인이 다시 읽혀도 방금 만든 단어가 보입니다.
+        await asyncio.shield(write_through)
+    return created_page
+
+async def find_vocabulary_page(notion_access_token: str, database_id: str, word: str) -> Optional[dict]:
+    """
+    제목(Word) 이 word 와 정확히 같은 단어장 페이지를 Notion 에서 직접 조회합니다 (없으면 None).
+    페이지 생성 요청의 결과를 알 수 없을 때, 다시 만들기 전에 이미 만들어졌는지 확인하는 데 씁니다.
+    """
+    headers = {
+        "Authorization": f"Bearer {notion_access_token}",
+        "Content-Type": "application/json",
+        "Notion-Version": "2022-06-28"
+    }
+    payload = {"filter": {"property": "Word", "title": {"equals": word}}, "page_size": 1}
+    response = await notion_scheduler.post(
+        notion_access_token, f"https://api.notion.com/v1/databases/{database_id}/query",
+        idempotent=True, headers=headers, json=payload,
+    )
+    response.raise_for_status()
+    pages = [page for page in response.json().get("results", []) if page.get("object") == "page"]
+    return pages[0] if pages else None
+
+def merge_vocabulary_text(existing: str, new: str, separator: str) -> str:
+    """기존 값에 없는 새 값만 separator 로 이어 붙입니다 (대소문자 무시)."""
+    parts = [part.strip() for part in existing.split(separator.strip()) if part.strip()]
+    seen = {part.casefold() for part in parts}
+    for part in new.split(separator.strip()):
+        part = part.strip()
+        if part and part.casefold() not in seen:
+            parts.append(part)
+            seen.add(part.casefold())
+    return separator.join(parts)
+
+async def merge_vocabulary_page(app_user_id, notion_access_token: str, entry: dict, definition: str, synonyms: str) -> tuple[str, str]:
+    """
+    이미 있는 단어 페이지에 새 뜻/동의어를 합쳐 갱신(PATCH) 하고 합친 (definition, synonyms) 를 반환합니다.
+    합칠 내용이 없으면 Notion 을 호출하지 않습니다. 실패 시 httpx.HTTPStatusError.
+    """
+    merged_definition = entry["definition"] if definition.strip() in entry["definition"] else (
+        f"{entry['definition']}\n{definition.strip()}" if entry["definition"] else definition.strip()
+    )
+    merged_synonyms = merge_vocabulary_text(entry["synonyms"], synonyms, ", ")
+    if merged_definition == entry["definition"] and merged_synonyms == entry["synonyms"]:
+        return merged_definition, merged_synonyms
+    headers = {
+        "Authorization": f"Bearer {notion_access_token}",
+        "Content-Type": "application/json",
+        "Notion-Version": "2022-06-28"
+    }
+    properties = {
+        "Definition": {"rich_text": [{"text": {"content": merged_definition}}]},
+        "Synonyms": {"rich_text": [{"text": {"content": merged_synonyms}}]},
+    }
+    # 같은 내용으로 다시 PATCH 해도 결과가 같으므로 5xx 도 재시도할 수 있습니다.
+    response = await notion_scheduler.request(
+        notion_access_token, "PATCH", f"{NOTION_PAGES_URL}/{entry['page_id']}",
+        idempotent=True, headers=headers, json={"properties": properties},
+    )
+    response.raise_for_status()
+    write_through = vocabulary_mirror.record_page(app_user_id, response.json())
+    if write_through is not None:
+        await asyncio.shield(write_through)
+    return merged_definition, merged_synonyms
+
+async def load_word_index(app_user_id: uuid.UUID, notion_access_token: str, database_id: str):
+    """
+    중복 검사용 단어 색인을 준비합니다. 색인은 로컬 미러에서 읽으므로, 미러가 이 단어장을 아직 동기화하지 않았으면 먼저 동기화합니다.
+    같은 사용자의 동시 호출은 한 번의 동기화·로드를 함께 기다립니다.
+    Notion 오류는 httpx.HTTPStatusError, 그 외 실패는 WordIndexUnavailableError 로 알립니다 (중복 검사 없이 저장하지 않습니다).
+    """
+    try:
+        await word_index.ensure_loaded(
+            app_user_id, database_id,
+            prepare=lambda: vocabulary_mirror.ensure_synced(app_user_id, notion_access_token, database_id),
+        )
+    except httpx.HTTPStatusError:
+        raise
+    except Exception as e:
+        print(f"Word index load failed for user {app_user_id}: {e}")
+        raise WordIndexUnavailableError(str(e)) from e
+
+async def save_word(
+    app_user_id: uuid.UUID,
+    notion_access_token: str,
+    database_id: str,
+    word: str,
+    definition: str,
+    synonyms: str,
+    on_duplicate: str = "skip",
+) -> tuple[str, Optional[str]]:
+    """
+    단어를 단어장에 저장하고 (status, page_id) 를 반환합니다. status 는 created / merged / skipped.
+    중복 여부는 Notion 을 조회하지 않고 로컬 단어 색인(word_index) 으로 판단하며,
+    같은 사용자·단어의 동시 저장은 직렬화해 중복 페이지가 생기지 않게 합니다.
+    실패 시 httpx.HTTPStatusError, 중복 검사를 할 수 없으면 WordIndexUnavailableError.
+    """
+    async with word_index.serialized(app_user_id, word):
+        existing = None
+        if on_duplicate != "create":
+            await load_word_index(app_user_id, notion_access_token, database_id)
+            existing = await word_index.lookup(app_user_id, database_id, word)
+        if existing is not None:
+            if on_duplicate == "skip":
+                return "skipped", existing["page_id"]
+            merged_definition, merged_synonyms = await merge_vocabulary_page(
+                app_user_id, notion_access_token, existing, definition, synonyms
+            )
+            word_index.add(app_user_id, database_id, existing["page_id"], existing["word"], merged_definition, merged_synonyms)
+            return "merged", existing["page_id"]
+
+        page_data = build_vocabulary_page(database_id, word, definition, synonyms)
+        created_page = await create_vocabulary_page(app_user_id, notion_access_token, page_data)
+        word_index.add(app_user_id, database_id, created_page.get("id"), word, definition, synonyms)
+        return "created", created_page.get("id")
+
+async def process_save_job(app_user_id: uuid.UUID, word: str, definition: str, synonyms: str) -> Optional[str]:
+    """
+    백그라운드 저장 작업 하나를 처리하고 페이지 ID 를 반환합니다.
+    이미 저장된 단어면 새 페이지를 만들지 않고 기존 페이지 ID 를 반환합니다 (on_duplicate="skip").
+    페이지 생성 요청의 결과를 알 수 없으면(전송 중 연결 끊김) Notion 에 페이지가 있는지 확인한 뒤에만 재시도합니다.
+    """
+    async with AsyncSessionLocal() as db_session:
+        try:
+            notion_access_token, notion_vocabulary_db_id = await resolve_save_target(db_session, app_user_id)
+        except HTTPException as e:
+            raise PermanentJobError(e.detail)
+    try:
+        _, page_id = await save_word(app_user_id, notion_access_token, notion_vocabulary_db_id, word, definition, synonyms)
+    except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+        # 요청이 Notion 에 닿기 전에 실패했으므로 다시 시도해도 중복 페이지가 생기지 않습니다.
+        raise RuntimeError(f"Notion unreachable: {e}")
+    except httpx.TransportError as e:
+        # 페이지 생성 POST 가 Notion 에 닿은 뒤 끊겼을 수 있습니다 (결과 불명). 다시 만들기 전에 페이지가 있는지 확인합니다.
+        print(f"Notion page create for job was interrupted ({e!r}); checking whether the page exists")
         try:
-            print (f"Saving to Notion with data: {page_data}")
-            response = await client.post(notion_api_url, headers=headers, json=page_data)
-            response.raise_for_status()
+            page = await find_vocabulary_page(notion_access_token, notion_vocabulary_db_id, word)
+        except Exception as check_error:
+            raise PermanentJobError(
+                f"Page creation outcome unknown ({e!r}) and the existence check failed ({check_error}); not retried to avoid a duplicate page."
+            )
+        if page is None:
+            raise RuntimeError(f"Page creation interrupted before Notion stored it: {e!r}")
+        write_through = vocabulary_mirror.record_page(app_user_id, page)
+        if write_through is not None:
+            await asyncio.shield(write_through)
+        word_index.add(app_user_id, notion_vocabulary_db_id, page["id"], word, definition, synonyms)
+        return page["id"]
+    except httpx.HTTPStatusError as e:
+        print(f"Error saving to Notion (job): {e.response.status_code} - {e.response.text}")
+        error = f"{e.response.status_code} - {e.response.text}"
+        # 429 는 스케줄러가 이미 기다렸다가 재시도했으므로, 여기서는 5xx 만 작업 단위로 다시 시도합니다.
+        if e.response.status_code < 500:
+            raise PermanentJobError(error)
+        raise RuntimeError(error)
+    return page_id
+
+# Idempotency-Key 가 있는 save-to-notion 요청을 처리하는 백그라운드 작업 큐 (lifespan 에서 start/close)
+save_jobs = NotionSaveJobQueue(
+    session_factory=AsyncSessionLocal,
+    process=process_save_job,
+    workers=NOTION_JOB_WORKERS,
+    max_attempts=NOTION_JOB_MAX_ATTEMPTS,
+)
+
+def serialize_job(job: models.NotionSaveJob) -> dict:
+    return {
+        "job_id": str(job.id),
+        "status": job.status,
+        "word": job.word,
+        "attempts": job.attempts,
+        "page_id": job.page_id,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+    }
+
+@router.post("/save-to-notion")
+async def save_to_notion(
+    payload: SavePayload,
+    db_session: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+):
+    """
+    클라이언트로부터 받은 단어 정보를 Notion 데이터베이스에 저장합니다.
+    앱 내부 사용자 ID를 통해 DB에서 Notion access_token과 database_id를 조회합니다.
+
+    이미 저장된 단어(대소문자·복수형 무시) 는 on_duplicate 에 따라 건너뛰거나(skip), 기존 페이지에 합치거나(merge),
+    새 페이지로 만듭니다(create). 응답의 status 는 created / merged / skipped 입니다.
+
+    Idempotency-Key 헤더가 있으면 백그라운드 작업으로 등록하고 바로 202 와 job_id 를 반환합니다.
+    같은 키로 다시 요청하면 새 작업을 만들지 않고 기존 작업을 반환합니다. 상태는 /api/notion/jobs/{job_id}?app_user_id=... 로 조회합니다.
+    백그라운드 작업은 항상 skip 으로 처리합니다.
+    """
+    notion_access_token, notion_vocabulary_db_id = await resolve_save_target(db_session, payload.app_user_id)
+
+    if idempotency_key:
+        if payload.on_duplicate != "skip":
+            raise HTTPException(status_code=400, detail="on_duplicate must be 'skip' when Idempotency-Key is set.")
+        job, created = await save_jobs.submit(
+            db_session, payload.app_user_id, idempotency_key, payload.word, payload.definition, payload.synonyms
+        )
+        status_url = f"/api/notion/jobs/{job.id}?app_user_id={payload.app_user_id}"
+        return JSONResponse(
+            status_code=202,
+            content={**serialize_job(job), "deduplicated": not created, "status_url": status_url},
+            headers={"Location": status_url},
+        )
+    print(f"Saving to Notion vocabulary DB: {notion_vocabulary_db_id}")
+
+    try:
+        print (f"Saving to Notion: {payload.word} (on_duplicate={payload.on_duplicate})")
+        status, page_id = await save_word(
+            payload.app_user_id, notion_access_token, notion_vocabulary_db_id,
+            payload.word, payload.definition, payload.synonyms, payload.on_duplicate,
+        )
 
-            print("Notion page created successfully:", response.json())
+        print(f"Notion save {status}: {page_id}")
 
-            return JSONResponse(content={"message": "Word saved to Notion successfully!"})
+        messages = {
+            "created": "Word saved to Notion successfully!",
+            "merged": "Word already saved; merged into the existing Notion page.",
+            "skipped": "Word already saved to Notion; skipped.",
+        }
+        return JSONResponse(content={"message": messages[status], "status": status, "page_id": page_id})
+
+    except httpx.HTTPStatusError as e:
+        print(f"Error saving to Notion: {e.response.status_code} - {e.response.text}")
+        raise HTTPException(
+            status_code=e.response.status_code,
+            detail=f"Failed to save to Notion: {e.response.text}"
+        )
+    except WordIndexUnavailableError:
+        raise HTTPException(
+            status_code=503,
+            detail="Could not check for an existing page; the word was not saved. Please try again."
+        )
+    except Exception as e:
+        print(f"An unexpected error occurred during Notion save: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Internal server error during Notion save"
+        )
 
+@router.get("/jobs/{job_id}")
+async def get_save_job(job_id: uuid.UUID, app_user_id: uuid.UUID, db_session: AsyncSession = Depends(get_async_db)):
+    """
+    백그라운드 저장 작업의 상태(queued / running / succeeded / failed)를 반환합니다.
+    작업을 등록한 사용자만 조회할 수 있으며, 다른 사용자의 작업은 존재 여부도 알리지 않도록 404 를 반환합니다.
+    """
+    job = await db_session.get(models.NotionSaveJob, job_id)
+    if not job or job.user_id != app_user_id:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return JSONResponse(content=serialize_job(job))
+
+class SaveBatchItem(BaseModel):
+    word: str
+    definition: str
+    synonyms: str
+
+class SaveBatchPayload(BaseModel):
+    app_user_id: uuid.UUID
+    items: list[SaveBatchItem]
+    on_duplicate: DuplicatePolicy = "skip"
+    stream: bool = False # True 이면 항목별 결과를 완료되는 순서대로 SSE 로 전송
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/save-batch")
+async def save_batch_to_notion(payload: SaveBatchPayload, db_session: AsyncSession = Depends(get_async_db)):
+    """
+    여러 단어를 한 번에 Notion 단어장에 저장합니다.
+    연동 정보는 한 번만 조회하고, 페이지 생성은 동시에 시작하되 Notion 스케줄러가 rate limit 안에서 내보냅니다.
+    중복 단어(요청 안의 중복 포함) 는 on_duplicate 에 따라 처리하고, 항목 결과의 status 로 알려줍니다.
+    응답은 항목별 성공/실패이며, stream=True 이면 SSE 로 진행 상황(item, done)을 보냅니다.
+    """
+    if not payload.items:
+        raise HTTPException(status_code=400, detail="items must not be empty.")
+    if len(payload.items) > NOTION_SAVE_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {NOTION_SAVE_BATCH_MAX} items can be saved per request.")
+
+    notion_access_token, notion_vocabulary_db_id = await resolve_save_target(db_session, payload.app_user_id)
+    if payload.on_duplicate != "create":
+        # 항목마다 미러 동기화·색인 로드를 시작하지 않도록, 작업을 나누기 전에 한 번만 준비합니다.
+        try:
+            await load_word_index(payload.app_user_id, notion_access_token, notion_vocabulary_db_id)
         except httpx.HTTPStatusError as e:
-            print(f"Error saving to Notion: {e.response.status_code} - {e.response.text}")
-            raise HTTPException(
-                status_code=e.response.status_code,
-                detail=f"Failed to save to Notion: {e.response.text}"
+            print(f"Error syncing Notion vocabulary before batch save: {e.response.status_code} - {e.response.text}")
+            raise HTTPException(status_code=e.response.status_code, detail=f"Failed to save to Notion: {e.response.text}")
+        except WordIndexUnavailableError:
+            raise HTTPException(status_code=503, detail="Could not check for existing pages; nothing was saved. Please try again.")
+
+    async def save_item(index: int, item: SaveBatchItem) -> dict:
+        try:
+            status, page_id = await save_word(
+                payload.app_user_id, notion_access_token, notion_vocabulary_db_id,
+                item.word, item.definition, item.synonyms, payload.on_duplicate,
             )
+            return {"index": index, "word": item.word, "ok": True, "status": status, "page_id": page_id}
+        except httpx.HTTPStatusError as e:
+            print(f"Error saving '{item.word}' to Notion: {e.response.status_code} - {e.response.text}")
+            return {"index": index, "word": item.word, "ok": False, "status_code": e.response.status_code, "error": e.response.text}
+        except WordIndexUnavailableError as e:
+            return {"index": index, "word": item.word, "ok": False, "status_code": 503, "error": f"Duplicate check unavailable: {e}"}
         except Exception as e:
-            print(f"An unexpected error occurred during Notion save: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail="Internal server error during Notion save"
-            )
+            print(f"An unexpected error occurred during Notion batch save of '{item.word}': {e}")
+            return {"index": index, "word": item.word, "ok": False, "status_code": 500, "error": str(e)}
+
+    tasks = [asyncio.create_task(save_item(index, item)) for index, item in enumerate(payload.items)]
+
+    if not payload.stream:
+        results = await asyncio.gather(*tasks)
+        saved = sum(1 for result in results if result["ok"])
+        return JSONResponse(content={"saved": saved, "failed": len(results) - saved, "results": results})
+
+    async def event_stream():
+        saved = 0
+        try:
+            for completed in asyncio.as_completed(tasks):
+                result = await completed
+                saved += int(result["ok"])
+                yield sse_event("item", result)
+            yield sse_event("done", {"saved": saved, "failed": len(tasks) - saved})
+        finally:
+            # 클라이언트가 스트림을 끊으면 아직 시작하지 않은 저장은 취소합니다.
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
         
 
+def serialize_vocabulary_entry(entry: models.NotionVocabularyEntry) -> dict:
+    return {
+        "page_id": entry.page_id,
+        "word": entry.word,
+        "definition": entry.definition,
+        "synonyms": entry.synonyms,
+        "last_edited_time": entry.last_edited_time.isoformat(),
+    }
+
+@router.get("/vocabulary")
+async def list_vocabulary(
+    app_user_id: uuid.UUID,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db_session: AsyncSession = Depends(get_async_db),
+):
+    """
+    사용자가 저장한 단어 목록과 개수를 로컬 미러(Postgres) 에서 반환합니다.
+    미러가 오래됐으면 백그라운드로 Notion 과 증분 동기화합니다.
+    """
+    notion_access_token, notion_vocabulary_db_id = await resolve_save_target(db_session, app_user_id)
+    state = await vocabulary_mirror.ensure_fresh(db_session, app_user_id, notion_access_token, notion_vocabulary_db_id)
+    entries, total = await vocabulary_mirror.list_entries(db_session, app_user_id, notion_vocabulary_db_id, limit, offset)
+    return JSONResponse(content={
+        "total": total,
+        "entries": [serialize_vocabulary_entry(entry) for entry in entries],
+        "last_synced_at": state.last_synced_at.isoformat() if state and state.last_synced_at else None,
+    })
+
+@router.post("/vocabulary/sync")
+async def sync_vocabulary(app_user_id: uuid.UUID, full: bool = False, db_session: AsyncSession = Depends(get_async_db)):
+    """로컬 단어장 미러를 지금 Notion 과 동기화합니다 (full=true 이면 전체 다시 조회)."""
+    notion_access_token, notion_vocabulary_db_id = await resolve_save_target(db_session, app_user_id)
+    try:
+        synced = await vocabulary_mirror.sync(app_user_id, notion_access_token, notion_vocabulary_db_id, full=full)
+    except httpx.HTTPStatusError as e:
+        print(f"Error syncing Notion vocabulary: {e.response.status_code} - {e.response.text}")
+        raise HTTPException(status_code=e.response.status_code, detail=f"Failed to sync vocabulary: {e.response.text}")
+    return JSONResponse(content={"message": "Vocabulary synced", "synced_pages": synced})
+
 # 새 엔드포인트 추가: 사용자 Notion 연동 상태 및 데이터베이스 ID 조회
 @router.get("/user-notion-status/{app_user_id}")
-async def get_user_notion_status(app_user_id: uuid.UUID, db_session: Session = Depends(get_db)):
+async def get_user_notion_status(app_user_id: uuid.UUID, db_session: AsyncSession = Depends(get_async_db)):
     """
     주어진 app_user_id에 대한 Notion 연동 상태 및 선택된 데이터베이스 ID를 반환합니다.
     """
-    notion_integration = db_session.query(models.NotionIntegration).filter_by(user_id=app_user_id).first()
-    user_obj = db_session.query(models.User).filter_by(id=app_user_id).first()
+    notion_integration = await integration_cache.get(db_session, app_user_id)
+    user_obj = await db_session.get(models.User, app_user_id)
 
     if not user_obj:
         raise HTTPException(status_code=404, detail="User not found.")
@@ -0,0 +1,183 @@
+# notion_scheduler.py
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import httpx
+
+from config import NOTION_RATE_PER_SECOND, NOTION_BURST, NOTION_MAX_RETRIES, NOTION_MAX_RETRY_WAIT
+from http_client import OutboundHTTP, outbound_http
+from notion_cache import token_fingerprint, token_validity_cache
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지고 최대 burst 개까지 쌓이는 토큰 버킷. lock 으로 대기자를 도착 순서(FIFO)대로 처리합니다."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0 # 429 Retry-After 로 막힌 시각까지는 토큰이 있어도 보내지 않습니다.
+        self.waiting = 0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def block_for(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class NotionScheduler:
+    """
+    Notion API 호출을 integration(access_token) 별 토큰 버킷으로 조절하는 스케줄러.
+
+    - Notion 의 integration 당 평균 약 3 req/s 제한에 맞춰 호출을 대기열에서 고르게 내보냅니다.
+    - 401 응답은 토큰이 취소/만료된 것이므로 token_validity_cache 에 바로 무효로 기록합니다 (모든 Notion 호출 공통).
+    - 429 응답은 Retry-After 만큼 해당 토큰의 모든 호출을 멈춘 뒤 재시도합니다.
+      (429 로 거절된 요청은 Notion 에 반영되지 않으므로 페이지 생성 같은 호출도 안전하게 재시도됩니다.)
+    - 5xx/네트워크 오류는 idempotent=True 인 호출(조회, 검색)만 재시도합니다.
+    - 재시도 대기가 max_retry_wait 초를 넘으면 마지막 응답을 그대로 반환합니다.
+    - 대기열 길이와 대기 시간을 stats 로 노출합니다.
+    """
+
+    RETRYABLE_STATUS = {500, 502, 503, 504}
+
+    def __init__(
+        self,
+        http: OutboundHTTP,
+        rate: float = 3.0,
+        burst: int = 3,
+        max_retries: int = 3,
+        max_retry_wait: float = 30.0,
+        max_buckets: int = 10000,
+    ):
+        self.http = http
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max(0, max_retries)
+        self.max_retry_wait = max_retry_wait
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.unauthorized = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _bucket(self, access_token: str) -> TokenBucket:
+        key = token_fingerprint(access_token)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            # 오래 쓰이지 않은(대기자가 없는) 버킷부터 정리합니다.
+            for stale_key in list(self._buckets):
+                if len(self._buckets) <= self.max_buckets:
+                    break
+                if self._buckets[stale_key].waiting == 0 and stale_key != key:
+                    del self._buckets[stale_key]
+        self._buckets.move_to_end(key)
+        return bucket
+
+    async def _acquire(self, bucket: TokenBucket):
+        started = time.monotonic()
+        bucket.waiting += 1
+        try:
+            await bucket.acquire()
+        finally:
+            bucket.waiting -= 1
+        waited = time.monotonic() - started
+        self.waits += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response, attempt: int) -> float:
+        try:
+            return max(0.0, float(response.headers.get("Retry-After", "")))
+        except ValueError:
+            return min(1.0 * (2 ** attempt), 8.0) + random.uniform(0, 0.25)
+
+    async def request(
+        self, access_token: str, method: str, url: str, idempotent: bool = False, **kwargs
+    ) -> httpx.Response:
+        """access_token 의 버킷에서 차례를 기다린 뒤 Notion 에 요청하고 최종 응답을 반환합니다."""
+        bucket = self._bucket(access_token)
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+            await self._acquire(bucket)
+            self.requests += 1
+            try:
+                response = await self.http.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if not idempotent:
+                    raise
+                last_error = e
+                await asyncio.sleep(min(0.5 * (2 ** attempt), 4.0))
+                continue
+
+            if response.status_code == 401:
+                self.unauthorized += 1
+                token_validity_cache.invalidate(access_token)
+                return response
+            if response.status_code == 429:
+                self.throttled += 1
+                retry_after = self._retry_after(response, attempt)
+                bucket.block_for(retry_after)
+                if attempt == self.max_retries or retry_after > self.max_retry_wait:
+                    return response
+                continue
+            if response.status_code in self.RETRYABLE_STATUS and idempotent and attempt < self.max_retries:
+                await asyncio.sleep(min(0.5 * (2 ** attempt), 4.0))
+                continue
+            return response
+        raise last_error
+
+    async def get(self, access_token: str, url: str, **kwargs) -> httpx.Response:
+        return await self.request(access_token, "GET", url, idempotent=True, **kwargs)
+
+    async def post(self, access_token: str, url: str, idempotent: bool = False, **kwargs) -> httpx.Response:
+        return await self.request(access_token, "POST", url, idempotent=idempotent, **kwargs)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.burst,
+            "buckets": len(self._buckets),
+            "queue_depth": sum(bucket.waiting for bucket in self._buckets.values()),
+            "max_bucket_queue_depth": max((bucket.waiting for bucket in self._buckets.values()), default=0),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "unauthorized": self.unauthorized,
+            "avg_wait_ms": round(self.total_wait / self.waits * 1000, 1) if self.waits else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+notion_scheduler = NotionScheduler(
+    http=outbound_http,
+    rate=NOTION_RATE_PER_SECOND,
+    burst=NOTION_BURST,
+    max_retries=NOTION_MAX_RETRIES,
+    max_retry_wait=NOTION_MAX_RETRY_WAIT,
+)
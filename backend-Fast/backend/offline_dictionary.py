@@ -0,0 +1,328 @@
+# offline_dictionary.py
+"""
+로컬 영어 사전 저장소.
+
+사전 항목(dictionaryapi.dev 응답 형식의 entry 목록)을 하나의 파일에 압축해 두고 mmap 으로 읽습니다.
+
+파일 형식 (little-endian):
+    header   : magic(8s) count(I) index_offset(Q)
+    records  : [key(utf-8) + zlib(json(entries))] ...
+    index    : [record_offset(Q) key_len(H) record_len(I)] * count   (key 의 바이트 순으로 정렬)
+
+조회는 고정 크기 index 를 이진 탐색하므로 파일 전체를 메모리에 올리지 않고, 운영체제 page cache 를 공유합니다.
+원격 API 로 가져온 단어는 overlay(메모리 + append-only 로그) 에 두었다가 compact() 시 새 파일로 합칩니다.
+
+데이터셋 가져오기:
+    python offline_dictionary.py import words.jsonl [--out data/dictionary.bin]
+"""
+import argparse
+import asyncio
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Iterable, Optional
+
+from config import OFFLINE_DICT_PATH
+
+MAGIC = b"VOCDICT1"
+HEADER = struct.Struct("<8sIQ")
+INDEX_ENTRY = struct.Struct("<QHI")
+
+
+def normalize_key(word: str) -> str:
+    return " ".join(word.split()).lower()
+
+
+def _encode(entries: list) -> bytes:
+    return zlib.compress(json.dumps(entries, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def _write_records(path: str, records: Iterable[tuple[bytes, bytes]]) -> int:
+    """(key bytes, 압축된 레코드) 를 key 순서대로 받아 사전 파일로 씁니다. 임시 파일에 쓴 뒤 교체하므로 읽는 쪽은 항상 완전한 파일을 봅니다."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    index = []
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, 0))
+        for key_bytes, data in records:
+            index.append(INDEX_ENTRY.pack(f.tell(), len(key_bytes), len(data)))
+            f.write(key_bytes)
+            f.write(data)
+        index_offset = f.tell()
+        f.write(b"".join(index))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(index), index_offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(index)
+
+
+def write_store(path: str, records: dict) -> int:
+    """{key: entries} 를 사전 파일로 씁니다."""
+    keys = sorted(records, key=lambda key: key.encode("utf-8"))
+    return _write_records(path, ((key.encode("utf-8"), _encode(records[key])) for key in keys))
+
+
+def merge_store(path: str, store: Optional["_MappedStore"], records: dict) -> int:
+    """
+    기존 사전 파일(store) 에 {key: entries} 를 합친 파일을 씁니다. 같은 key 는 records 가 우선합니다.
+    기존 레코드는 압축을 풀지 않고 bytes 그대로 복사하며, 두 쪽 모두 key 순으로 정렬돼 있으므로 한 번에 병합합니다.
+    """
+    new = sorted(((key.encode("utf-8"), entries) for key, entries in records.items()), key=lambda item: item[0])
+
+    def merged():
+        i = 0
+        for key_bytes, data in (store.raw_items() if store is not None else ()):
+            while i < len(new) and new[i][0] < key_bytes:
+                yield new[i][0], _encode(new[i][1])
+                i += 1
+            if i < len(new) and new[i][0] == key_bytes:
+                yield key_bytes, _encode(new[i][1])
+                i += 1
+            else:
+                yield key_bytes, data
+        for key_bytes, entries in new[i:]:
+            yield key_bytes, _encode(entries)
+
+    return _write_records(path, merged())
+
+
+class _MappedStore:
+    """읽기 전용 사전 파일 하나. 이벤트 루프 스레드에서만 읽습니다."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # 빈 파일은 mmap 할 수 없습니다.
+            self._file.close()
+            raise ValueError(f"Dictionary store is empty: {path}")
+        magic, self.count, self._index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a dictionary store: {path}")
+        self.size = len(self._map)
+
+    def _entry(self, i: int) -> tuple[int, int, int]:
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + i * INDEX_ENTRY.size)
+
+    def get(self, key: str) -> Optional[list]:
+        target = key.encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset, key_len, record_len = self._entry(mid)
+            current = self._map[offset:offset + key_len]
+            if current < target:
+                lo = mid + 1
+            elif current > target:
+                hi = mid
+            else:
+                data = self._map[offset + key_len:offset + key_len + record_len]
+                return json.loads(zlib.decompress(data))
+        return None
+
+    def keys(self) -> Iterable[str]:
+        for i in range(self.count):
+            offset, key_len, _ = self._entry(i)
+            yield self._map[offset:offset + key_len].decode("utf-8")
+
+    def items(self) -> Iterable[tuple[str, list]]:
+        for i in range(self.count):
+            offset, key_len, record_len = self._entry(i)
+            key = self._map[offset:offset + key_len].decode("utf-8")
+            yield key, json.loads(zlib.decompress(self._map[offset + key_len:offset + key_len + record_len]))
+
+    def raw_items(self) -> Iterable[tuple[bytes, bytes]]:
+        """(key bytes, 압축된 레코드) 를 key 순으로 반환합니다."""
+        for i in range(self.count):
+            offset, key_len, record_len = self._entry(i)
+            yield self._map[offset:offset + key_len], self._map[offset + key_len:offset + key_len + record_len]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class OfflineDictionary:
+    """
+    mmap 사전 파일 + write-back overlay.
+
+    - get() 은 overlay, 사전 파일 순으로 찾고 없으면 None (원격 조회는 호출하는 쪽에서).
+    - put() 은 원격에서 가져온 단어를 overlay 와 로그 파일({path}.log) 에 기록합니다.
+    - overlay 가 compact_threshold 개를 넘거나 close() 될 때 사전 파일을 새로 써서 합칩니다 (스레드에서).
+    """
+
+    def __init__(self, path: str, write_back: bool = True, compact_threshold: int = 500):
+        self.path = path
+        self.log_path = f"{path}.log"
+        self.write_back = write_back
+        self.compact_threshold = max(1, compact_threshold)
+        self._store: Optional[_MappedStore] = None
+        self._overlay: dict = {}
+        self._log = None
+        self._compaction: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.compactions = 0
+        self.errors = 0
+
+    def open(self):
+        if os.path.exists(self.path):
+            try:
+                self._store = _MappedStore(self.path)
+            except (OSError, ValueError, struct.error) as e:
+                self.errors += 1
+                print(f"Offline dictionary could not be opened ({self.path}): {e}")
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self._overlay[record["key"]] = record["entries"]
+                    except (ValueError, KeyError):
+                        # 종료 중 잘린 마지막 줄 등은 건너뜁니다.
+                        continue
+        if self.write_back:
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        print(f"Offline dictionary opened: {len(self)} word(s) ({len(self._overlay)} pending write-back)")
+
+    def __len__(self) -> int:
+        return (self._store.count if self._store else 0) + len(self._overlay)
+
+    def get(self, word: str) -> Optional[list]:
+        key = normalize_key(word)
+        entries = self._overlay.get(key)
+        if entries is None and self._store is not None:
+            try:
+                entries = self._store.get(key)
+            except (ValueError, zlib.error) as e:
+                self.errors += 1
+                print(f"Offline dictionary read error for '{key}': {e}")
+        if entries is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entries
+
+    def put(self, word: str, entries: list):
+        if not self.write_back or self._log is None:
+            return
+        key = normalize_key(word)
+        self._overlay[key] = entries
+        self._log.write(json.dumps({"key": key, "entries": entries}, ensure_ascii=False) + "\n")
+        self._log.flush()
+        self.writes += 1
+        if len(self._overlay) >= self.compact_threshold and self._compaction is None:
+            self._compaction = asyncio.create_task(self.compact())
+
+    def _merge(self, pending: dict) -> int:
+        # 스레드에서 실행: 기존 파일(읽기 전용 mmap) 의 레코드는 그대로 복사하고 pending 만 인코딩해 새 파일을 씁니다.
+        return merge_store(self.path, self._store, pending)
+
+    async def compact(self):
+        """overlay 를 사전 파일에 합치고, 합친 항목을 로그에서 지웁니다."""
+        try:
+            pending = dict(self._overlay)
+            if not pending:
+                return
+            try:
+                count = await asyncio.to_thread(self._merge, pending)
+            except Exception as e:
+                self.errors += 1
+                print(f"Offline dictionary compaction failed: {e}")
+                return
+            old_store, self._store = self._store, _MappedStore(self.path)
+            if old_store is not None:
+                old_store.close()
+            for key in pending:
+                if self._overlay.get(key) is pending[key]:
+                    del self._overlay[key]
+            # 합치는 동안 새로 들어온 항목만 로그에 남깁니다.
+            if self._log is not None:
+                self._log.close()
+                with open(self.log_path, "w", encoding="utf-8") as f:
+                    for key, entries in self._overlay.items():
+                        f.write(json.dumps({"key": key, "entries": entries}, ensure_ascii=False) + "\n")
+                self._log = open(self.log_path, "a", encoding="utf-8")
+            self.compactions += 1
+            print(f"Offline dictionary compacted: {count} word(s)")
+        finally:
+            self._compaction = None
+
+    async def close(self):
+        if self._compaction is not None:
+            await self._compaction
+        await self.compact()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "words": len(self),
+            "store_words": self._store.count if self._store else 0,
+            "store_bytes": self._store.size if self._store else 0,
+            "pending_write_back": len(self._overlay),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / (self.hits + self.misses), 4) if self.hits + self.misses else 0.0,
+            "writes": self.writes,
+            "compactions": self.compactions,
+            "errors": self.errors,
+        }
+
+
+def load_jsonl(source: str) -> dict:
+    """
+    dictionaryapi.dev 응답 형식의 entry 를 한 줄에 하나씩 담은 JSONL 을 읽어 {key: entries} 로 묶습니다.
+    한 줄이 entry 목록(API 응답 그대로) 이어도 됩니다.
+    """
+    records: dict = {}
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+            for entry in data if isinstance(data, list) else [data]:
+                if entry.get("word") and entry.get("meanings"):
+                    records.setdefault(normalize_key(entry["word"]), []).append(entry)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline dictionary store tools")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    importer = subcommands.add_parser("import", help="Import a JSONL dataset into the store (merged with existing words)")
+    importer.add_argument("source")
+    importer.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    path = args.out or OFFLINE_DICT_PATH
+    imported = load_jsonl(args.source)
+    store = _MappedStore(path) if os.path.exists(path) else None
+    try:
+        count = merge_store(path, store, imported)
+    finally:
+        if store is not None:
+            store.close()
+    print(f"Imported {len(imported)} word(s) from {args.source}; {path} now has {count} word(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# pattern_writer.py
+import asyncio
+import datetime
+import json
+from typing import Callable, Optional
+
+from sqlalchemy import text
+
+from migrations import error_pattern_key
+
+# 배치 전체를 배열 파라미터 4개로 보내는 단일 문장이라 prepared statement 하나로 재사용됩니다.
+UPSERT_PATTERNS_SQL = text("""
+    INSERT INTO auto_error_patterns (pattern_key, analysis_data, detected_at, occurrence_count)
+    SELECT k, CAST(a AS JSONB), d, c
+    FROM unnest(
+        CAST(:keys AS TEXT[]), CAST(:analysis AS TEXT[]),
+        CAST(:detected AS TIMESTAMPTZ[]), CAST(:counts AS INTEGER[])
+    ) AS t(k, a, d, c)
+    ON CONFLICT (pattern_key) DO UPDATE
+    SET occurrence_count = auto_error_patterns.occurrence_count + EXCLUDED.occurrence_count,
+        detected_at = GREATEST(auto_error_patterns.detected_at, EXCLUDED.detected_at)
+""")
+
+
+class ErrorPatternWriter:
+    """
+    auto_error_patterns 기록을 요청 경로에서 분리하는 write-behind 파이프라인.
+
+    - enqueue() 는 메모리에 기록만 하고 즉시 반환합니다 (DB 를 기다리지 않음).
+    - 같은 pattern_key 는 메모리에서 합쳐(occurrence_count 합산) 한 행으로 씁니다.
+    - batch_size 개가 모이거나 flush_interval 초가 지나면 multi-row upsert 로 한 번에 기록합니다.
+    - 대기 중인 패턴이 max_pending 개를 넘으면 새 패턴은 버리고 dropped 를 증가시킵니다.
+    - close() 시 남은 패턴을 모두 기록(drain)합니다.
+    """
+
+    def __init__(
+        self,
+        engine,
+        build_analysis: Callable[[str, str, str], dict],
+        max_pending: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+    ):
+        self._engine = engine
+        self._build_analysis = build_analysis
+        self.max_pending = max(1, max_pending)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._pending: dict = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.enqueued = 0
+        self.merged = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+
+    async def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, original_sentence: str, language_tool_corrected: str, llm_refined_sentence: str) -> bool:
+        """패턴을 기록 대기열에 넣습니다. 대기열이 가득 차 버려졌으면 False 를 반환합니다."""
+        key = error_pattern_key(original_sentence, llm_refined_sentence)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        entry = self._pending.get(key)
+        if entry is not None:
+            entry["count"] += 1
+            entry["detected_at"] = now
+            self.merged += 1
+        elif len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+        else:
+            self._pending[key] = {
+                "sentences": (original_sentence, language_tool_corrected, llm_refined_sentence),
+                "count": 1,
+                "detected_at": now,
+            }
+        self.enqueued += 1
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    async def _write(self, batch: dict):
+        keys = sorted(batch) # 키 순서로 정렬해 인스턴스 간 잠금 순서를 맞춥니다.
+        params = {
+            "keys": keys,
+            "analysis": [json.dumps(self._build_analysis(*batch[key]["sentences"])) for key in keys],
+            "detected": [batch[key]["detected_at"] for key in keys],
+            "counts": [batch[key]["count"] for key in keys],
+        }
+        async with self._engine.begin() as conn:
+            await conn.execute(UPSERT_PATTERNS_SQL, params)
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await self._write(batch)
+            self.flushes += 1
+            self.flushed_rows += len(batch)
+        except Exception as e:
+            self.failed_flushes += 1
+            print(f"Error pattern flush failed ({len(batch)} patterns): {e}")
+            # 실패한 배치는 여유가 있는 만큼 다시 대기열에 합칩니다.
+            for key, entry in batch.items():
+                current = self._pending.get(key)
+                if current is not None:
+                    current["count"] += entry["count"]
+                elif len(self._pending) < self.max_pending:
+                    self._pending[key] = entry
+                else:
+                    self.dropped += entry["count"]
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def close(self):
+        """백그라운드 flush 루프를 멈추고 남은 패턴을 모두 기록합니다."""
+        if self._task is not None:
+            # 진행 중인 flush 가 끝나도록 취소 대신 종료 플래그로 루프를 멈춥니다.
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "enqueued": self.enqueued,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "failed_flushes": self.failed_flushes,
+        }
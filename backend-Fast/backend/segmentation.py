@@ -0,0 +1,60 @@
+# segmentation.py
+import re
+from dataclasses import dataclass
+
+# 문장 끝 구두점(. ! ?) + 닫는 따옴표/괄호 뒤의 공백, 빈 줄(문단 경계), 또는 텍스트 끝에서 문장을 나눕니다.
+_SENTENCE_RE = re.compile(r"\S.*?(?:[.!?]+[\"'”’)\]]*(?=\s|\Z)|(?=\n\s*\n)|\Z)", re.S)
+# 마침표로 끝나도 문장 경계로 보지 않는 흔한 약어
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "st.", "vs.", "etc.", "e.g.", "i.e.", "no."}
+
+
+@dataclass
+class Segment:
+    """입력 텍스트 안의 한 문장. text 는 공백 정규화된 문장, index_map 은 text 의 각 문자 → 원본 위치."""
+    input_index: int
+    start: int
+    end: int
+    text: str
+    index_map: list
+
+    def to_input_span(self, offset: int, length: int) -> tuple[int, int]:
+        """정규화된 문장 기준 (offset, length) 를 원본 입력 기준 (start, end) 로 변환합니다."""
+        if not self.index_map:
+            return self.start, self.start
+        offset = min(max(offset, 0), len(self.index_map) - 1)
+        last = min(offset + max(length, 1) - 1, len(self.index_map) - 1)
+        start = self.index_map[offset]
+        end = self.index_map[last] + (1 if length > 0 else 0)
+        return start, end
+
+
+def normalize_with_offsets(raw: str, base: int = 0) -> tuple[str, list]:
+    """normalize_sentence 와 같은 결과를 만들면서 각 문자의 원본 위치(base 기준)를 함께 반환합니다."""
+    chars, index_map = [], []
+    for match in re.finditer(r"\S+", raw):
+        if chars:
+            chars.append(" ")
+            index_map.append(base + match.start() - 1)
+        chars.extend(match.group())
+        index_map.extend(range(base + match.start(), base + match.end()))
+    return "".join(chars), index_map
+
+
+def split_sentences(text: str, input_index: int = 0) -> list[Segment]:
+    """문단을 문장 단위 Segment 목록으로 나눕니다."""
+    spans = []
+    for match in _SENTENCE_RE.finditer(text):
+        raw = match.group().rstrip()
+        if not raw:
+            continue
+        start, end = match.start(), match.start() + len(raw)
+        if spans and text[spans[-1][0]:spans[-1][1]].split()[-1].lower() in _ABBREVIATIONS:
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+
+    segments = []
+    for start, end in spans:
+        normalized, index_map = normalize_with_offsets(text[start:end], base=start)
+        segments.append(Segment(input_index, start, end, normalized, index_map))
+    return segments
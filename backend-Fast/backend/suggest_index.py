@@ -0,0 +1,178 @@
+# suggest_index.py
+import heapq
+import os
+import sys
+import time
+from array import array
+from typing import Iterable, Optional
+
+
+def load_word_list(path: str) -> list[tuple[str, int]]:
+    """
+    단어 목록 파일을 읽어 (단어, 빈도) 목록을 반환합니다.
+    한 줄에 "단어<공백>빈도" 또는 "단어" 만 있을 수 있으며, 빈도가 없으면 빈도순 목록으로 보고 줄 순서로 빈도를 매깁니다.
+    """
+    words = []
+    with open(path, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    for rank, line in enumerate(lines):
+        word, _, count = line.rpartition("\t") if "\t" in line else line.rpartition(" ")
+        if word and count.isdigit():
+            words.append((word, int(count)))
+        else:
+            words.append((line, len(lines) - rank))
+    return words
+
+
+class SuggestIndex:
+    """
+    접두어 자동완성용 압축 단어 색인.
+
+    - 정렬된 단어를 하나의 UTF-8 bytes 에 이어 붙이고, 시작 위치/빈도는 array('I') 에 둡니다 (단어당 약 8바이트 + 단어 길이).
+    - 접두어로 시작하는 단어 구간을 이진 탐색으로 찾고, 그 안에서 빈도가 높은 순으로 반환합니다.
+    - 구간이 큰 짧은 접두어(precompute_depth 글자 이하) 의 상위 결과는 미리 계산해 둡니다.
+    - 단어 저장 공간이 memory_budget 바이트를 넘으면 빈도가 낮은 단어부터 빼고 만듭니다.
+    """
+
+    def __init__(self, memory_budget: int = 16 * 1024 * 1024, max_results: int = 10, precompute_depth: int = 3):
+        self.memory_budget = memory_budget
+        self.max_results = min(max(1, max_results), 255)
+        self.precompute_depth = max(0, precompute_depth)
+        self._blob = b""
+        self._offsets = array("I", [0])
+        self._frequencies = array("I")
+        # 미리 계산한 접두어별 상위 결과: _top[prefix] = (start << 8) | count, 결과는 _top_indexes[start:start + count]
+        self._top: dict[str, int] = {}
+        self._top_indexes = array("I")
+        self.source: Optional[str] = None
+        self.dropped = 0
+        self.lookups = 0
+        self._lookup_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._frequencies)
+
+    @property
+    def memory_bytes(self) -> int:
+        arrays = (self._offsets, self._frequencies, self._top_indexes)
+        top_bytes = sys.getsizeof(self._top) + sum(sys.getsizeof(prefix) for prefix in self._top)
+        return len(self._blob) + sum(a.itemsize * len(a) for a in arrays) + top_bytes
+
+    def build(self, words: Iterable[tuple[str, int]], source: Optional[str] = None):
+        """(단어, 빈도) 로 색인을 새로 만듭니다. 같은 단어는 빈도가 큰 쪽을 씁니다."""
+        best: dict[str, int] = {}
+        for word, frequency in words:
+            word = " ".join(word.split()).lower()
+            if word and frequency >= best.get(word, -1):
+                best[word] = min(frequency, 0xFFFFFFFF)
+
+        # 빈도가 높은 단어부터 예산 안에 들어가는 만큼만 남깁니다 (단어 + 구분자 1 + offset 4 + 빈도 4 바이트).
+        kept, used = [], 0
+        for word, frequency in sorted(best.items(), key=lambda item: (-item[1], item[0])):
+            size = len(word.encode("utf-8")) + 9
+            if self.memory_budget and used + size > self.memory_budget:
+                break
+            kept.append((word, frequency))
+            used += size
+        self.dropped = len(best) - len(kept)
+
+        kept.sort(key=lambda item: item[0].encode("utf-8"))
+        encoded = [word.encode("utf-8") for word, _ in kept]
+        offsets = array("I", [0])
+        position = 0
+        for word in encoded:
+            position += len(word) + 1
+            offsets.append(position)
+        self._blob = b"\n".join(encoded) + (b"\n" if encoded else b"")
+        self._offsets = offsets
+        self._frequencies = array("I", (frequency for _, frequency in kept))
+        self._top, self._top_indexes = self._precompute()
+        self.source = source
+        print(f"Suggest index built from {source}: {len(self)} word(s), {self.memory_bytes} bytes, {self.dropped} dropped by budget")
+
+    def _word(self, i: int) -> bytes:
+        return self._blob[self._offsets[i]:self._offsets[i + 1] - 1]
+
+    def _range(self, prefix: bytes) -> tuple[int, int]:
+        """prefix 로 시작하는 단어의 [lo, hi) 구간."""
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word(mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        start, hi = lo, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._word(mid)[:len(prefix)] == prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return start, lo
+
+    def _best(self, lo: int, hi: int) -> list[int]:
+        # 빈도가 같으면 사전순(짧은 단어 우선)
+        return heapq.nsmallest(self.max_results, range(lo, hi), key=lambda i: (-self._frequencies[i], i))
+
+    def _precompute(self) -> tuple[dict, array]:
+        # 빈도순으로 한 번 훑으며 각 짧은 접두어에 상위 max_results 개를 채웁니다.
+        lists: dict[str, list] = {}
+        for i in sorted(range(len(self)), key=lambda i: (-self._frequencies[i], i)):
+            word = self._word(i).decode("utf-8")
+            for length in range(1, min(self.precompute_depth, len(word)) + 1):
+                indexes = lists.setdefault(word[:length], [])
+                if len(indexes) < self.max_results:
+                    indexes.append(i)
+        top, top_indexes = {}, array("I")
+        for prefix, indexes in lists.items():
+            top[prefix] = (len(top_indexes) << 8) | len(indexes)
+            top_indexes.extend(indexes)
+        return top, top_indexes
+
+    def suggest(self, prefix: str, limit: Optional[int] = None) -> list[str]:
+        """prefix 로 시작하는 단어를 빈도순으로 최대 limit 개 반환합니다."""
+        started = time.perf_counter()
+        prefix = " ".join(prefix.split()).lower()
+        limit = min(limit or self.max_results, self.max_results)
+        if not prefix:
+            indexes = []
+        elif prefix in self._top:
+            packed = self._top[prefix]
+            start = packed >> 8
+            indexes = self._top_indexes[start:start + (packed & 0xFF)]
+        else:
+            indexes = self._best(*self._range(prefix.encode("utf-8")))
+        result = [self._word(i).decode("utf-8") for i in indexes[:limit]]
+        self.lookups += 1
+        self._lookup_seconds += time.perf_counter() - started
+        return result
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "words": len(self),
+            "memory_bytes": self.memory_bytes,
+            "memory_budget": self.memory_budget,
+            "dropped": self.dropped,
+            "precomputed_prefixes": len(self._top),
+            "lookups": self.lookups,
+            "avg_lookup_us": round(self._lookup_seconds / self.lookups * 1e6, 1) if self.lookups else 0.0,
+        }
+
+
+def build_suggest_index(index: SuggestIndex, word_list_path: str):
+    """
+    빈도 단어 목록 파일로 색인을 만듭니다.
+    목록이 없거나 비어 있으면 빈도 없이 만든 색인은 순위가 의미 없으므로 예외를 발생시켜 시작을 멈춥니다.
+    """
+    if not word_list_path or not os.path.exists(word_list_path):
+        raise FileNotFoundError(
+            f"Suggest word list not found: {word_list_path!r}. "
+            "Provide a frequency word list via SUGGEST_WORDLIST_PATH or set SUGGEST_ENABLED=false."
+        )
+    words = load_word_list(word_list_path)
+    if not words:
+        raise ValueError(f"Suggest word list is empty: {word_list_path}")
+    index.build(words, source=word_list_path)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# 테스트는 backend 디렉터리의 평면 모듈을 그대로 import 합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# database.py 가 import 시 engine 을 만들기 때문에 접속 정보가 필요합니다 (연결은 하지 않습니다).
+for key, value in {"DB_HOST": "localhost", "DB_PORT": "5432", "DB_NAME": "postgres", "DB_USER": "postgres", "DB_PASSWORD": ""}.items():
+    os.environ.setdefault(key, value)
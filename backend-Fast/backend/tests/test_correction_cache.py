@@ -0,0 +1,31 @@
+import asyncio
+from types import SimpleNamespace
+
+from correction_cache import CorrectionCache
+
+
+def _match(offset, length, replacement):
+    return SimpleNamespace(
+        ruleId="RULE", message="message", replacements=[replacement], offset=offset,
+        errorLength=length, category="GRAMMAR", ruleIssueType="grammar",
+    )
+
+
+def test_whitespace_variants_share_a_key():
+    assert CorrectionCache.make_key("He  go home. ", "en-US") == CorrectionCache.make_key("He go home.", "en-US")
+    assert CorrectionCache.make_key("He go home.", "en-US") != CorrectionCache.make_key("He go home.", "de-DE")
+
+
+def test_hit_requires_the_exact_sentence_that_was_checked():
+    # offset 은 검사한 문장 기준이므로 공백이 다른 문장에 그대로 돌려주면 위치가 어긋납니다.
+    cache = CorrectionCache()
+    stored = cache.set("He  go home.", "en-US", [_match(4, 2, "goes")], "He  goes home.")
+
+    async def lookups():
+        return await cache.get("He  go home.", "en-US"), await cache.get("He go home.", "en-US")
+
+    exact, variant = asyncio.run(lookups())
+    assert exact == stored
+    assert exact["matches"][0]["offset"] == 4
+    assert variant is None
+    assert (cache.stats["hits"], cache.stats["misses"]) == (1, 1)
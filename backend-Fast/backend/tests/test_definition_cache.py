@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+
+from definition_cache import DefinitionCache
+
+
+class Fetcher:
+    """원격 사전 API 대신 쓰는 fetch. 호출을 기록하고 release 될 때까지 기다릴 수 있습니다."""
+
+    def __init__(self, responses: dict = None, error: Exception = None):
+        self.responses = responses or {}
+        self.error = error
+        self.calls = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, word):
+        self.calls.append(word)
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.responses.get(word)
+
+
+def test_concurrent_lookups_of_one_word_share_a_fetch():
+    cache = DefinitionCache()
+
+    async def run():
+        fetch = Fetcher({"apple": {"word": "apple"}})
+        fetch.release.clear()
+        lookups = [asyncio.create_task(cache.lookup(word, fetch)) for word in ["apple", "Apple", " APPLE ", "apple"]]
+        await asyncio.sleep(0.01)
+        fetch.release.set()
+        return await asyncio.gather(*lookups), fetch.calls
+
+    results, calls = asyncio.run(run())
+    assert results == [{"word": "apple"}] * 4
+    assert calls == ["apple"]
+    assert (cache.stats["fetches"], cache.stats["coalesced"], cache.stats["in_flight"]) == (1, 3, 0)
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_fetch():
+    cache = DefinitionCache()
+
+    async def run():
+        fetch = Fetcher({"apple": {"word": "apple"}})
+        fetch.release.clear()
+        first = asyncio.create_task(cache.lookup("apple", fetch))
+        second = asyncio.create_task(cache.lookup("apple", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        fetch.release.set()
+        return await second, first.cancelled(), fetch.calls
+
+    assert asyncio.run(run()) == ({"word": "apple"}, True, ["apple"])
+
+
+def test_missing_words_are_cached_for_negative_ttl():
+    cache = DefinitionCache(negative_ttl=0.1)
+    fetch = Fetcher()
+
+    async def run():
+        first = await cache.lookup("teh", fetch)
+        second = await cache.lookup("teh", fetch)
+        calls_before_expiry = len(fetch.calls)
+        await asyncio.sleep(0.15)
+        third = await cache.lookup("teh", fetch)
+        return first, second, third, calls_before_expiry
+
+    assert asyncio.run(run()) == (None, None, None, 1)
+    assert len(fetch.calls) == 2
+    assert cache.stats["negative_hits"] == 1
+
+
+def test_negative_entries_expire_before_found_ones():
+    cache = DefinitionCache(ttl=60, negative_ttl=0.05)
+    fetch = Fetcher({"apple": {"word": "apple"}})
+
+    async def run():
+        await cache.lookup("apple", fetch)
+        await cache.lookup("teh", fetch)
+        time.sleep(0.1)
+        await cache.lookup("apple", fetch)
+        await cache.lookup("teh", fetch)
+
+    asyncio.run(run())
+    assert fetch.calls == ["apple", "teh", "teh"]
+
+
+def test_fetch_errors_are_not_cached():
+    cache = DefinitionCache()
+    fetch = Fetcher(error=ConnectionError("dictionary API down"))
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await cache.lookup("apple", fetch)
+        fetch.error = None
+        fetch.responses = {"apple": {"word": "apple"}}
+        return await cache.lookup("apple", fetch)
+
+    assert asyncio.run(run()) == {"word": "apple"}
+    assert fetch.calls == ["apple", "apple"]
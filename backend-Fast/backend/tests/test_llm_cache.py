@@ -0,0 +1,23 @@
+import asyncio
+
+from llm_cache import LLMRefinementCache
+
+
+def test_key_depends_on_model_prompt_version_and_variant():
+    payload = {"contents": [{"parts": [{"text": "hello"}]}]}
+    cache = LLMRefinementCache(model="m", prompt_version="v1")
+
+    assert cache.make_key(payload) == LLMRefinementCache(model="m", prompt_version="v1").make_key(payload)
+    assert cache.make_key(payload) != LLMRefinementCache(model="m", prompt_version="v2").make_key(payload)
+    assert cache.make_key(payload) != cache.make_key(payload, variant="batch")
+
+
+def test_batch_results_are_not_returned_for_single_lookups():
+    payload = {"contents": [{"parts": [{"text": "he go home"}]}]}
+    cache = LLMRefinementCache(model="m", prompt_version="v1")
+    cache.set(payload, "he go home", "He goes home.", variant="batch")
+
+    async def lookups():
+        return await cache.get(payload), await cache.get(payload, variant="batch")
+
+    assert asyncio.run(lookups()) == (None, "He goes home.")
@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from http_client import OutboundHTTP
+from llm_client import CircuitBreaker, GeminiClient, LLMUnavailableError
+
+
+def make_client(handler, **kwargs) -> tuple[GeminiClient, OutboundHTTP]:
+    http = OutboundHTTP(http2=False, transport=httpx.MockTransport(handler))
+    kwargs.setdefault("max_retries", 0)
+    return GeminiClient("key", http, breaker_threshold=1, breaker_cooldown=0, **kwargs), http
+
+
+def test_breaker_half_open_allows_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+    breaker.record_failure()
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_cancelled_half_open_trial_reopens_breaker():
+    started = asyncio.Event()
+
+    async def handler(request):
+        started.set()
+        await asyncio.sleep(10)
+        return httpx.Response(200, json={})
+
+    async def run():
+        client, http = make_client(handler)
+        await http.start()
+        client.breaker.record_failure()
+        assert client.breaker.state == "half_open"
+
+        trial = asyncio.create_task(client.generate({}))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # 취소된 시험 호출이 실패로 기록되어야 다음 시험 호출이 가능합니다.
+        assert client.breaker._trial_in_flight is False
+        assert client.breaker.allow() is True
+        await http.close()
+
+    asyncio.run(run())
+
+
+def test_disconnected_half_open_stream_reopens_breaker():
+    async def handler(request):
+        body = "".join(f"data: {json.dumps({'n': i})}\n\n" for i in range(3))
+        return httpx.Response(200, content=body.encode(), headers={"Content-Type": "text/event-stream"})
+
+    async def run():
+        client, http = make_client(handler)
+        await http.start()
+        client.breaker.record_failure()
+
+        stream = client.stream({})
+        assert await stream.__anext__() == {"n": 0}
+        await stream.aclose() # 클라이언트 연결 끊김
+
+        assert client.breaker._trial_in_flight is False
+        assert client.breaker.allow() is True
+        await http.close()
+
+    asyncio.run(run())
+
+
+def test_successful_half_open_trial_closes_breaker():
+    async def handler(request):
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        client, http = make_client(handler)
+        await http.start()
+        client.breaker.record_failure()
+        assert await client.generate({}) == {"ok": True}
+        assert client.breaker.state == "closed"
+        await http.close()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_rejected_request_does_not_open_breaker(streaming):
+    async def handler(request):
+        return httpx.Response(400, json={"error": "bad"})
+
+    async def call(client):
+        if streaming:
+            return [chunk async for chunk in client.stream({})]
+        return await client.generate({})
+
+    async def run():
+        client, http = make_client(handler)
+        await http.start()
+        with pytest.raises(LLMUnavailableError, match="rejected: 400"):
+            await call(client)
+        assert client.breaker.state == "closed"
+        assert client.stats["failures"] == 1
+        await http.close()
+
+    asyncio.run(run())
+
+
+def test_stream_server_errors_open_breaker():
+    async def handler(request):
+        return httpx.Response(503)
+
+    async def run():
+        client, http = make_client(handler)
+        await http.start()
+        with pytest.raises(LLMUnavailableError, match="stream failed"):
+            [chunk async for chunk in client.stream({})]
+        assert client.breaker.state != "closed"
+        await http.close()
+
+    asyncio.run(run())
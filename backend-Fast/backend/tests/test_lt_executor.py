@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from lt_executor import LanguageToolBusyError, LanguageToolExecutor, LanguageToolTimeoutError
+
+
+class FakeTool:
+    """LanguageTool 대신 쓰는 가짜 도구. release 가 set 될 때까지 검사를 붙잡아 둘 수 있습니다."""
+
+    def __init__(self, release: threading.Event = None):
+        self.release = release
+        self.checked = []
+        self.closed = False
+
+    def check(self, text):
+        if self.release is not None:
+            self.release.wait(5)
+        self.checked.append(text)
+        if "go" in text:
+            return [SimpleNamespace(offset=text.index("go"), errorLength=2, replacements=["goes"])]
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+def make_executor(release=None, **kwargs):
+    tools = []
+
+    def factory():
+        tools.append(FakeTool(release))
+        return tools[-1]
+
+    kwargs.setdefault("check_timeout", 1.0)
+    return LanguageToolExecutor(tool_factory=factory, **kwargs), tools
+
+
+def test_checks_run_on_pool_instances_and_close_them():
+    executor, tools = make_executor(pool_size=2)
+
+    async def run():
+        await executor.start()
+        results = await asyncio.gather(executor.check("He go home."), executor.check("Fine."))
+        await executor.close()
+        return results
+
+    with_match, clean = asyncio.run(run())
+    assert [m.offset for m in with_match] == [3] and clean == []
+    assert sorted(text for tool in tools for text in tool.checked) == ["Fine.", "He go home."]
+    assert all(tool.closed for tool in tools)
+
+
+def test_full_queue_rejects_immediately():
+    release = threading.Event()
+    executor, _ = make_executor(release, pool_size=1, max_pending=1)
+
+    async def run():
+        await executor.start()
+        running = asyncio.create_task(executor.check("one"))
+        waiting = asyncio.create_task(executor.check("two"))
+        await asyncio.sleep(0.05)
+        assert executor.stats["pending"] == 2
+        with pytest.raises(LanguageToolBusyError):
+            await executor.check("three")
+        release.set()
+        results = await asyncio.gather(running, waiting)
+        await executor.close()
+        return results
+
+    assert asyncio.run(run()) == [[], []]
+
+
+def test_timed_out_check_returns_instance_only_after_the_thread_finishes():
+    release = threading.Event()
+    executor, tools = make_executor(release, pool_size=1, check_timeout=0.1)
+
+    async def run():
+        await executor.start()
+        with pytest.raises(LanguageToolTimeoutError):
+            await executor.check("slow")
+        # 스레드가 아직 인스턴스를 쓰고 있으므로 풀에 돌아오지 않았습니다.
+        assert executor.stats["idle"] == 0
+        assert executor.stats["pending"] == 0
+        release.set()
+        while executor.stats["idle"] == 0:
+            await asyncio.sleep(0.01)
+        result = await executor.check("fast")
+        await executor.close()
+        return result
+
+    assert asyncio.run(run()) == []
+    assert tools[0].checked == ["slow", "fast"]
+
+
+def test_waiting_for_a_busy_instance_times_out():
+    release = threading.Event()
+    executor, _ = make_executor(release, pool_size=1, check_timeout=0.1)
+
+    async def run():
+        await executor.start()
+        running = asyncio.create_task(executor.check("one"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(LanguageToolTimeoutError, match="free LanguageTool instance"):
+            await executor.check("two")
+        release.set()
+        await asyncio.gather(running, return_exceptions=True)
+        await executor.close()
+
+    asyncio.run(run())
+
+
+def test_correct_batch_splits_matches_back_to_sentences():
+    executor, tools = make_executor(pool_size=1)
+
+    async def run():
+        await executor.start()
+        results = await executor.correct_batch(["Fine.", "He go home."])
+        await executor.close()
+        return results
+
+    (first_matches, first), (second_matches, second) = asyncio.run(run())
+    assert (first_matches, first) == ([], "Fine.")
+    assert [m.offset for m in second_matches] == [3]
+    assert second == "He goes home."
+    assert len(tools[0].checked) == 1 # 한 번의 LT 호출
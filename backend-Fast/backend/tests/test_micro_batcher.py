@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+
+from llm_client import LLMUnavailableError
+from micro_batcher import MicroBatcher
+
+
+class Recorder:
+    def __init__(self, many_error=None):
+        self.many_error = many_error
+        self.one_calls = []
+        self.many_calls = []
+
+    async def one(self, item):
+        self.one_calls.append(item)
+        return item.upper()
+
+    async def many(self, items):
+        self.many_calls.append(list(items))
+        if self.many_error is not None:
+            raise self.many_error
+        return [item.upper() for item in items]
+
+
+async def _submit_all(batcher, items):
+    results = await asyncio.gather(*[batcher.submit(item) for item in items], return_exceptions=True)
+    await batcher.close()
+    return results
+
+
+def test_concurrent_items_share_one_batch_and_duplicates_run_once():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder.one, recorder.many, window=0.01)
+
+    results = asyncio.run(_submit_all(batcher, ["a", "b", "a", "c"]))
+
+    assert results == ["A", "B", "A", "C"]
+    assert recorder.many_calls == [["a", "b", "c"]]
+    assert recorder.one_calls == []
+    assert batcher.stats["batches"] == 1
+
+
+def test_single_item_uses_process_one():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder.one, recorder.many, window=0.01)
+
+    assert asyncio.run(_submit_all(batcher, ["a", "a"])) == ["A", "A"]
+    assert recorder.many_calls == []
+    assert recorder.one_calls == ["a"]
+
+
+def test_max_batch_size_flushes_without_waiting_for_window():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder.one, recorder.many, window=60, max_batch_size=2)
+
+    async def scenario():
+        return await asyncio.wait_for(asyncio.gather(batcher.submit("a"), batcher.submit("b")), timeout=1)
+
+    assert asyncio.run(scenario()) == ["A", "B"]
+
+
+@pytest.mark.parametrize("error", [
+    ValueError("malformed"),
+    KeyError("candidates"),
+    json.JSONDecodeError("bad", "[", 1),
+    TypeError("the JSON object must be str, bytes or bytearray, not NoneType"),
+])
+def test_shape_errors_fall_back_to_per_item_calls(error):
+    recorder = Recorder(many_error=error)
+    batcher = MicroBatcher(recorder.one, recorder.many, window=0.01)
+
+    assert asyncio.run(_submit_all(batcher, ["a", "b"])) == ["A", "B"]
+    assert sorted(recorder.one_calls) == ["a", "b"]
+    assert batcher.stats["fallbacks"] == 1
+
+
+def test_malformed_gemini_body_falls_back_to_per_item_calls():
+    recorder = Recorder()
+    bodies = [
+        {"candidates": [{"content": {"parts": [{"text": None}]}}]},
+        {"candidates": [{"content": {"parts": ["not a dict"]}}]},
+    ]
+
+    async def parse(items):
+        body = bodies.pop(0)
+        return json.loads(body["candidates"][0]["content"]["parts"][0]["text"])
+
+    for _ in range(2):
+        batcher = MicroBatcher(recorder.one, parse, window=0.01)
+        assert asyncio.run(_submit_all(batcher, ["a", "b"])) == ["A", "B"]
+        assert batcher.stats["fallbacks"] == 1
+
+
+def test_wrong_result_count_falls_back_to_per_item_calls():
+    recorder = Recorder()
+
+    async def short(items):
+        return items[:1]
+
+    batcher = MicroBatcher(recorder.one, short, window=0.01)
+
+    assert asyncio.run(_submit_all(batcher, ["a", "b"])) == ["A", "B"]
+    assert batcher.stats["fallbacks"] == 1
+
+
+def test_unavailable_upstream_is_not_retried_per_item():
+    # 장애 중 배치 실패를 문장별 호출로 다시 시도하면 호출 수만 늘어납니다.
+    recorder = Recorder(many_error=LLMUnavailableError("503"))
+    batcher = MicroBatcher(recorder.one, recorder.many, window=0.01)
+
+    results = asyncio.run(_submit_all(batcher, ["a", "b", "c", "d"]))
+
+    assert all(isinstance(result, LLMUnavailableError) for result in results)
+    assert len(recorder.many_calls) == 1
+    assert recorder.one_calls == []
+    assert batcher.stats["fallbacks"] == 0
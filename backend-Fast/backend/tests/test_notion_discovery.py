@@ -0,0 +1,42 @@
+import asyncio
+import gc
+
+import httpx
+
+from http_client import OutboundHTTP
+from notion_discovery import NotionDatabaseDiscovery
+from notion_scheduler import NotionScheduler
+
+
+def test_failed_search_after_caller_cancelled_is_retrieved():
+    release = asyncio.Event()
+
+    async def handler(request):
+        await release.wait()
+        return httpx.Response(500, json={"message": "boom"})
+
+    async def run():
+        unhandled = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+        http = OutboundHTTP(http2=False, transport=httpx.MockTransport(handler))
+        await http.start()
+        discovery = NotionDatabaseDiscovery(NotionScheduler(http, rate=1000, burst=1000, max_retries=0))
+
+        caller = asyncio.create_task(discovery.list_databases("token", "workspace", refresh=True))
+        await asyncio.sleep(0.01)
+        search = discovery._in_flight[discovery._key("token", "workspace")]
+        caller.cancel() # 예: 토큰 교환 뒤 사용자 저장이 실패해 discovery_task 를 취소
+        release.set()
+        await asyncio.gather(caller, return_exceptions=True)
+        while not search.done():
+            await asyncio.sleep(0.01)
+
+        await http.close()
+        del search, caller
+        gc.collect()
+        await asyncio.sleep(0)
+        return unhandled, discovery.stats["in_flight"]
+
+    unhandled, in_flight = asyncio.run(run())
+    assert unhandled == []
+    assert in_flight == 0
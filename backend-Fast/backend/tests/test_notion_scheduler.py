@@ -0,0 +1,164 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from http_client import OutboundHTTP
+from notion_cache import token_validity_cache
+from notion_scheduler import NotionScheduler, TokenBucket
+
+URL = "https://api.notion.com/v1/databases/db/query"
+
+
+def make_scheduler(handler, **kwargs) -> tuple[NotionScheduler, OutboundHTTP]:
+    http = OutboundHTTP(http2=False, transport=httpx.MockTransport(handler))
+    kwargs.setdefault("rate", 1000)
+    kwargs.setdefault("burst", 1000)
+    return NotionScheduler(http, **kwargs), http
+
+
+def run_with(http: OutboundHTTP, coro_factory):
+    async def run():
+        await http.start()
+        try:
+            return await coro_factory()
+        finally:
+            await http.close()
+    return asyncio.run(run())
+
+
+def test_bucket_allows_burst_then_paces_at_rate():
+    async def run():
+        bucket = TokenBucket(rate=20, burst=2)
+        started = time.monotonic()
+        await bucket.acquire()
+        await bucket.acquire()
+        burst_elapsed = time.monotonic() - started
+        await bucket.acquire()
+        await bucket.acquire()
+        return burst_elapsed, time.monotonic() - started
+
+    burst_elapsed, total_elapsed = asyncio.run(run())
+    assert burst_elapsed < 0.02
+    assert total_elapsed >= 0.09 # 토큰 2개를 20/s 로 다시 채우는 시간
+
+
+def test_bucket_serves_waiters_in_arrival_order():
+    async def run():
+        bucket = TokenBucket(rate=50, burst=1)
+        order = []
+
+        async def waiter(i):
+            await bucket.acquire()
+            order.append(i)
+
+        await asyncio.gather(*[waiter(i) for i in range(5)])
+        return order
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+
+
+def test_block_for_holds_back_calls_even_with_tokens():
+    async def run():
+        bucket = TokenBucket(rate=1000, burst=10)
+        bucket.block_for(0.1)
+        started = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started, bucket.tokens
+
+    elapsed, tokens = asyncio.run(run())
+    assert elapsed >= 0.09
+    assert tokens >= 8
+
+
+def test_429_waits_retry_after_and_retries_non_idempotent_calls():
+    calls = []
+
+    def handler(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.1"})
+        return httpx.Response(200, json={"object": "page"})
+
+    scheduler, http = make_scheduler(handler)
+    response = run_with(http, lambda: scheduler.post("token", URL, json={}))
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.09
+    assert (scheduler.stats["throttled"], scheduler.stats["retries"]) == (1, 1)
+
+
+def test_429_beyond_max_retry_wait_returns_the_response():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"Retry-After": "60"})
+
+    scheduler, http = make_scheduler(handler, max_retry_wait=5)
+    response = run_with(http, lambda: scheduler.get("token", URL))
+
+    assert response.status_code == 429
+    assert len(calls) == 1
+
+
+def test_server_errors_are_retried_only_for_idempotent_calls():
+    calls = {"GET": 0, "POST": 0}
+
+    def handler(request):
+        calls[request.method] += 1
+        if calls[request.method] == 1:
+            return httpx.Response(503)
+        return httpx.Response(200, json={})
+
+    scheduler, http = make_scheduler(handler)
+
+    async def both():
+        return await scheduler.get("token", URL), await scheduler.post("token", URL, json={})
+
+    query, create = run_with(http, both)
+    assert (query.status_code, calls["GET"]) == (200, 2)
+    assert (create.status_code, calls["POST"]) == (503, 1)
+
+
+def test_transport_errors_propagate_for_non_idempotent_calls():
+    def handler(request):
+        raise httpx.ConnectError("connection refused", request=request)
+
+    scheduler, http = make_scheduler(handler, max_retries=0)
+    with pytest.raises(httpx.ConnectError):
+        run_with(http, lambda: scheduler.post("token", URL, json={}))
+
+
+def test_each_token_gets_its_own_bucket():
+    def handler(request):
+        return httpx.Response(200, json={})
+
+    scheduler, http = make_scheduler(handler, rate=1, burst=1)
+
+    async def run():
+        started = time.monotonic()
+        await asyncio.gather(*[scheduler.get(f"token-{i}", URL) for i in range(5)])
+        return time.monotonic() - started
+
+    # 같은 토큰이었다면 1 req/s 로 4초 이상 걸렸을 것입니다.
+    assert run_with(http, run) < 0.5
+    assert scheduler.stats["buckets"] == 5
+
+
+def test_401_marks_the_token_invalid_for_every_caller():
+    def handler(request):
+        return httpx.Response(401, json={"code": "unauthorized"})
+
+    scheduler, http = make_scheduler(handler)
+    token_validity_cache.set("revoked-token", True)
+    token_validity_cache.set("other-token", True)
+
+    response = run_with(http, lambda: scheduler.post("revoked-token", URL, idempotent=True, json={}))
+
+    assert response.status_code == 401
+    assert token_validity_cache.get("revoked-token") is False
+    assert token_validity_cache.get("other-token") is True
+    assert scheduler.stats["unauthorized"] == 1
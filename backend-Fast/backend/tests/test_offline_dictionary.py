@@ -0,0 +1,96 @@
+import asyncio
+
+import offline_dictionary
+from offline_dictionary import OfflineDictionary, _MappedStore, write_store
+
+
+def _entries(word, definition="a definition"):
+    return [{"word": word, "meanings": [{"partOfSpeech": "noun", "definitions": [{"definition": definition}]}]}]
+
+
+def test_write_store_round_trip(tmp_path):
+    path = str(tmp_path / "dictionary.bin")
+    records = {"apple": _entries("apple"), "zebra": _entries("zebra"), "café": _entries("café")}
+    assert write_store(path, records) == 3
+
+    store = _MappedStore(path)
+    try:
+        for key, entries in records.items():
+            assert store.get(key) == entries
+        assert store.get("missing") is None
+        assert list(store.keys()) == sorted(records, key=lambda key: key.encode("utf-8"))
+    finally:
+        store.close()
+
+
+def test_put_is_visible_and_survives_reopen_from_log(tmp_path):
+    path = str(tmp_path / "dictionary.bin")
+
+    async def scenario():
+        dictionary = OfflineDictionary(path, compact_threshold=100)
+        dictionary.open()
+        dictionary.put("  Apple ", _entries("apple"))
+        assert dictionary.get("apple") == _entries("apple")
+        # close() 없이 버린 프로세스를 흉내: 로그만 남습니다.
+        dictionary._log.close()
+
+        reopened = OfflineDictionary(path, compact_threshold=100)
+        reopened.open()
+        try:
+            return reopened.get("APPLE"), reopened.stats["pending_write_back"]
+        finally:
+            await reopened.close()
+
+    assert asyncio.run(scenario()) == (_entries("apple"), 1)
+
+
+def test_compact_merges_overlay_with_existing_records(tmp_path):
+    path = str(tmp_path / "dictionary.bin")
+    write_store(path, {"apple": _entries("apple"), "cherry": _entries("cherry"), "egg": _entries("egg", "old")})
+
+    async def scenario():
+        dictionary = OfflineDictionary(path, compact_threshold=100)
+        dictionary.open()
+        for word in ("banana", "egg", "fig", "aardvark"):
+            dictionary.put(word, _entries(word, "new"))
+        await dictionary.compact()
+        try:
+            words = list(dictionary._store.keys())
+            return words, {word: dictionary.get(word) for word in words}, dictionary.stats
+        finally:
+            await dictionary.close()
+
+    words, entries, stats = asyncio.run(scenario())
+    assert words == ["aardvark", "apple", "banana", "cherry", "egg", "fig"]
+    assert entries["apple"] == _entries("apple")
+    assert entries["egg"] == _entries("egg", "new")
+    assert entries["fig"] == _entries("fig", "new")
+    assert stats["pending_write_back"] == 0
+    assert stats["compactions"] == 1
+
+
+def test_compact_copies_existing_records_without_decoding(tmp_path, monkeypatch):
+    path = str(tmp_path / "dictionary.bin")
+    write_store(path, {f"word{i}": _entries(f"word{i}") for i in range(50)})
+
+    async def scenario():
+        dictionary = OfflineDictionary(path, compact_threshold=100)
+        dictionary.open()
+        dictionary.put("word25", _entries("word25", "new"))
+        dictionary.put("zzz", _entries("zzz"))
+
+        def forbidden(*args, **kwargs):
+            raise AssertionError("existing records must be copied as compressed bytes")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(offline_dictionary.zlib, "decompress", forbidden)
+            await dictionary.compact()
+        try:
+            return len(dictionary), dictionary.get("word7"), dictionary.get("word25"), dictionary.stats["errors"]
+        finally:
+            await dictionary.close()
+
+    count, word7, word25, errors = asyncio.run(scenario())
+    assert (count, errors) == (51, 0)
+    assert word7 == _entries("word7")
+    assert word25 == _entries("word25", "new")
@@ -0,0 +1,110 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from migrations import error_pattern_key
+from pattern_writer import ErrorPatternWriter
+
+
+class FakeEngine:
+    """engine.begin() 으로 받은 연결의 execute 파라미터를 기록하는 가짜 async engine."""
+
+    def __init__(self, fail_times: int = 0):
+        self.fail_times = fail_times
+        self.writes = []
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+    async def execute(self, statement, params):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("database unavailable")
+        self.writes.append(params)
+
+
+def make_writer(engine, **kwargs):
+    analysis = lambda original, corrected, refined: {"original_sentence": original, "llm_refined_sentence": refined}
+    return ErrorPatternWriter(engine, analysis, **kwargs)
+
+
+def counts_by_key(params) -> dict:
+    return dict(zip(params["keys"], params["counts"]))
+
+
+def test_same_pattern_is_merged_into_one_row():
+    engine = FakeEngine()
+    writer = make_writer(engine)
+    for _ in range(3):
+        writer.enqueue("He go home.", "He goes home.", "He goes home.")
+    writer.enqueue("She are here.", "She is here.", "She is here.")
+
+    asyncio.run(writer.flush())
+
+    assert len(engine.writes) == 1
+    assert counts_by_key(engine.writes[0]) == {
+        error_pattern_key("He go home.", "He goes home."): 3,
+        error_pattern_key("She are here.", "She is here."): 1,
+    }
+    assert engine.writes[0]["keys"] == sorted(engine.writes[0]["keys"])
+    assert (writer.stats["merged"], writer.stats["flushed_rows"], writer.stats["pending"]) == (2, 2, 0)
+
+
+def test_new_patterns_are_dropped_when_full_but_known_ones_still_merge():
+    writer = make_writer(FakeEngine(), max_pending=2)
+
+    assert writer.enqueue("a", "a", "A")
+    assert writer.enqueue("b", "b", "B")
+    assert not writer.enqueue("c", "c", "C")
+    assert writer.enqueue("a", "a", "A")
+
+    assert (writer.stats["pending"], writer.stats["dropped"], writer.stats["merged"]) == (2, 1, 1)
+
+
+def test_failed_flush_requeues_and_merges_with_new_patterns():
+    engine = FakeEngine(fail_times=1)
+    writer = make_writer(engine)
+
+    async def run():
+        writer.enqueue("a", "a", "A")
+        await writer.flush()
+        writer.enqueue("a", "a", "A")
+        await writer.flush()
+
+    asyncio.run(run())
+    assert writer.stats["failed_flushes"] == 1
+    assert [counts_by_key(params) for params in engine.writes] == [{error_pattern_key("a", "A"): 2}]
+
+
+def test_full_batch_is_written_without_waiting_for_the_interval():
+    engine = FakeEngine()
+    writer = make_writer(engine, batch_size=2, flush_interval=60)
+
+    async def run():
+        await writer.start()
+        writer.enqueue("a", "a", "A")
+        writer.enqueue("b", "b", "B")
+        for _ in range(100):
+            if engine.writes:
+                break
+            await asyncio.sleep(0.01)
+        written = len(engine.writes)
+        await writer.close()
+        return written
+
+    assert asyncio.run(run()) == 1
+
+
+def test_close_drains_pending_patterns():
+    engine = FakeEngine()
+    writer = make_writer(engine, flush_interval=60)
+
+    async def run():
+        await writer.start()
+        writer.enqueue("a", "a", "A")
+        writer.enqueue("b", "b", "B")
+        await writer.close()
+
+    asyncio.run(run())
+    assert sum(len(params["keys"]) for params in engine.writes) == 2
+    assert writer.stats["pending"] == 0
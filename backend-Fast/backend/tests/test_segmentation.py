@@ -0,0 +1,57 @@
+import pytest
+
+from correction_cache import normalize_sentence
+from segmentation import normalize_with_offsets, split_sentences
+
+
+@pytest.mark.parametrize("raw", ["He  go\thome.", "  leading and trailing  ", "one", "", "   ", "a \n\n b"])
+def test_normalize_with_offsets_matches_normalize_sentence(raw):
+    text, index_map = normalize_with_offsets(raw)
+    assert text == normalize_sentence(raw)
+    assert len(index_map) == len(text)
+    # 공백이 아닌 글자는 원본의 같은 글자를 가리킵니다.
+    assert all(raw[index_map[i]] == char for i, char in enumerate(text) if char != " ")
+
+
+def test_split_sentences_keeps_input_spans():
+    text = "He go home.  She are happy!\nIs it ok? Yes"
+    segments = split_sentences(text, input_index=2)
+
+    assert [segment.text for segment in segments] == ["He go home.", "She are happy!", "Is it ok?", "Yes"]
+    assert all(segment.input_index == 2 for segment in segments)
+    for segment in segments:
+        assert normalize_sentence(text[segment.start:segment.end]) == segment.text
+
+
+def test_split_sentences_handles_abbreviations_quotes_and_paragraphs():
+    text = 'Dr. Smith said "Go home." Then he left\n\nNew paragraph without period\nstill going.'
+    assert [segment.text for segment in split_sentences(text)] == [
+        'Dr. Smith said "Go home."',
+        "Then he left",
+        "New paragraph without period still going.",
+    ]
+
+
+def test_split_sentences_of_blank_text_is_empty():
+    assert split_sentences("") == []
+    assert split_sentences(" \n\n ") == []
+
+
+def test_to_input_span_maps_normalized_offsets_back_to_the_input():
+    text = "First one.   He  go   home."
+    segment = split_sentences(text)[1]
+    offset = segment.text.index("go")
+
+    start, end = segment.to_input_span(offset, len("go"))
+    assert text[start:end] == "go"
+
+    # 정규화된 문장에서 "He go" 는 원본의 늘어난 공백까지 포함합니다.
+    start, end = segment.to_input_span(0, len("He go"))
+    assert text[start:end] == "He  go"
+
+
+def test_to_input_span_clamps_out_of_range_offsets():
+    text = "Short."
+    segment = split_sentences(text)[0]
+    assert segment.to_input_span(100, 3) == (len(text) - 1, len(text))
+    assert segment.to_input_span(0, 0) == (0, 0)
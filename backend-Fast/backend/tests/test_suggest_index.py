@@ -0,0 +1,68 @@
+import pytest
+
+from suggest_index import SuggestIndex, build_suggest_index, load_word_list
+
+WORDS = [("apple", 50), ("apply", 80), ("application", 30), ("apt", 80), ("banana", 10), ("Apple", 5), ("café", 7), ("cafe", 7)]
+
+
+def _index(**kwargs):
+    index = SuggestIndex(**kwargs)
+    index.build(WORDS, source="test")
+    return index
+
+
+def test_suggestions_are_ordered_by_frequency_then_alphabetically():
+    index = _index()
+    assert index.suggest("ap") == ["apply", "apt", "apple", "application"]
+    assert index.suggest("APP ") == ["apply", "apple", "application"]
+    assert index.suggest("caf") == ["cafe", "café"]
+    assert index.suggest("zz") == []
+    assert index.suggest("   ") == []
+
+
+def test_precomputed_and_searched_prefixes_agree():
+    # precompute_depth=0 이면 항상 이진 탐색 경로를 씁니다.
+    precomputed, searched = _index(precompute_depth=3), _index(precompute_depth=0)
+    for prefix in ("a", "ap", "app", "appl", "apple", "b", "c", "caf", "café"):
+        assert precomputed.suggest(prefix) == searched.suggest(prefix), prefix
+
+
+def test_limit_is_capped_by_max_results():
+    index = _index(max_results=2)
+    assert index.suggest("ap") == ["apply", "apt"]
+    assert index.suggest("ap", limit=1) == ["apply"]
+    assert index.suggest("ap", limit=50) == ["apply", "apt"]
+
+
+def test_memory_budget_drops_least_frequent_words():
+    index = SuggestIndex(memory_budget=len("apply") + 9 + len("apt") + 9)
+    index.build(WORDS)
+    assert index.suggest("a") == ["apply", "apt"]
+    assert index.dropped == 5
+
+
+def test_word_list_formats(tmp_path):
+    ranked = tmp_path / "ranked.txt"
+    ranked.write_text("# comment\nthe\nthey\nthem\n", encoding="utf-8")
+    counted = tmp_path / "counted.txt"
+    counted.write_text("ice cream\t12\nice\t3\n", encoding="utf-8")
+
+    assert load_word_list(str(ranked)) == [("the", 3), ("they", 2), ("them", 1)]
+    assert load_word_list(str(counted)) == [("ice cream", 12), ("ice", 3)]
+
+    index = SuggestIndex()
+    build_suggest_index(index, str(ranked))
+    assert index.source == str(ranked)
+    assert index.suggest("th") == ["the", "they", "them"]
+
+
+def test_missing_or_empty_word_list_fails_instead_of_building_an_unranked_index(tmp_path):
+    empty = tmp_path / "empty.txt"
+    empty.write_text("# nothing here\n", encoding="utf-8")
+
+    with pytest.raises(FileNotFoundError):
+        build_suggest_index(SuggestIndex(), str(tmp_path / "missing.txt"))
+    with pytest.raises(FileNotFoundError):
+        build_suggest_index(SuggestIndex(), "")
+    with pytest.raises(ValueError):
+        build_suggest_index(SuggestIndex(), str(empty))
@@ -0,0 +1,217 @@
+import asyncio
+import uuid
+
+import pytest
+
+import word_index
+from word_index import UserWordIndex, normalize_word
+
+
+def test_serialized_never_runs_same_word_concurrently():
+    index = UserWordIndex(session_factory=None)
+    user = uuid.uuid4()
+    active, peak = 0, 0
+
+    async def save(hold: float, on_exit=None):
+        nonlocal active, peak
+        async with index.serialized(user, "Cities"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(hold)
+            active -= 1
+            if on_exit:
+                on_exit()
+
+    async def run():
+        tasks = []
+        # 첫 저장이 끝나는 순간 새 저장이 도착합니다 (깨운 대기자가 아직 lock 을 잡기 전).
+        tasks.append(asyncio.create_task(save(0.01, on_exit=lambda: tasks.append(asyncio.create_task(save(0.01))))))
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(save(0.01)) for _ in range(2)]
+        while any(not task.done() for task in tasks):
+            await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert peak == 1
+    assert index._locks == {}
+
+
+def test_serialized_keys_on_normalized_word():
+    index = UserWordIndex(session_factory=None)
+    user = uuid.uuid4()
+    order = []
+
+    async def save(word: str):
+        async with index.serialized(user, word):
+            order.append(("start", word))
+            await asyncio.sleep(0.01)
+            order.append(("end", word))
+
+    async def run():
+        await asyncio.gather(save("city"), save("Cities"), save("town"))
+
+    asyncio.run(run())
+    # city 와 Cities 는 같은 lock 이므로 겹치지 않습니다. town 은 따로 실행됩니다.
+    city = [event for event in order if event[1] in ("city", "Cities")]
+    assert [kind for kind, _ in city] == ["start", "end", "start", "end"]
+    assert index._locks == {}
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("Apples", "apple"),
+    ("Cities", "city"),
+    ("boxes", "box"),
+    ("churches", "church"),
+    ("dishes", "dish"),
+    ("children", "child"),
+    ("analyses", "analysis"),
+    ("  Dog. ", "dog"),
+    ("Ｃａｔｓ", "cat"),
+    ("the Cats", "the cat"),
+    # 단수화하면 다른(혹은 없는) 단어가 되는 경우는 그대로 둡니다.
+    ("buses", "buses"),
+    ("canvas", "canvas"),
+    ("bus", "bus"),
+    ("status", "status"),
+    ("analysis", "analysis"),
+    ("glass", "glass"),
+    ("famous", "famous"),
+    ("physics", "physics"),
+    ("news", "news"),
+    ("series", "series"),
+    ("his", "his"),
+    ("does", "does"),
+    ("run", "run"),
+])
+def test_normalize_word(word, expected):
+    assert normalize_word(word) == expected
+
+
+def test_singular_and_plural_share_a_key():
+    assert normalize_word("Apple") == normalize_word("apples")
+    assert normalize_word("city") == normalize_word("Cities")
+
+
+class _NaiveLemmatizer:
+    """WordNet 처럼 끝의 s 를 떼는 가짜 lemmatizer (his -> hi, does -> doe)."""
+
+    def lemmatize(self, word: str) -> str:
+        return word[:-1] if word.endswith("s") else word
+
+
+def test_guards_apply_before_wordnet(monkeypatch):
+    monkeypatch.setattr(word_index, "_wordnet", _NaiveLemmatizer())
+    for word in ("his", "does", "news", "canvas", "buses", "status"):
+        assert normalize_word(word) == word
+    assert normalize_word("children") == "child"
+    assert normalize_word("apples") == "apple"
+
+
+class FakeVocabulary:
+    """UserWordIndex 의 session_factory 대용: execute() 가 gate 가 열릴 때까지 기다린 뒤 그 시점의 rows 를 반환합니다."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.reads = 0
+        self.error = None
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.reads += 1
+        rows = list(self.rows) # SELECT 가 실행된 시점의 내용
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return rows
+
+
+def _row(word):
+    return (f"page-{word}", word, "definition", "")
+
+
+def test_concurrent_loads_share_one_read_and_one_prepare():
+    vocabulary = FakeVocabulary([_row("apple")])
+    index = UserWordIndex(session_factory=vocabulary)
+    user = uuid.uuid4()
+    prepared = 0
+
+    async def prepare():
+        nonlocal prepared
+        prepared += 1
+        await asyncio.sleep(0.01)
+
+    async def run():
+        return await asyncio.gather(*[index.lookup(user, "db", "Apples", prepare=prepare) for _ in range(20)])
+
+    results = asyncio.run(run())
+    assert all(result["page_id"] == "page-apple" for result in results)
+    assert (vocabulary.reads, prepared) == (1, 1)
+    assert index.stats["coalesced_loads"] == 19
+    assert index._loading == {}
+
+
+def test_word_added_during_a_load_is_not_lost():
+    # 다른 저장의 write-through 보다 먼저 실행된 SELECT 결과가 방금 add() 된 단어를 덮어쓰면 안 됩니다.
+    vocabulary = FakeVocabulary([_row("apple")])
+    vocabulary.gate.clear()
+    index = UserWordIndex(session_factory=vocabulary)
+    user = uuid.uuid4()
+
+    async def run():
+        load = asyncio.create_task(index.ensure_loaded(user, "db"))
+        await asyncio.sleep(0.01)
+        index.add(user, "db", "page-cherry", "cherry", "definition", "")
+        vocabulary.gate.set()
+        await load
+        return await index.lookup(user, "db", "cherries")
+
+    assert asyncio.run(run())["page_id"] == "page-cherry"
+    assert index._pending == {}
+
+
+def test_invalidate_during_a_load_rereads_instead_of_caching_stale_rows():
+    vocabulary = FakeVocabulary([_row("apple")])
+    vocabulary.gate.clear()
+    index = UserWordIndex(session_factory=vocabulary)
+    user = uuid.uuid4()
+
+    async def run():
+        load = asyncio.create_task(index.ensure_loaded(user, "db"))
+        await asyncio.sleep(0.01)
+        # 로드 중에 동기화가 끝나 미러에 새 단어가 들어왔습니다.
+        vocabulary.rows.append(_row("banana"))
+        index.invalidate(user)
+        vocabulary.gate.set()
+        await load
+        return await index.lookup(user, "db", "banana")
+
+    assert asyncio.run(run())["page_id"] == "page-banana"
+    assert vocabulary.reads == 2
+    assert index._invalidations == {}
+
+
+def test_failed_load_reaches_every_waiter_and_is_retried_next_time():
+    vocabulary = FakeVocabulary([_row("apple")])
+    vocabulary.error = RuntimeError("database is down")
+    index = UserWordIndex(session_factory=vocabulary)
+    user = uuid.uuid4()
+
+    async def run():
+        failures = await asyncio.gather(*[index.lookup(user, "db", "apple") for _ in range(3)], return_exceptions=True)
+        vocabulary.error = None
+        return failures, await index.lookup(user, "db", "apple")
+
+    failures, entry = asyncio.run(run())
+    assert all(isinstance(failure, RuntimeError) for failure in failures)
+    assert entry["page_id"] == "page-apple"
+    assert vocabulary.reads == 2
@@ -2,9 +2,10 @@
 import uuid
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
 import models
+from notion_cache import integration_cache
 
 router = APIRouter(
     prefix="/api/user",
@@ -12,16 +13,16 @@ router = APIRouter(
 )
 
 @router.get("/get-notion-info/{app_user_id}")
-async def get_notion_info(app_user_id: uuid.UUID, db_session: Session = Depends(get_db)):
+async def get_notion_info(app_user_id: uuid.UUID, db_session: AsyncSession = Depends(get_async_db)):
     """
     앱 사용자 ID를 통해 Notion 연동 정보를 조회하여 클라이언트에 반환합니다.
     """
-    user_obj = db_session.query(models.User).filter_by(id=app_user_id).first()
+    user_obj = await db_session.get(models.User, app_user_id)
 
     if not user_obj:
         raise HTTPException(status_code=404, detail="User not found.")
 
-    notion_integration = db_session.query(models.NotionIntegration).filter_by(user_id=app_user_id).first()
+    notion_integration = await integration_cache.get(db_session, app_user_id)
 
     if not notion_integration:
         # Notion 연동 정보가 없어도 사용자 기본 정보는 반환
@@ -0,0 +1,286 @@
+# vocabulary_mirror.py
+import asyncio
+import datetime
+import uuid
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+import models
+from config import NOTION_MIRROR_SYNC_INTERVAL, NOTION_MIRROR_FULL_SYNC_INTERVAL
+from database import AsyncSessionLocal
+from notion_scheduler import NotionScheduler, notion_scheduler
+from word_index import word_index
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+def _parse_notion_time(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _plain_text(prop: Optional[dict]) -> str:
+    items = (prop or {}).get("title") or (prop or {}).get("rich_text") or []
+    return "".join(item.get("plain_text") or item.get("text", {}).get("content", "") for item in items)
+
+
+def page_to_entry(app_user_id: uuid.UUID, database_id: str, page: dict) -> dict:
+    """Notion 단어장 페이지(Word / Definition / Synonyms) 를 notion_vocabulary_entries 행으로 변환합니다."""
+    properties = page.get("properties", {})
+    return {
+        "page_id": page["id"],
+        "user_id": app_user_id,
+        "database_id": database_id,
+        "word": _plain_text(properties.get("Word")),
+        "definition": _plain_text(properties.get("Definition")),
+        "synonyms": _plain_text(properties.get("Synonyms")),
+        "last_edited_time": _parse_notion_time(page["last_edited_time"]),
+        "synced_at": _now(),
+    }
+
+
+class VocabularyMirror:
+    """
+    사용자별 Notion 단어장 데이터베이스(selected_vocabulary_db_id) 를 Postgres 에 미러링합니다.
+
+    - 처음(또는 단어장이 바뀌었거나 full_sync_interval 이 지났을 때)에는 전체 페이지를 조회하고,
+      Notion 에서 삭제된 페이지의 행을 정리합니다. max_pages 에서 끊긴 전체 동기화는 다음 동기화가
+      watermark 부터 이어 받고, 끝까지 받은 뒤에 정리합니다.
+    - 이후에는 last_edited_time >= 워터마크인 페이지만 조회하는 증분 동기화를 합니다.
+    - save_to_notion 등으로 만든 페이지는 record_page() 로 바로 반영합니다 (write-through).
+    - 조회 API 는 로컬 행을 즉시 반환하고, 동기화가 sync_interval 보다 오래됐으면 백그라운드로 갱신합니다.
+    Notion 호출은 NotionScheduler 를 거치므로 integration 별 rate limit 을 지킵니다.
+    """
+
+    QUERY_URL = "https://api.notion.com/v1/databases/{database_id}/query"
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        scheduler: NotionScheduler,
+        sync_interval: float = 300,
+        full_sync_interval: float = 86400,
+        max_pages: int = 1000,
+    ):
+        self._session_factory = session_factory
+        self.scheduler = scheduler
+        self.sync_interval = sync_interval
+        self.full_sync_interval = full_sync_interval
+        self.max_pages = max(1, max_pages)
+        self._in_flight: dict[uuid.UUID, asyncio.Task] = {}
+        self._pending_writes: set = set()
+        self._background_syncs: set = set()
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.truncated_syncs = 0
+        self.pages_synced = 0
+        self.write_throughs = 0
+        self.sync_errors = 0
+
+    async def _upsert(self, db, rows: list[dict]):
+        if not rows:
+            return
+        entries = models.NotionVocabularyEntry
+        statement = insert(entries).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[entries.page_id],
+            set_={
+                "user_id": statement.excluded.user_id,
+                "database_id": statement.excluded.database_id,
+                "word": statement.excluded.word,
+                "definition": statement.excluded.definition,
+                "synonyms": statement.excluded.synonyms,
+                "last_edited_time": statement.excluded.last_edited_time,
+                "synced_at": statement.excluded.synced_at,
+            },
+        )
+        await db.execute(statement)
+
+    async def _query_pages(self, access_token: str, database_id: str, since: Optional[datetime.datetime]):
+        """
+        단어장 페이지를 last_edited_time 오름차순으로 100개씩 (페이지 목록, 남은 페이지가 있는지) 로 yield 합니다.
+        max_pages 에서 멈추면 마지막 항목의 has_more 가 True 로 남습니다.
+        """
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+            "Notion-Version": "2022-06-28"
+        }
+        payload = {"page_size": 100, "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}]}
+        if since is not None:
+            # Notion 의 last_edited_time 은 분 단위이므로 경계 페이지는 다시 받아 upsert 합니다.
+            payload["filter"] = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": since.isoformat()}}
+        url = self.QUERY_URL.format(database_id=database_id)
+        for _ in range(self.max_pages):
+            response = await self.scheduler.post(access_token, url, idempotent=True, headers=headers, json=payload)
+            response.raise_for_status()
+            data = response.json()
+            has_more = bool(data.get("has_more") and data.get("next_cursor"))
+            yield [page for page in data.get("results", []) if page.get("object") == "page"], has_more
+            if not has_more:
+                return
+            payload = {**payload, "start_cursor": data["next_cursor"]}
+
+    async def _sync(self, app_user_id: uuid.UUID, access_token: str, database_id: str, full: bool) -> int:
+        states = models.NotionVocabularySyncState
+        async with self._session_factory() as db:
+            state = await db.get(states, app_user_id)
+            if state is None:
+                state = states(user_id=app_user_id, database_id=database_id)
+                db.add(state)
+            started = _now()
+            resuming = state.full_sync_started_at is not None and state.database_id == database_id
+            if (
+                state.database_id != database_id
+                or state.last_full_sync_at is None
+                or (_now() - state.last_full_sync_at).total_seconds() > self.full_sync_interval
+            ):
+                full = True
+            state.database_id = database_id
+            if resuming:
+                # 이전 전체 동기화가 max_pages 에서 끊겼습니다. 처음부터 다시 받지 않고 watermark 부터 이어 받습니다.
+                full = True
+            elif full:
+                state.last_edited_watermark = None
+                state.full_sync_started_at = started
+            since = state.last_edited_watermark
+
+            synced, truncated = 0, False
+            async for pages, truncated in self._query_pages(access_token, database_id, since):
+                rows = [page_to_entry(app_user_id, database_id, page) for page in pages]
+                await self._upsert(db, rows)
+                if rows:
+                    latest = max(row["last_edited_time"] for row in rows)
+                    if state.last_edited_watermark is None or latest > state.last_edited_watermark:
+                        state.last_edited_watermark = latest
+                await db.commit() # 페이지마다 커밋해 중간에 실패해도 진행분은 남깁니다.
+                synced += len(rows)
+
+            if truncated:
+                # max_pages 에서 끊겼으면 보지 못한 행이 삭제된 페이지인지 알 수 없으므로 정리하지 않고,
+                # 전체 동기화도 끝난 것으로 기록하지 않습니다. 전체 동기화라면 full_sync_started_at 이 남아 있어
+                # 다음 동기화가 watermark 부터 이어 받습니다.
+                self.truncated_syncs += 1
+                print(f"Vocabulary mirror sync for user {app_user_id} stopped after {self.max_pages} page request(s); resuming from the watermark next time")
+            elif full:
+                # 이번 전체 동기화(이어 받은 부분 포함) 에서 보지 못한 행(Notion 에서 삭제/보관된 페이지, 이전 단어장) 을 정리합니다.
+                entries = models.NotionVocabularyEntry
+                await db.execute(delete(entries).where(entries.user_id == app_user_id, entries.synced_at < state.full_sync_started_at))
+                state.last_full_sync_at = started
+                state.full_sync_started_at = None
+                self.full_syncs += 1
+            if not full:
+                self.incremental_syncs += 1
+            state.last_synced_at = started
+            await db.commit()
+        word_index.invalidate(app_user_id) # Notion 에서 직접 추가/수정/삭제한 단어를 다음 중복 검사부터 반영합니다.
+        self.pages_synced += synced
+        print(f"Vocabulary mirror {'full' if full else 'incremental'} sync for user {app_user_id}: {synced} page(s)")
+        return synced
+
+    async def sync(self, app_user_id: uuid.UUID, access_token: str, database_id: str, full: bool = False) -> int:
+        """사용자 단어장을 동기화합니다. 같은 사용자의 동시 동기화는 하나로 합칩니다."""
+        task = self._in_flight.get(app_user_id)
+        if task is None:
+            task = asyncio.create_task(self._sync(app_user_id, access_token, database_id, full))
+            self._in_flight[app_user_id] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(app_user_id, None))
+        return await asyncio.shield(task)
+
+    def schedule_sync(self, app_user_id: uuid.UUID, access_token: str, database_id: str, full: bool = False):
+        """응답을 기다리게 하지 않고 백그라운드로 동기화합니다."""
+        if app_user_id in self._in_flight:
+            return
+        task = asyncio.create_task(self._background_sync(app_user_id, access_token, database_id, full))
+        self._background_syncs.add(task)
+        task.add_done_callback(self._background_syncs.discard)
+
+    async def _background_sync(self, app_user_id: uuid.UUID, access_token: str, database_id: str, full: bool):
+        try:
+            await self.sync(app_user_id, access_token, database_id, full)
+        except Exception as e:
+            self.sync_errors += 1
+            print(f"Vocabulary mirror sync failed for user {app_user_id}: {e}")
+
+    async def ensure_synced(self, app_user_id: uuid.UUID, access_token: str, database_id: str):
+        """이 단어장을 한 번도 동기화하지 않았으면(user-020 이전에 단어장을 고른 사용자 등) 지금 동기화하고 기다립니다."""
+        async with self._session_factory() as db:
+            state = await db.get(models.NotionVocabularySyncState, app_user_id)
+        if state is None or state.database_id != database_id or state.last_synced_at is None:
+            await self.sync(app_user_id, access_token, database_id)
+
+    async def ensure_fresh(self, db, app_user_id: uuid.UUID, access_token: str, database_id: str) -> Optional[models.NotionVocabularySyncState]:
+        """동기화 상태를 반환하고, 없거나 오래됐으면 백그라운드 동기화를 시작합니다."""
+        state = await db.get(models.NotionVocabularySyncState, app_user_id)
+        if (
+            state is None
+            or state.database_id != database_id
+            or state.last_synced_at is None
+            or (_now() - state.last_synced_at).total_seconds() > self.sync_interval
+        ):
+            self.schedule_sync(app_user_id, access_token, database_id)
+        if state is not None and state.database_id != database_id:
+            return None
+        return state
+
+    def record_page(self, app_user_id: uuid.UUID, page: dict) -> Optional[asyncio.Task]:
+        """
+        Notion 에 방금 만든 페이지를 미러에 반영합니다 (write-through, 백그라운드).
+        기록이 끝나야 하는 호출자는 반환된 task 를 기다립니다.
+        """
+        database_id = page.get("parent", {}).get("database_id")
+        if not database_id or "id" not in page or "last_edited_time" not in page:
+            return None
+        task = asyncio.create_task(self._record(page_to_entry(app_user_id, database_id, page)))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+        return task
+
+    async def _record(self, row: dict):
+        try:
+            async with self._session_factory() as db:
+                await self._upsert(db, [row])
+                await db.commit()
+            self.write_throughs += 1
+        except Exception as e:
+            self.sync_errors += 1
+            print(f"Vocabulary mirror write-through failed: {e}")
+
+    async def list_entries(self, db, app_user_id: uuid.UUID, database_id: str, limit: int, offset: int):
+        """(미러 행 목록, 전체 개수) 를 단어 순으로 반환합니다."""
+        entries = models.NotionVocabularyEntry
+        condition = (entries.user_id == app_user_id) & (entries.database_id == database_id)
+        total = (await db.execute(select(func.count()).select_from(entries).where(condition))).scalar()
+        result = await db.execute(select(entries).where(condition).order_by(entries.word, entries.page_id).limit(limit).offset(offset))
+        return result.scalars().all(), total
+
+    async def close(self):
+        # 동기화는 페이지마다 커밋하므로 취소해도 다음 동기화가 워터마크부터 이어갑니다.
+        for task in list(self._background_syncs) + list(self._in_flight.values()):
+            task.cancel()
+        await asyncio.gather(*self._background_syncs, *self._in_flight.values(), return_exceptions=True)
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "full_syncs": self.full_syncs,
+            "incremental_syncs": self.incremental_syncs,
+            "truncated_syncs": self.truncated_syncs,
+            "pages_synced": self.pages_synced,
+            "write_throughs": self.write_throughs,
+            "sync_errors": self.sync_errors,
+            "in_flight": len(self._in_flight),
+        }
+
+
+vocabulary_mirror = VocabularyMirror(
+    session_factory=AsyncSessionLocal,
+    scheduler=notion_scheduler,
+    sync_interval=NOTION_MIRROR_SYNC_INTERVAL,
+    full_sync_interval=NOTION_MIRROR_FULL_SYNC_INTERVAL,
+)
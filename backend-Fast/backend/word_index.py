@@ -0,0 +1,217 @@
+# word_index.py
+import asyncio
+import unicodedata
+import uuid
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import select
+
+import models
+from config import NOTION_WORD_INDEX_USERS, NOTION_WORD_INDEX_TTL
+from database import AsyncSessionLocal
+from ttl_cache import TTLCache
+
+try:
+    # 선택 의존성: nltk 와 WordNet 데이터가 있으면 사전 기반 lemmatizer 를 사용합니다.
+    from nltk.stem import WordNetLemmatizer
+    _wordnet = WordNetLemmatizer()
+    _wordnet.lemmatize("tests")
+except Exception:
+    _wordnet = None
+
+# 규칙으로 처리할 수 없는 흔한 불규칙 복수형
+_IRREGULAR_PLURALS = {
+    "children": "child", "men": "man", "women": "woman", "people": "person", "mice": "mouse",
+    "geese": "goose", "feet": "foot", "teeth": "tooth", "lives": "life", "wives": "wife",
+    "knives": "knife", "leaves": "leaf", "halves": "half", "analyses": "analysis", "criteria": "criterion",
+}
+# 's' 로 끝나지만 복수형이 아니거나, 단수화하면 다른 단어가 되는 단어
+_INVARIANT = {"news", "series", "species", "means", "lens", "does", "goes", "this", "his", "hers", "its", "yes", "thus", "always", "perhaps"}
+# 이 어미로 끝나는 단어는 그대로 둡니다: canvas, bus/status, analysis, glass, famous, physics, buses/cases 등
+_SINGULAR_ENDINGS = ("ss", "as", "us", "is", "ous", "ics", "ses")
+
+
+def _lemmatize(word: str) -> str:
+    """
+    보수적인 명사 단수화. 다른 단어와 잘못 합치는 것보다 중복을 놓치는 편을 택합니다.
+    불규칙 복수형/예외 단어/보호 어미 검사는 WordNet 보다 먼저 적용합니다 (WordNet 은 his -> hi, does -> doe 로 바꿉니다).
+    """
+    if word in _IRREGULAR_PLURALS:
+        return _IRREGULAR_PLURALS[word]
+    if word in _INVARIANT or len(word) <= 3 or not word.endswith("s") or word.endswith(_SINGULAR_ENDINGS):
+        return word
+    if _wordnet is not None:
+        return _wordnet.lemmatize(word)
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("xes", "ches", "shes")):
+        return word[:-2]
+    return word[:-1]
+
+
+def normalize_word(word: str) -> str:
+    """중복 판단 키: 유니코드 정규화 + casefold + 공백 정리 + 마지막 단어 단수화."""
+    text = " ".join(unicodedata.normalize("NFKC", word).casefold().strip(" .,;:!?\"'").split())
+    if not text:
+        return text
+    head, _, last = text.rpartition(" ")
+    last = _lemmatize(last) if last.isalpha() else last
+    return f"{head} {last}" if head else last
+
+
+class WordIndexUnavailableError(Exception):
+    """중복 검사용 단어 색인을 준비하지 못했을 때 발생합니다. 중복 페이지를 만들지 않도록 저장하지 않습니다."""
+
+
+def _build_words(rows: list) -> dict:
+    # 단어가 많으면 정규화(lemmatize) 가 오래 걸리므로 스레드에서 실행합니다.
+    words = {}
+    for page_id, word, definition, synonyms in rows:
+        words.setdefault(normalize_word(word), {
+            "page_id": page_id, "word": word, "definition": definition, "synonyms": synonyms,
+        })
+    return words
+
+
+class UserWordIndex:
+    """
+    사용자별 저장 단어 색인 (정규화된 단어 -> 미러 행).
+
+    - 로컬 단어장 미러(notion_vocabulary_entries) 에서 사용자 단위로 한 번 읽어 메모리에 둡니다 (LRU/TTL).
+    - 같은 사용자·단어장의 동시 로드는 하나로 합칩니다 (single-flight).
+    - 새로 저장한 단어는 add() 로 바로 반영하므로 Notion 조회 없이 중복을 판단할 수 있습니다.
+      로드 중에 add() 된 단어는 로드가 끝난 뒤 덧붙이고, 로드 중에 invalidate() 되면 다시 읽어
+      먼저 시작한 로드가 더 새로운 내용을 덮어쓰지 않게 합니다.
+    - 같은 사용자·단어의 동시 저장은 serialized() 로 직렬화해 중복 페이지가 생기지 않게 합니다.
+    """
+
+    MAX_LOAD_ATTEMPTS = 3
+
+    def __init__(self, session_factory: Callable, max_users: int = 1000, ttl: Optional[float] = 300):
+        self._session_factory = session_factory
+        self._indexes = TTLCache(maxsize=max_users, ttl=ttl)
+        self._locks: dict = {} # (user, 정규화된 단어) -> [asyncio.Lock, 참조 수]
+        self._loading: dict = {} # (user, database_id) -> 로드 중인 asyncio.Task
+        self._pending: dict = {} # (user, database_id) -> 로드 중에 add() 된 (정규화된 단어, 항목) 목록
+        self._invalidations: dict = {} # (user, database_id) -> 로드 중에 invalidate() 된 횟수
+        self.lookups = 0
+        self.duplicates = 0
+        self.loads = 0
+        self.coalesced_loads = 0
+
+    async def _read(self, app_user_id: uuid.UUID, database_id: str) -> dict:
+        entries = models.NotionVocabularyEntry
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(entries.page_id, entries.word, entries.definition, entries.synonyms)
+                .where(entries.user_id == app_user_id, entries.database_id == database_id)
+                .order_by(entries.last_edited_time)
+            )
+            rows = [tuple(row) for row in result]
+        return await asyncio.to_thread(_build_words, rows)
+
+    async def _load(self, app_user_id: uuid.UUID, database_id: str, prepare: Optional[Callable[[], Awaitable]]) -> dict:
+        key = str(app_user_id)
+        load_key = (key, database_id)
+        if prepare is not None:
+            await prepare()
+        try:
+            for attempt in range(self.MAX_LOAD_ATTEMPTS):
+                generation = self._invalidations.get(load_key, 0)
+                words = await self._read(app_user_id, database_id)
+                self.loads += 1
+                for normalized, entry in self._pending.get(load_key, []):
+                    words[normalized] = entry
+                index = {"database_id": database_id, "words": words}
+                if self._invalidations.get(load_key, 0) == generation:
+                    self._indexes.set(key, index)
+                    return index
+            # 읽는 동안 계속 무효화되면(동기화가 반복되는 중) 이번 결과는 캐시하지 않고 그대로 씁니다.
+            return index
+        finally:
+            self._pending.pop(load_key, None)
+            self._invalidations.pop(load_key, None)
+
+    async def ensure_loaded(
+        self, app_user_id: uuid.UUID, database_id: str, prepare: Optional[Callable[[], Awaitable]] = None
+    ) -> dict:
+        """
+        사용자 단어장 색인을 반환하고, 없으면 읽어 옵니다. prepare 는 읽기 전에 한 번 실행됩니다 (미러 동기화 등).
+        같은 사용자·단어장의 동시 호출은 하나의 로드를 함께 기다립니다.
+        """
+        key = str(app_user_id)
+        index = self._indexes.get(key)
+        if index is not None and index["database_id"] == database_id:
+            return index
+        load_key = (key, database_id)
+        task = self._loading.get(load_key)
+        if task is None:
+            task = asyncio.create_task(self._load(app_user_id, database_id, prepare))
+            self._loading[load_key] = task
+            task.add_done_callback(lambda _: self._loading.pop(load_key, None))
+        else:
+            self.coalesced_loads += 1
+        # 먼저 요청한 저장이 취소돼도 같은 로드를 기다리는 다른 저장은 결과를 받도록 shield 합니다.
+        return await asyncio.shield(task)
+
+    async def lookup(
+        self, app_user_id: uuid.UUID, database_id: str, word: str, prepare: Optional[Callable[[], Awaitable]] = None
+    ) -> Optional[dict]:
+        """이미 저장된 같은 단어(정규화 기준) 가 있으면 그 항목을 반환합니다."""
+        self.lookups += 1
+        entry = (await self.ensure_loaded(app_user_id, database_id, prepare))["words"].get(normalize_word(word))
+        if entry is not None:
+            self.duplicates += 1
+        return entry
+
+    def add(self, app_user_id: uuid.UUID, database_id: str, page_id: str, word: str, definition: str, synonyms: str):
+        key = str(app_user_id)
+        entry = {"page_id": page_id, "word": word, "definition": definition, "synonyms": synonyms}
+        index = self._indexes.get(key, count=False)
+        if index is not None and index["database_id"] == database_id:
+            index["words"][normalize_word(word)] = entry
+        if (key, database_id) in self._loading:
+            self._pending.setdefault((key, database_id), []).append((normalize_word(word), entry))
+
+    def invalidate(self, app_user_id: uuid.UUID):
+        key = str(app_user_id)
+        self._indexes.pop(key)
+        for load_key in self._loading:
+            if load_key[0] == key:
+                self._invalidations[load_key] = self._invalidations.get(load_key, 0) + 1
+
+    @asynccontextmanager
+    async def serialized(self, app_user_id: uuid.UUID, word: str):
+        """
+        같은 사용자·단어(정규화 기준) 의 저장을 한 번에 하나씩 실행합니다.
+        lock 은 기다리는 요청까지 센 참조 수가 0 이 될 때만 지웁니다. lock.locked() 는 깨운 대기자가 아직
+        획득하기 전에도 False 라서, 그 기준으로 지우면 새 요청이 다른 lock 을 만들어 동시에 실행됩니다.
+        """
+        key = (str(app_user_id), normalize_word(word))
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    @property
+    def stats(self) -> dict:
+        return {
+            **self._indexes.stats,
+            "lemmatizer": "wordnet" if _wordnet is not None else "rules",
+            "lookups": self.lookups,
+            "duplicates": self.duplicates,
+            "loads": self.loads,
+            "coalesced_loads": self.coalesced_loads,
+            "loading": len(self._loading),
+        }
+
+
+word_index = UserWordIndex(session_factory=AsyncSessionLocal, max_users=NOTION_WORD_INDEX_USERS, ttl=NOTION_WORD_INDEX_TTL)